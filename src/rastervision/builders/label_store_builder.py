@@ -1,5 +1,9 @@
 from rastervision.label_stores.object_detection_geojson_file import (
     ObjectDetectionGeoJSONFile)
+from rastervision.label_stores.object_detection_npz_file import (
+    ObjectDetectionNpzFile)
+from rastervision.label_stores.object_detection_sqlite_file import (
+    ObjectDetectionSQLiteFile)
 from rastervision.label_stores.classification_geojson_file import (
     ClassificationGeoJSONFile)
 from rastervision.label_stores.segmentation_raster_file import (
@@ -22,6 +26,22 @@ def build(config,
             extent=extent,
             readable=readable,
             writable=writable)
+    elif label_store_type == 'object_detection_npz_file':
+        return ObjectDetectionNpzFile(
+            config.object_detection_npz_file.uri,
+            crs_transformer,
+            class_map,
+            extent=extent,
+            readable=readable,
+            writable=writable)
+    elif label_store_type == 'object_detection_sqlite_file':
+        return ObjectDetectionSQLiteFile(
+            config.object_detection_sqlite_file.uri,
+            crs_transformer,
+            class_map,
+            extent=extent,
+            readable=readable,
+            writable=writable)
     elif label_store_type == 'classification_geojson_file':
         return ClassificationGeoJSONFile(
             config.classification_geojson_file.uri,
@@ -35,10 +55,19 @@ def build(config,
         srf = config.segmentation_raster_file
         if not str(srf.source) == '':
             return SegmentationInputRasterFile(
-                source=srf.source, raster_class_map=srf.raster_class_map)
+                source=srf.source,
+                raster_class_map=srf.raster_class_map,
+                class_index=srf.source_class_index)
         else:
+            sink_options = srf.sink_options
             return SegmentationOutputRasterFile(
-                sink=srf.sink, class_map=class_map)
+                sink=srf.sink,
+                class_map=class_map,
+                extent=extent,
+                class_index=sink_options.class_index,
+                compression=sink_options.compression,
+                block_size=sink_options.block_size,
+                overviews=sink_options.overviews)
     else:
         raise ValueError('Not sure how to generate label store for type {}'
                          .format(label_store_type))
@@ -9,6 +9,12 @@ def build(config):
 
     raster_source_type = config.WhichOneof('raster_source_type')
     if raster_source_type == 'geotiff_files':
-        return GeoTiffFiles(raster_transformer, config.geotiff_files.uris)
+        return GeoTiffFiles(
+            raster_transformer,
+            config.geotiff_files.uris,
+            block_cache_size=config.block_cache_size)
     if raster_source_type == 'image_file':
-        return ImageFile(raster_transformer, config.image_file.uri)
+        return ImageFile(
+            raster_transformer,
+            config.image_file.uri,
+            block_cache_size=config.block_cache_size)
@@ -1,13 +1,144 @@
+import hashlib
+from multiprocessing import Pool
+
+from rastervision.builders import raster_source_builder
 from rastervision.core.command import Command
-from rastervision.core.raster_stats import RasterStats
+from rastervision.core.raster_stats import (RasterStats, compute_partial_stats)
+from rastervision.protos.raster_source_pb2 import (RasterSource as
+                                                   RasterSourceConfig)
+from rastervision.utils.files import get_file_fingerprint, NotReadableError
+
+
+def get_raster_source_uris(config):
+    """Return list of URIs of the imagery in a RasterSource config."""
+    raster_source_type = config.WhichOneof('raster_source_type')
+    if raster_source_type == 'geotiff_files':
+        return list(config.geotiff_files.uris)
+    if raster_source_type == 'image_file':
+        return [config.image_file.uri]
+    return []
+
+
+def get_raster_source_fingerprint(config):
+    """Return a fingerprint of the imagery in a RasterSource config.
+
+    The fingerprint is a hash of the URIs of the imagery and the fingerprints
+    of the files they point to, so it changes whenever the imagery changes.
+
+    Args:
+        config: RasterSource config
+
+    Returns:
+        (string) fingerprint or None if the imagery cannot be fingerprinted
+    """
+    uris = get_raster_source_uris(config)
+    if not uris:
+        return None
+
+    fingerprint = hashlib.sha256()
+    fingerprint.update(config.WhichOneof('raster_source_type').encode())
+    for uri in uris:
+        file_fingerprint = get_file_fingerprint(uri)
+        if file_fingerprint is None:
+            return None
+        fingerprint.update('\0{}\0{}'.format(uri, file_fingerprint).encode())
+    return fingerprint.hexdigest()
+
+
+def compute_raster_source_stats(raster_source_config_str):
+    """Compute partial stats for a serialized RasterSource config.
+
+    This is a top-level function so that it can be run in a worker process.
+    The RasterSource is built inside the worker so that each worker only
+    downloads and opens the imagery it needs.
+
+    Args:
+        raster_source_config_str: serialized RasterSource config
+
+    Returns:
+        RunningStats
+    """
+    config = RasterSourceConfig()
+    config.ParseFromString(raster_source_config_str)
+    raster_source = raster_source_builder.build(config)
+    return compute_partial_stats(raster_source)
 
 
 class ComputeRasterStats(Command):
-    def __init__(self, raster_sources, stats_uri):
-        self.raster_sources = raster_sources
+    def __init__(self,
+                 raster_source_configs,
+                 stats_uri,
+                 num_workers=1,
+                 use_stats_cache=True):
+        """Construct a new ComputeRasterStats command.
+
+        Args:
+            raster_source_configs: list of RasterSource configs
+            stats_uri: URI of stats file to write
+            num_workers: (int) number of processes to compute the partial
+                stats of each RasterSource in
+            use_stats_cache: (bool) if True, reuse the partial stats stored
+                in an existing stats file at stats_uri for imagery that has
+                not changed, and store the partial stats in the new file
+        """
+        self.raster_source_configs = raster_source_configs
         self.stats_uri = stats_uri
+        self.num_workers = num_workers
+        self.use_stats_cache = use_stats_cache
+
+    def load_cached_partial_stats(self):
+        """Return dict from fingerprint to RunningStats in existing file."""
+        cached_stats = RasterStats()
+        try:
+            cached_stats.load(self.stats_uri)
+        except NotReadableError:
+            return {}
+        return cached_stats.partial_stats
 
     def run(self):
+        fingerprints = [None] * len(self.raster_source_configs)
+        cached_partial_stats = {}
+        if self.use_stats_cache:
+            fingerprints = [
+                get_raster_source_fingerprint(config)
+                for config in self.raster_source_configs
+            ]
+            cached_partial_stats = self.load_cached_partial_stats()
+
+        # Only compute stats for imagery that is new or has changed.
+        missing_inds = [
+            ind for ind, fingerprint in enumerate(fingerprints)
+            if fingerprint not in cached_partial_stats
+        ]
+        print('Computing stats for {} of {} raster sources...'.format(
+            len(missing_inds), len(fingerprints)))
+        config_strs = [
+            self.raster_source_configs[ind].SerializeToString()
+            for ind in missing_inds
+        ]
+
+        if self.num_workers > 1 and len(config_strs) > 1:
+            with Pool(min(self.num_workers, len(config_strs))) as pool:
+                computed_stats = pool.map(compute_raster_source_stats,
+                                          config_strs)
+        else:
+            computed_stats = [
+                compute_raster_source_stats(config_str)
+                for config_str in config_strs
+            ]
+
+        partial_stats = [
+            cached_partial_stats.get(fingerprint)
+            for fingerprint in fingerprints
+        ]
+        for ind, running_stats in zip(missing_inds, computed_stats):
+            partial_stats[ind] = running_stats
+
         stats = RasterStats()
-        stats.compute(self.raster_sources)
+        stats.reduce(partial_stats)
+        if self.use_stats_cache:
+            stats.partial_stats = dict((fingerprint, running_stats)
+                                       for fingerprint, running_stats in zip(
+                                           fingerprints, partial_stats)
+                                       if fingerprint is not None)
         stats.save(self.stats_uri)
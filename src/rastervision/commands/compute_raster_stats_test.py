@@ -0,0 +1,90 @@
+import unittest
+import tempfile
+import os
+from unittest.mock import patch
+
+import rasterio
+import numpy as np
+
+from rastervision.commands.compute_raster_stats import (
+    ComputeRasterStats, compute_raster_source_stats)
+from rastervision.core.raster_stats import RasterStats
+from rastervision.protos.raster_source_pb2 import (RasterSource as
+                                                   RasterSourceConfig)
+
+compute_path = ('rastervision.commands.compute_raster_stats.'
+                'compute_raster_source_stats')
+
+
+class TestComputeRasterStats(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.stats_uri = os.path.join(self.temp_dir.name, 'stats.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_config(self, name, low, high, height=50):
+        image_path = os.path.join(self.temp_dir.name, name)
+        im = np.random.randint(low, high, (2, height, 60)).astype(np.uint16)
+        with rasterio.open(
+                image_path,
+                'w',
+                driver='GTiff',
+                height=height,
+                width=60,
+                count=2,
+                dtype=np.uint16) as image_dataset:
+            image_dataset.write(im)
+
+        config = RasterSourceConfig()
+        config.image_file.uri = image_path
+        return config, im
+
+    def test_reuse_partial_stats(self):
+        config1, im1 = self.make_config('1.tif', 1, 100)
+        config2, im2 = self.make_config('2.tif', 100, 200)
+
+        ComputeRasterStats([config1], self.stats_uri).run()
+
+        # Only the new image should be read.
+        with patch(
+                compute_path,
+                side_effect=compute_raster_source_stats) as mock_compute:
+            ComputeRasterStats([config1, config2], self.stats_uri).run()
+            self.assertEqual(mock_compute.call_count, 1)
+
+        stats = RasterStats()
+        stats.load(self.stats_uri)
+        pixels = np.concatenate(
+            [im1.reshape(2, -1), im2.reshape(2, -1)], axis=1)
+        np.testing.assert_allclose(stats.means, pixels.mean(axis=1))
+        np.testing.assert_allclose(stats.stds, pixels.std(axis=1))
+        self.assertEqual(len(stats.partial_stats), 2)
+
+        # Changing an image should cause it to be read again.
+        config1, im1 = self.make_config('1.tif', 1, 10, height=40)
+        with patch(
+                compute_path,
+                side_effect=compute_raster_source_stats) as mock_compute:
+            ComputeRasterStats([config1, config2], self.stats_uri).run()
+            self.assertEqual(mock_compute.call_count, 1)
+
+    def test_no_stats_cache(self):
+        config1, _ = self.make_config('1.tif', 1, 100)
+        ComputeRasterStats([config1], self.stats_uri).run()
+
+        with patch(
+                compute_path,
+                side_effect=compute_raster_source_stats) as mock_compute:
+            ComputeRasterStats(
+                [config1], self.stats_uri, use_stats_cache=False).run()
+            self.assertEqual(mock_compute.call_count, 1)
+
+        stats = RasterStats()
+        stats.load(self.stats_uri)
+        self.assertEqual(stats.partial_stats, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
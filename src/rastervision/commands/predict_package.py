@@ -11,12 +11,14 @@ class PredictPackage(Command):
                  labels_uri,
                  image_uris,
                  update_stats=False,
-                 channel_order=None):
+                 channel_order=None,
+                 approximate_stats=False):
         self.package_zip_uri = package_zip_uri
         self.labels_uri = labels_uri
         self.image_uris = image_uris
         self.update_stats = update_stats
         self.channel_order = channel_order
+        self.approximate_stats = approximate_stats
 
     def run(self):
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -26,6 +28,7 @@ class PredictPackage(Command):
                 self.labels_uri,
                 self.image_uris,
                 update_stats=self.update_stats,
-                channel_order=self.channel_order)
+                channel_order=self.channel_order,
+                approximate_stats=self.approximate_stats)
             command = predict_builder.build(config)
             command.run()
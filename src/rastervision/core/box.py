@@ -12,6 +12,8 @@ class BoxSizeError(ValueError):
 class Box():
     """A multi-purpose box (ie. rectangle)."""
 
+    __slots__ = ['ymin', 'xmin', 'ymax', 'xmax']
+
     def __init__(self, ymin, xmin, ymax, xmax):
         """Construct a bounding box.
 
@@ -74,11 +76,9 @@ class Box():
     @staticmethod
     def to_npboxes(boxes):
         """Return nx4 numpy array from list of Box."""
-        nb_boxes = len(boxes)
-        npboxes = np.empty((nb_boxes, 4))
-        for boxind, box in enumerate(boxes):
-            npboxes[boxind, :] = box.npbox_format()
-        return npboxes
+        return np.array(
+            [box.tuple_format() for box in boxes], dtype=np.float64).reshape(
+                -1, 4)
 
     def __str__(self):
         return str(self.npbox_format())
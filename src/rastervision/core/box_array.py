@@ -0,0 +1,286 @@
+import numpy as np
+
+from rastervision.core.box import Box, BoxSizeError
+
+# Number of boxes to materialize into Box objects at a time when iterating.
+ITER_CHUNK_SIZE = 1024
+
+
+class BoxArray(object):
+    """A set of boxes stored as columns of an nx4 numpy array.
+
+    This is a compact alternative to a list of Boxes with vectorized versions
+    of the geometric operations on Box. Box objects are only created lazily
+    when iterating or indexing.
+    """
+
+    def __init__(self, npboxes):
+        """Construct a new BoxArray.
+
+        Args:
+            npboxes: numpy array of size nx4 with cols ymin, xmin, ymax, xmax
+        """
+        npboxes = np.asarray(npboxes)
+        if npboxes.dtype.kind not in 'iuf':
+            npboxes = npboxes.astype(np.float64)
+        self.npboxes = npboxes.reshape(-1, 4)
+
+    @staticmethod
+    def from_boxes(boxes):
+        """Return BoxArray with the coordinates of a list of Boxes.
+
+        Args:
+            boxes: list of Box, BoxArray or WindowGrid
+        """
+        if isinstance(boxes, BoxArray):
+            return boxes
+        if hasattr(boxes, 'get_npboxes'):
+            return BoxArray(boxes.get_npboxes())
+        npboxes = [box.tuple_format() for box in boxes]
+        if len(npboxes) == 0:
+            return BoxArray.make_empty()
+        # Integer coordinates are kept as integers.
+        return BoxArray(np.array(npboxes))
+
+    @staticmethod
+    def make_empty():
+        return BoxArray(np.empty((0, 4)))
+
+    def get_npboxes(self):
+        return self.npboxes
+
+    def get_boxes(self):
+        """Return list of Boxes."""
+        return [Box(*npbox) for npbox in self.npboxes.tolist()]
+
+    def __len__(self):
+        return self.npboxes.shape[0]
+
+    def __iter__(self):
+        for start in range(0, len(self), ITER_CHUNK_SIZE):
+            chunk = self.npboxes[start:start + ITER_CHUNK_SIZE].tolist()
+            for npbox in chunk:
+                yield Box(*npbox)
+
+    def __getitem__(self, key):
+        """Return a Box for an int key, or a BoxArray otherwise.
+
+        Args:
+            key: int, slice, boolean mask or array of indices
+        """
+        if isinstance(key, (int, np.integer)):
+            return Box(*self.npboxes[key].tolist())
+        return BoxArray(self.npboxes[key])
+
+    @property
+    def ymins(self):
+        return self.npboxes[:, 0]
+
+    @property
+    def xmins(self):
+        return self.npboxes[:, 1]
+
+    @property
+    def ymaxs(self):
+        return self.npboxes[:, 2]
+
+    @property
+    def xmaxs(self):
+        return self.npboxes[:, 3]
+
+    def get_heights(self):
+        return self.ymaxs - self.ymins
+
+    def get_widths(self):
+        return self.xmaxs - self.xmins
+
+    def get_areas(self):
+        return self.get_heights() * self.get_widths()
+
+    def get_intersection_areas(self, other):
+        """Return matrix of intersection areas with another set of boxes.
+
+        Args:
+            other: Box or BoxArray with m boxes
+
+        Returns:
+            nxm numpy array where entry i, j is the area of the intersection
+                of box i in this BoxArray and box j in other
+        """
+        other = _as_box_array(other)
+        heights = (np.minimum(self.ymaxs[:, np.newaxis], other.ymaxs) -
+                   np.maximum(self.ymins[:, np.newaxis], other.ymins))
+        widths = (np.minimum(self.xmaxs[:, np.newaxis], other.xmaxs) -
+                  np.maximum(self.xmins[:, np.newaxis], other.xmins))
+        return np.maximum(heights, 0) * np.maximum(widths, 0)
+
+    def get_ioas(self, other):
+        """Return matrix of intersection over area of this BoxArray's boxes.
+
+        The denominator is the area of the boxes in this BoxArray, so entries
+        for empty boxes are NaN.
+
+        Args:
+            other: Box or BoxArray with m boxes
+
+        Returns:
+            nxm float numpy array
+        """
+        intersections = self.get_intersection_areas(other)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return intersections / self.get_areas()[:, np.newaxis]
+
+    def get_ious(self, other):
+        """Return matrix of intersection over union with another set of boxes.
+
+        Args:
+            other: Box or BoxArray with m boxes
+
+        Returns:
+            nxm float numpy array
+        """
+        other = _as_box_array(other)
+        intersections = self.get_intersection_areas(other)
+        unions = (self.get_areas()[:, np.newaxis] + other.get_areas() -
+                  intersections)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return intersections / unions
+
+    def intersection(self, other):
+        """Return the intersection of each box with a Box.
+
+        Like Box.intersection, boxes that do not overlap with other result in
+        boxes with negative height or width.
+
+        Args:
+            other: Box
+
+        Returns:
+            BoxArray
+        """
+        return BoxArray(
+            np.stack(
+                [
+                    np.maximum(self.ymins, other.ymin),
+                    np.maximum(self.xmins, other.xmin),
+                    np.minimum(self.ymaxs, other.ymax),
+                    np.minimum(self.xmaxs, other.xmax)
+                ],
+                axis=1))
+
+    def clip(self, extent):
+        """Return BoxArray with each box clipped to lie within extent.
+
+        Boxes that lie outside the extent end up with zero area.
+
+        Args:
+            extent: Box
+        """
+        npboxes = np.empty(self.npboxes.shape, dtype=np.float64)
+        np.clip(self.ymins, extent.ymin, extent.ymax, out=npboxes[:, 0])
+        np.clip(self.xmins, extent.xmin, extent.xmax, out=npboxes[:, 1])
+        np.clip(self.ymaxs, extent.ymin, extent.ymax, out=npboxes[:, 2])
+        np.clip(self.xmaxs, extent.xmin, extent.xmax, out=npboxes[:, 3])
+        return BoxArray(npboxes)
+
+    def make_eroded(self, erosion_size):
+        """Return BoxArray whose sides are eroded by erosion_size."""
+        return BoxArray(self.npboxes + np.array(
+            [erosion_size, erosion_size, -erosion_size, -erosion_size]))
+
+    def make_buffer(self, buffer_size, max_extent):
+        """Return BoxArray whose sides are buffered by buffer_size.
+
+        This is equivalent to calling Box.make_buffer on each box.
+
+        Args:
+            buffer_size: if < 1, the fraction of the height and width of each
+                box to buffer by, otherwise the number of pixels
+            max_extent: Box whose height and width the buffered boxes are
+                clipped to
+        """
+        buffer_size = max(0., buffer_size)
+        if buffer_size < 1.:
+            delta_widths = np.round(buffer_size * self.get_widths())
+            delta_heights = np.round(buffer_size * self.get_heights())
+        else:
+            delta_heights = delta_widths = np.full(
+                (len(self), ), round(buffer_size), dtype=np.float64)
+
+        npboxes = np.stack(
+            [
+                np.maximum(0, np.floor(self.ymins - delta_heights)),
+                np.maximum(0, np.floor(self.xmins - delta_widths)),
+                np.minimum(max_extent.get_height(),
+                           np.trunc(self.ymaxs) + delta_heights),
+                np.minimum(max_extent.get_width(),
+                           np.trunc(self.xmaxs) + delta_widths)
+            ],
+            axis=1)
+        return BoxArray(npboxes.astype(np.int64))
+
+    def make_pixel_containers(self):
+        """Return BoxArray of the smallest boxes with integer coordinates
+        which contain the boxes in self.
+
+        This is the block of pixels each box touches.
+        """
+        npboxes = np.stack(
+            [
+                np.floor(self.ymins),
+                np.floor(self.xmins),
+                np.ceil(self.ymaxs),
+                np.ceil(self.xmaxs)
+            ],
+            axis=1)
+        return BoxArray(npboxes.astype(np.int64))
+
+    def make_random_square_containers(self, size):
+        """Return square BoxArray where each box contains the box in self.
+
+        Each box is first expanded to its pixel container, so the new boxes
+        have integer coordinates. For boxes with integer coordinates, this
+        is equivalent to calling Box.make_random_square_container on each
+        box.
+
+        Args:
+            size: the width and height of the new boxes
+
+        Raises:
+            BoxSizeError: if the pixel container of any box is bigger than
+                size
+        """
+        containers = self.make_pixel_containers()
+        if np.any(containers.get_widths() > size):
+            raise BoxSizeError('size of random container cannot be < width')
+
+        if np.any(containers.get_heights() > size):
+            raise BoxSizeError('size of random container cannot be < height')
+
+        rand_ys = containers.ymins - np.random.randint(
+            0, size - containers.get_heights() + 1)
+        rand_xs = containers.xmins - np.random.randint(
+            0, size - containers.get_widths() + 1)
+
+        return BoxArray(
+            np.stack(
+                [rand_ys, rand_xs, rand_ys + size, rand_xs + size], axis=1))
+
+    def get_geojson_coordinates(self):
+        """Return coordinates of boxes in format of Box.geojson_coordinates.
+
+        Returns:
+            nx5x2 numpy array of (x, y) points
+        """
+        # Compass directions as in Box.geojson_coordinates.
+        nw = np.stack([self.xmins, self.ymins], axis=1)
+        ne = np.stack([self.xmins, self.ymaxs], axis=1)
+        se = np.stack([self.xmaxs, self.ymaxs], axis=1)
+        sw = np.stack([self.xmaxs, self.ymins], axis=1)
+        return np.stack([nw, ne, se, sw, nw], axis=1)
+
+
+def _as_box_array(boxes):
+    if isinstance(boxes, Box):
+        return BoxArray(np.array(boxes.tuple_format(), dtype=np.float64))
+    return BoxArray.from_boxes(boxes)
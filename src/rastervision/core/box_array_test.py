@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+
+from rastervision.core.box import Box, BoxSizeError
+from rastervision.core.box_array import BoxArray
+
+np.random.seed(1)
+
+
+class TestBoxArray(unittest.TestCase):
+    def setUp(self):
+        self.boxes = [
+            Box(0, 0, 10, 10),
+            Box(5, 5, 20, 15),
+            Box(30, 30, 32, 35),
+            Box(8, 2, 8, 6)
+        ]
+        self.box_array = BoxArray.from_boxes(self.boxes)
+
+    def test_from_boxes(self):
+        self.assertEqual(len(self.box_array), 4)
+        self.assertListEqual(self.box_array.get_boxes(), self.boxes)
+        self.assertListEqual(list(self.box_array), self.boxes)
+        self.assertEqual(self.box_array[1], self.boxes[1])
+        self.assertListEqual(self.box_array[1:3].get_boxes(), self.boxes[1:3])
+        self.assertEqual(len(BoxArray.from_boxes([])), 0)
+
+    def test_get_areas(self):
+        np.testing.assert_array_equal(self.box_array.get_areas(),
+                                      [box.get_area() for box in self.boxes])
+
+    def test_intersection(self):
+        window = Box(4, 4, 12, 12)
+        self.assertListEqual(
+            self.box_array.intersection(window).get_boxes(),
+            [box.intersection(window) for box in self.boxes])
+
+    def test_get_ioas(self):
+        windows = BoxArray.from_boxes([Box(0, 0, 10, 5), Box(0, 0, 50, 50)])
+        ioas = self.box_array.get_ioas(windows)
+        self.assertEqual(ioas.shape, (4, 2))
+        np.testing.assert_allclose(ioas[0:3, :],
+                                   [[0.5, 1.0], [0.0, 1.0], [0.0, 1.0]])
+        # The IOA of an empty box is undefined.
+        self.assertTrue(np.all(np.isnan(ioas[3, :])))
+
+    def test_get_ious(self):
+        ious = self.box_array.get_ious(Box(0, 0, 10, 5))
+        np.testing.assert_allclose(ious[:, 0], [0.5, 0.0, 0.0, 0.0])
+
+    def test_clip(self):
+        clipped = self.box_array.clip(Box(0, 0, 12, 12))
+        np.testing.assert_array_equal(
+            clipped.get_npboxes(),
+            [[0, 0, 10, 10], [5, 5, 12, 12], [12, 12, 12, 12], [8, 2, 8, 6]])
+
+    def test_make_eroded(self):
+        self.assertListEqual(
+            self.box_array.make_eroded(1).get_boxes(),
+            [box.make_eroded(1) for box in self.boxes])
+
+    def test_make_buffer(self):
+        extent = Box(0, 0, 33, 40)
+        for buffer_size in [0.5, 0.25, 3, 10]:
+            self.assertListEqual(
+                self.box_array.make_buffer(buffer_size, extent).get_boxes(),
+                [box.make_buffer(buffer_size, extent) for box in self.boxes])
+
+    def test_make_random_square_containers(self):
+        size = 20
+        containers = self.box_array.make_random_square_containers(size)
+        np.testing.assert_array_equal(containers.get_heights(), size)
+        np.testing.assert_array_equal(containers.get_widths(), size)
+        np.testing.assert_array_equal(
+            self.box_array.get_ioas(containers).diagonal()[0:3], 1.0)
+
+        with self.assertRaises(BoxSizeError):
+            self.box_array.make_random_square_containers(10)
+
+    def test_make_random_square_containers_fractional(self):
+        box_array = BoxArray(
+            np.array([[5.5, 5.5, 15.9, 15.9], [0.2, 3.7, 1.1, 4.0]]))
+        np.testing.assert_array_equal(
+            box_array.make_pixel_containers().get_npboxes(),
+            [[5, 5, 16, 16], [0, 3, 2, 4]])
+        for _ in range(100):
+            containers = box_array.make_random_square_containers(11)
+            np.testing.assert_array_equal(containers.get_heights(), 11)
+            np.testing.assert_array_equal(
+                box_array.get_ioas(containers).diagonal(), 1.0)
+        np.testing.assert_array_equal(containers.get_npboxes()[0],
+                                      [5, 5, 16, 16])
+
+        # The box is 10.4 wide, but covers 11 pixels.
+        with self.assertRaises(BoxSizeError):
+            box_array.make_random_square_containers(10)
+
+    def test_get_geojson_coordinates(self):
+        coordinates = self.box_array.get_geojson_coordinates()
+        self.assertEqual(coordinates.shape, (4, 5, 2))
+        for box, box_coordinates in zip(self.boxes, coordinates.tolist()):
+            self.assertListEqual([tuple(p) for p in box_coordinates],
+                                 box.geojson_coordinates())
+
+
+if __name__ == '__main__':
+    unittest.main()
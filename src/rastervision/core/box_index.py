@@ -0,0 +1,123 @@
+import numpy as np
+
+# Boxes that span more than this many cells along either axis are not
+# bucketed, and are instead returned as candidates for every query.
+MAX_CELLS_PER_BOX = 4
+
+
+class BoxIndex(object):
+    """A spatial index over a set of boxes using a uniform grid of buckets.
+
+    Each box is added to the bucket of every grid cell that it overlaps with.
+    The buckets are stored in compressed sparse row format: the indices of the
+    boxes sorted by cell, and the offset of each cell into that array.
+    Querying a window only touches the buckets of the cells it overlaps with.
+    """
+
+    def __init__(self, npboxes, cell_size=None):
+        """Construct a new BoxIndex.
+
+        Args:
+            npboxes: numpy array of size nx4 with cols ymin, xmin, ymax, xmax
+            cell_size: (float) height and width of grid cells. If None, it is
+                set to twice the 90th percentile of box heights and widths.
+                It is increased if needed so that the grid has at most about
+                MAX_CELLS_PER_BOX cells per box.
+        """
+        npboxes = np.asarray(npboxes, dtype=np.float64).reshape(-1, 4)
+        self.nb_boxes = npboxes.shape[0]
+
+        if self.nb_boxes == 0:
+            self.cell_size = 1.0
+            self.origin = np.zeros(2)
+            self.nb_rows = self.nb_cols = 0
+            self.box_inds = np.empty((0, ), dtype=np.int64)
+            self.offsets = np.zeros((1, ), dtype=np.int64)
+            self.large_box_inds = np.empty((0, ), dtype=np.int64)
+            return
+
+        if cell_size is None:
+            sizes = np.concatenate(
+                [npboxes[:, 2] - npboxes[:, 0], npboxes[:, 3] - npboxes[:, 1]])
+            cell_size = 2 * np.percentile(sizes, 90)
+        self.origin = npboxes[:, 0:2].min(axis=0)
+        # Bound the number of cells (and memory used by offsets) for sparse
+        # sets of boxes spread over a large area.
+        span = npboxes[:, 2:4].max(axis=0) - self.origin
+        min_cell_size = np.sqrt(
+            span[0] * span[1] / (MAX_CELLS_PER_BOX * self.nb_boxes))
+        self.cell_size = max(float(cell_size), min_cell_size, 1.0)
+
+        row_starts, col_starts = self._get_cells(npboxes[:, 0:2])
+        row_ends, col_ends = self._get_cells(npboxes[:, 2:4])
+        # Boxes with negative height or width are put in a single row or col.
+        row_ends = np.maximum(row_ends, row_starts)
+        col_ends = np.maximum(col_ends, col_starts)
+        self.nb_rows = int(row_ends.max()) + 1
+        self.nb_cols = int(col_ends.max()) + 1
+
+        nb_box_rows = row_ends - row_starts + 1
+        nb_box_cols = col_ends - col_starts + 1
+        is_large = ((nb_box_rows > MAX_CELLS_PER_BOX) |
+                    (nb_box_cols > MAX_CELLS_PER_BOX))
+        self.large_box_inds = np.flatnonzero(is_large)
+
+        # Make one (cell, box) entry for each cell a small box overlaps with.
+        small_box_inds = np.flatnonzero(~is_large)
+        nb_box_rows = nb_box_rows[small_box_inds]
+        nb_box_cols = nb_box_cols[small_box_inds]
+        nb_box_cells = nb_box_rows * nb_box_cols
+        entry_box_inds = np.repeat(small_box_inds, nb_box_cells)
+        # Position of each entry within the cells of its box.
+        entry_starts = np.cumsum(nb_box_cells) - nb_box_cells
+        entry_pos = (np.arange(len(entry_box_inds)) - np.repeat(
+            entry_starts, nb_box_cells))
+        entry_nb_cols = np.repeat(nb_box_cols, nb_box_cells)
+        entry_rows = row_starts[entry_box_inds] + entry_pos // entry_nb_cols
+        entry_cols = col_starts[entry_box_inds] + entry_pos % entry_nb_cols
+        entry_cells = entry_rows * self.nb_cols + entry_cols
+
+        order = np.argsort(entry_cells, kind='stable')
+        self.box_inds = entry_box_inds[order]
+        cell_counts = np.bincount(
+            entry_cells, minlength=self.nb_rows * self.nb_cols)
+        self.offsets = np.concatenate([[0], np.cumsum(cell_counts)])
+
+    def _get_cells(self, points):
+        """Return (rows, cols) of the grid cells containing (y, x) points."""
+        cells = np.floor(
+            (points - self.origin) / self.cell_size).astype(np.int64)
+        return cells[:, 0], cells[:, 1]
+
+    def query(self, window):
+        """Return indices of boxes which may overlap with a window.
+
+        The result is a superset of the boxes that overlap with the window,
+        so an exact test should be run on the candidates.
+
+        Args:
+            window: Box
+
+        Returns:
+            sorted int numpy array of indices into the boxes
+        """
+        if self.nb_boxes == 0:
+            return np.empty((0, ), dtype=np.int64)
+
+        (row_start, ), (col_start, ) = self._get_cells(
+            np.array([[window.ymin, window.xmin]], dtype=np.float64))
+        (row_end, ), (col_end, ) = self._get_cells(
+            np.array([[window.ymax, window.xmax]], dtype=np.float64))
+        row_start = max(row_start, 0)
+        col_start = max(col_start, 0)
+        row_end = min(row_end, self.nb_rows - 1)
+        col_end = min(col_end, self.nb_cols - 1)
+
+        candidates = [self.large_box_inds]
+        if row_start <= row_end and col_start <= col_end:
+            # The cells in each row of the window are contiguous.
+            for row in range(row_start, row_end + 1):
+                start = self.offsets[row * self.nb_cols + col_start]
+                end = self.offsets[row * self.nb_cols + col_end + 1]
+                candidates.append(self.box_inds[start:end])
+        return np.unique(np.concatenate(candidates))
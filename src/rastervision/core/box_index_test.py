@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.box_array import BoxArray
+from rastervision.core.box_index import BoxIndex
+
+
+class TestBoxIndex(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(1)
+        nb_boxes = 500
+        ymins = np.random.uniform(0, 1000, nb_boxes)
+        xmins = np.random.uniform(0, 1000, nb_boxes)
+        sizes = np.random.uniform(1, 30, (nb_boxes, 2))
+        # Add some boxes that are much bigger than the rest.
+        sizes[0:5, :] = 400
+        self.npboxes = np.stack(
+            [ymins, xmins, ymins + sizes[:, 0], xmins + sizes[:, 1]], axis=1)
+        self.index = BoxIndex(self.npboxes)
+
+    def test_query(self):
+        box_array = BoxArray(self.npboxes)
+        windows = [
+            Box(0, 0, 100, 100),
+            Box(450.5, 300, 650.5, 500),
+            Box(900, 900, 1500, 1500),
+            Box(-100, -100, 10, 10),
+            Box(2000, 2000, 2100, 2100)
+        ]
+        for window in windows:
+            candidates = self.index.query(window)
+            overlapping = np.flatnonzero(
+                box_array.get_intersection_areas(window)[:, 0] > 0)
+            self.assertTrue(set(overlapping).issubset(set(candidates)))
+            self.assertTrue(np.all(np.diff(candidates) > 0))
+
+        # Queries only touch nearby boxes.
+        self.assertLess(len(self.index.query(Box(0, 0, 50, 50))), 50)
+
+    def test_empty(self):
+        index = BoxIndex(np.empty((0, 4)))
+        self.assertEqual(len(index.query(Box(0, 0, 10, 10))), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class CRSTransformer(object):
     """Transforms map points in some CRS into pixel coordinates.
 
@@ -24,3 +27,36 @@ class CRSTransformer(object):
             (x, y) tuple in map coordinates (eg. lon/lat)
         """
         pass
+
+    def map_to_pixel_array(self, map_points):
+        """Transform array of points from map to pixel-based coordinates.
+
+        This calls map_to_pixel on each point, and should be overridden with
+        a vectorized implementation.
+
+        Args:
+            map_points: nx2 array-like of (x, y) points in map coordinates
+
+        Returns:
+            nx2 numpy array of (x, y) points in pixel coordinates
+        """
+        map_points = np.asarray(map_points, dtype=np.float64).reshape(-1, 2)
+        return np.array([self.map_to_pixel(p)
+                         for p in map_points.tolist()]).reshape(-1, 2)
+
+    def pixel_to_map_array(self, pixel_points):
+        """Transform array of points from pixel to map-based coordinates.
+
+        This calls pixel_to_map on each point, and should be overridden with
+        a vectorized implementation.
+
+        Args:
+            pixel_points: nx2 array-like of (x, y) points in pixel coordinates
+
+        Returns:
+            nx2 numpy array of (x, y) points in map coordinates
+        """
+        pixel_points = np.asarray(
+            pixel_points, dtype=np.float64).reshape(-1, 2)
+        return np.array([self.pixel_to_map(p)
+                         for p in pixel_points.tolist()]).reshape(-1, 2)
@@ -50,3 +50,12 @@ class LabelStore(ABC):
     def save(self):
         """Save."""
         pass
+
+    def abort(self):
+        """Keep the labels added so far after a failure.
+
+        This is called when making predictions fails partway through a
+        scene. Label stores that write labels as they are added should close
+        and save what has been written. By default, this does nothing.
+        """
+        pass
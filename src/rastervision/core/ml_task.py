@@ -1,10 +1,9 @@
 from abc import abstractmethod
+from itertools import islice
 
 from rastervision.core.training_data import TrainingData
 from rastervision.core.predict_package import save_predict_package
-from rastervision.ml_tasks.utils import is_window_inside_aoi
-
-import numpy as np
+from rastervision.core.window_grid import WindowGrid
 
 # TODO: DRY... same keys as in ml_backends/tf_object_detection_aip.py
 TRAIN = 'train'
@@ -39,7 +38,7 @@ class MLTask(object):
             options: TrainConfig.Options
 
         Returns:
-            list of Boxes
+            list of Boxes or WindowGrid
         """
         pass
 
@@ -69,6 +68,21 @@ class MLTask(object):
         """
         pass
 
+    def make_streaming_post_processor(self, options):
+        """Return object for post-processing predictions as they are made.
+
+        If this returns None, predictions for a scene are accumulated in the
+        prediction label store and post_process_predictions is run on all of
+        them at the end. Otherwise, the returned object is used instead. It
+        should have an add(labels, frontier) method where all windows
+        predicted after the call lie below the frontier y coordinate, and a
+        get_labels() method which returns the post-processed Labels.
+
+        Args:
+            options: PredictConfig.Options
+        """
+        return None
+
     @abstractmethod
     def get_predict_windows(self, extent, options):
         """Return windows to compute predictions for.
@@ -78,7 +92,7 @@ class MLTask(object):
             options: PredictConfig.Options
 
         Returns:
-            list of Boxes
+            iterable of Boxes (eg. WindowGrid) ordered by ymin
         """
         pass
 
@@ -121,11 +135,9 @@ class MLTask(object):
                 'Making {} chips for scene: {}'.format(type_, scene.id),
                 end='',
                 flush=True)
-            windows = self.get_train_windows(scene, options)
-            aoi_windows = [
-                window for window in windows
-                if is_window_inside_aoi(window, scene.aoi_polygons)
-            ]
+            windows = WindowGrid.from_boxes(
+                self.get_train_windows(scene, options))
+            aoi_windows = windows.filter_inside_aoi(scene.aoi_polygons)
 
             for window in aoi_windows:
                 chip = scene.raster_source.get_chip(window)
@@ -176,38 +188,60 @@ class MLTask(object):
             raster_source = scene.raster_source
             label_store = scene.prediction_label_store
             label_store.clear()
+            post_processor = self.make_streaming_post_processor(options)
 
             windows = self.get_predict_windows(raster_source.get_extent(),
                                                options)
 
-            def predict_batch(predict_chips, predict_windows):
-                labels = self.backend.predict(
-                    np.array(predict_chips), predict_windows, options)
-                label_store.extend(labels)
+            def predict_batch(predict_chips, predict_windows, frontier):
+                labels = self.backend.predict(predict_chips, predict_windows,
+                                              options)
+                if post_processor is None:
+                    label_store.extend(labels)
+                else:
+                    post_processor.add(labels, frontier)
                 print('.' * len(predict_chips), end='', flush=True)
 
-            batch_chips, batch_windows = [], []
-            for window in windows:
-                chip = raster_source.get_chip(window)
-                if np.any(chip):
-                    batch_chips.append(chip)
-                    batch_windows.append(window)
-
-                # Predict on batch
-                if len(batch_chips) >= options.batch_size:
-                    predict_batch(batch_chips, batch_windows)
-                    batch_chips, batch_windows = [], []
-
-            # Predict on remaining batch
-            if len(batch_chips) > 0:
-                predict_batch(batch_chips, batch_windows)
+            # Save the predictions that have been written if something goes
+            # wrong, so that a failed scene leaves partial output.
+            try:
+                windows = iter(windows)
+                next_batch_windows = list(islice(windows, options.batch_size))
+                while len(next_batch_windows) > 0:
+                    batch_windows = next_batch_windows
+                    next_batch_windows = list(
+                        islice(windows, options.batch_size))
+                    # Windows are ordered by ymin, so the remaining windows lie
+                    # below the first one in the next batch.
+                    frontier = (next_batch_windows[0].ymin
+                                if next_batch_windows else None)
+                    batch_chips = raster_source.get_chips(batch_windows)
+
+                    # Skip empty chips.
+                    is_nonempty = batch_chips.reshape(len(batch_windows),
+                                                      -1).any(axis=1)
+                    if not is_nonempty.all():
+                        batch_chips = batch_chips[is_nonempty]
+                        batch_windows = [
+                            window for window, nonempty in zip(
+                                batch_windows, is_nonempty) if nonempty
+                        ]
+
+                    if len(batch_windows) > 0:
+                        predict_batch(batch_chips, batch_windows, frontier)
+            except BaseException:
+                label_store.abort()
+                raise
 
             print()
 
             # This is needed for object detection and classification,
             # is a nop for segmentation.
-            labels = self.post_process_predictions(label_store.get_labels(),
-                                                   options)
+            if post_processor is None:
+                labels = self.post_process_predictions(
+                    label_store.get_labels(), options)
+            else:
+                labels = post_processor.get_labels()
 
             # This is needed for object detection and classification,
             # is a nop for segmentation.
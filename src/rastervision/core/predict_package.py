@@ -74,6 +74,10 @@ def make_scene_config(scene_template,
     if label_store.HasField('object_detection_geojson_file'):
         label_store.object_detection_geojson_file.uri = \
             labels_uri
+    elif label_store.HasField('object_detection_npz_file'):
+        label_store.object_detection_npz_file.uri = labels_uri
+    elif label_store.HasField('object_detection_sqlite_file'):
+        label_store.object_detection_sqlite_file.uri = labels_uri
     elif label_store.HasField('classification_geojson_file'):
         label_store.classification_geojson_file.uri = \
             labels_uri
@@ -93,19 +97,27 @@ def make_scene_config(scene_template,
     return scene
 
 
-def update_stats_file(image_uris, stats_path):
+def update_stats_file(image_uris, stats_path, approximate=False):
     """Write a raster stats file for a set of images.
 
     Args:
         image_uris: list of URIs of GeoTIFF files
         stats_path: path to write raster stats to
+        approximate: if True, estimate the stats from the lowest resolution
+            overview (or a sample of windows if there are no overviews)
+            instead of reading every pixel
 
     """
     raster_transformer = RasterTransformer()
     raster_sources = [GeoTiffFiles(raster_transformer, image_uris)]
 
     stats = RasterStats()
-    stats.compute(raster_sources)
+    if approximate:
+        stats.compute_approximate(raster_sources, use_overviews=True)
+        print('Estimated standard errors of means: {} and stds: {}'.format(
+            stats.mean_errors, stats.std_errors))
+    else:
+        stats.compute(raster_sources)
     stats.save(stats_path)
 
 
@@ -114,7 +126,8 @@ def load_predict_package(predict_package_uri,
                          labels_uri,
                          image_uris,
                          update_stats=False,
-                         channel_order=None):
+                         channel_order=None,
+                         approximate_stats=False):
     """Load a prediction package to make predictions on new images.
 
     Downloads prediction package, unzips it, and returns a predict_config for
@@ -129,6 +142,8 @@ def load_predict_package(predict_package_uri,
         update_stats: if True, compute raster stats for image_uris and update
             raster stats file
         channel_order: if not None, list of channel indices to use
+        approximate_stats: if True and update_stats is True, estimate the
+            raster stats instead of computing them exactly
 
     Returns:
         (rastervision.protos.predict_pb2.PredictConfig)
@@ -165,6 +180,7 @@ def load_predict_package(predict_package_uri,
 
     # Update stats file.
     if update_stats:
-        update_stats_file(image_uris, stats_path)
+        update_stats_file(
+            image_uris, stats_path, approximate=approximate_stats)
 
     return config
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class RasterSource(ABC):
     """A source of raster data.
@@ -50,11 +52,44 @@ class RasterSource(ABC):
         chip = self._get_chip(window)
         return self.raster_transformer.transform(chip)
 
+    def get_chips(self, windows):
+        """Return the transformed chips in a list of windows.
+
+        The raw chips are read into a single array which is then transformed
+        as a batch.
+
+        Args:
+            windows: list of Boxes which all have the same height and width
+
+        Returns:
+            [len(windows), height, width, channels] numpy array
+        """
+        raw_chips = None
+        for window_ind, window in enumerate(windows):
+            chip = self._get_chip(window)
+            if raw_chips is None:
+                raw_chips = np.empty(
+                    (len(windows), ) + chip.shape, dtype=chip.dtype)
+            raw_chips[window_ind] = chip
+        return self.raster_transformer.transform_batch(raw_chips)
+
     @abstractmethod
     def get_crs_transformer(self):
         """Return the associated CRSTransformer."""
         pass
 
+    def get_overview_array(self):
+        """Return the lowest resolution overview of the RasterSource.
+
+        This is useful for quickly approximating properties of the whole
+        raster. RasterSources that have overviews should override this.
+
+        Returns:
+            [height, width, channels] numpy array or None if there are no
+                overviews
+        """
+        return None
+
     def get_image_array(self):
         """Return entire image array.
 
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.raster_source import RasterSource
+from rastervision.core.raster_stats import RasterStats
+from rastervision.core.raster_transformer import RasterTransformer
+
+
+class MockRasterSource(RasterSource):
+    def __init__(self, data, raster_transformer):
+        self.data = data
+        super().__init__(raster_transformer)
+
+    def get_extent(self):
+        return Box(0, 0, self.data.shape[0], self.data.shape[1])
+
+    def _get_chip(self, window):
+        chip = np.zeros(
+            (window.get_height(), window.get_width(), self.data.shape[2]),
+            dtype=self.data.dtype)
+        data = self.data[window.ymin:window.ymax, window.xmin:window.xmax, :]
+        chip[0:data.shape[0], 0:data.shape[1], :] = data
+        return chip
+
+    def get_crs_transformer(self):
+        return None
+
+
+class TestRasterSource(unittest.TestCase):
+    def test_get_chips(self):
+        np.random.seed(1)
+        raster_stats = RasterStats()
+        raster_stats.means = [1000.0, 2000.0, 3000.0]
+        raster_stats.stds = [300.0, 100.0, 1000.0]
+        raster_transformer = RasterTransformer(
+            channel_order=[2, 0], raster_stats=raster_stats)
+        data = np.random.randint(0, 5000, (10, 12, 3)).astype(np.uint16)
+        raster_source = MockRasterSource(data, raster_transformer)
+
+        # The last window hangs off the edge of the extent.
+        windows = [
+            Box.make_square(0, 0, 4),
+            Box.make_square(3, 5, 4),
+            Box.make_square(8, 10, 4)
+        ]
+        chips = raster_source.get_chips(windows)
+        self.assertEqual(chips.shape, (3, 4, 4, 2))
+        self.assertEqual(chips.dtype, np.uint8)
+        np.testing.assert_equal(
+            chips,
+            np.stack([raster_source.get_chip(window) for window in windows]))
+        np.testing.assert_equal(chips[2, 2:, :, :], 0)
+        np.testing.assert_equal(chips[2, :, 2:, :], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
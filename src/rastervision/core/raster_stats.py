@@ -1,50 +1,341 @@
 import json
+import math
+import random
 
 import numpy as np
-from npstreams import imean, istd, last
 
+from rastervision.core.box import Box
+from rastervision.core.window_grid import WindowGrid
 from rastervision.utils.files import str_to_file, file_to_str
 
 
+class RunningStats(object):
+    """Per-channel count, mean and M2 accumulators.
+
+    Uses Welford's algorithm (batched using the parallel variant due to Chan
+    et al.) so that the stats for all channels are computed in one streaming
+    pass over the chips. Partial stats computed separately (eg. one per
+    RasterSource in different processes) can be merged exactly.
+    """
+
+    def __init__(self):
+        self.counts = None
+        self.means = None
+        self.m2s = None
+
+    def update(self, chip):
+        """Update the stats with the pixels in a chip.
+
+        Values equal to zero are considered NODATA and are ignored.
+
+        Args:
+            chip: [height, width, channels] numpy array
+        """
+        nb_channels = chip.shape[-1]
+        pixels = chip.reshape(-1, nb_channels).astype(np.float64)
+
+        # Ignore NODATA values.
+        mask = pixels != 0.0
+        chip_counts = mask.sum(axis=0).astype(np.float64)
+        safe_counts = np.maximum(chip_counts, 1.0)
+        chip_means = pixels.sum(axis=0) / safe_counts
+        pixels -= chip_means
+        pixels *= mask
+        chip_m2s = np.einsum('ij,ij->j', pixels, pixels)
+
+        self._merge(chip_counts, chip_means, chip_m2s)
+
+    def _init(self, nb_channels):
+        self.counts = np.zeros(nb_channels)
+        self.means = np.zeros(nb_channels)
+        self.m2s = np.zeros(nb_channels)
+
+    def merge(self, other):
+        """Merge the stats of another RunningStats into this one.
+
+        Args:
+            other: RunningStats
+        """
+        if other.counts is not None:
+            self._merge(other.counts, other.means, other.m2s)
+
+    def _merge(self, counts, means, m2s):
+        if self.counts is None:
+            self._init(len(counts))
+
+        total_counts = self.counts + counts
+        safe_counts = np.maximum(total_counts, 1.0)
+        deltas = means - self.means
+        self.means = self.means + deltas * counts / safe_counts
+        self.m2s = (
+            self.m2s + m2s + deltas**2 * self.counts * counts / safe_counts)
+        self.counts = total_counts
+
+    def scale(self, weight):
+        """Weight the stats as if each pixel had been seen weight times.
+
+        The means and stds are unchanged, but the stats count for more (or
+        less) when merged with other stats.
+
+        Args:
+            weight: (float) factor to multiply the counts by
+        """
+        if self.counts is not None:
+            self.counts = self.counts * weight
+            self.m2s = self.m2s * weight
+
+    def to_dict(self):
+        """Return JSON-serializable dict with counts, sums and m2s."""
+        if self.counts is None:
+            return {'counts': None, 'sums': None, 'm2s': None}
+        return {
+            'counts': self.counts.tolist(),
+            'sums': (self.means * self.counts).tolist(),
+            'm2s': self.m2s.tolist()
+        }
+
+    @staticmethod
+    def from_dict(stats_dict):
+        """Make RunningStats from output of to_dict."""
+        running_stats = RunningStats()
+        if stats_dict['counts'] is not None:
+            counts = np.array(stats_dict['counts'], dtype=np.float64)
+            sums = np.array(stats_dict['sums'], dtype=np.float64)
+            running_stats.counts = counts
+            running_stats.means = sums / np.maximum(counts, 1.0)
+            running_stats.m2s = np.array(stats_dict['m2s'], dtype=np.float64)
+        return running_stats
+
+    def _check_nonempty(self):
+        if self.counts is None:
+            raise ValueError(
+                'Cannot get stats before any chips have been added')
+
+    def get_means(self):
+        """Return list of means (NaN for channels with no data).
+
+        Raises:
+            ValueError: if no chips or stats have been added
+        """
+        self._check_nonempty()
+        with np.errstate(invalid='ignore'):
+            means = np.where(self.counts > 0, self.means, np.nan)
+        return means.tolist()
+
+    def get_stds(self):
+        """Return list of (population) stds (NaN for channels with no data).
+
+        Raises:
+            ValueError: if no chips or stats have been added
+        """
+        self._check_nonempty()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stds = np.sqrt(self.m2s / self.counts)
+        return stds.tolist()
+
+
+def compute_partial_stats(raster_source, chip_size=300):
+    """Compute RunningStats over all the chips in a RasterSource.
+
+    Args:
+        raster_source: RasterSource
+        chip_size: (int) size of the windows to read
+
+    Returns:
+        RunningStats
+    """
+    running_stats = RunningStats()
+    windows = WindowGrid.from_extent(raster_source.get_extent(), chip_size,
+                                     chip_size)
+    for window in windows:
+        running_stats.update(raster_source._get_chip(window))
+    return running_stats
+
+
+def jackknife_errors(counts, sums, sumsqs, fpc=1.0):
+    """Estimate the standard errors of means and stds computed from samples.
+
+    Each sample is a window (ie. a cluster of correlated pixels), so the
+    errors are estimated by deleting one window at a time (jackknife) rather
+    than by treating pixels as independent.
+
+    Args:
+        counts: [nb_windows, channels] numpy array of non-NODATA pixel counts
+        sums: [nb_windows, channels] numpy array of sums of pixel values
+        sumsqs: [nb_windows, channels] numpy array of sums of squared pixel
+            values
+        fpc: (float) finite population correction; ie. 1 minus the fraction
+            of windows that were sampled
+
+    Returns:
+        (mean_errors, std_errors) tuple of lists with one value per channel
+    """
+    nb_windows = counts.shape[0]
+    if nb_windows < 2:
+        nb_channels = counts.shape[1]
+        return [float('nan')] * nb_channels, [float('nan')] * nb_channels
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        loo_counts = counts.sum(axis=0) - counts
+        loo_means = (sums.sum(axis=0) - sums) / loo_counts
+        loo_vars = (sumsqs.sum(axis=0) - sumsqs) / loo_counts - loo_means**2
+        loo_stds = np.sqrt(np.maximum(loo_vars, 0.0))
+
+        scale = max(fpc, 0.0) * (nb_windows - 1) / nb_windows
+        mean_errors = np.sqrt(scale * np.nansum(
+            (loo_means - np.nanmean(loo_means, axis=0))**2, axis=0))
+        std_errors = np.sqrt(scale * np.nansum(
+            (loo_stds - np.nanmean(loo_stds, axis=0))**2, axis=0))
+    return mean_errors.tolist(), std_errors.tolist()
+
+
 class RasterStats():
     def __init__(self):
         self.means = None
         self.stds = None
+        # Estimated standard errors of means and stds. Only set when the stats
+        # are computed approximately.
+        self.mean_errors = None
+        self.std_errors = None
+        # Map from fingerprint of a RasterSource to its RunningStats. This is
+        # used to avoid recomputing stats for imagery that has not changed.
+        self.partial_stats = {}
 
     def compute(self, raster_sources):
-        chip_size = 300
-        stride = chip_size
-
-        def chip_stream(channel):
-            for raster_source in raster_sources:
-                windows = raster_source.get_extent().get_windows(
-                    chip_size, stride)
-                for window in windows:
-                    chip = raster_source._get_chip(window).astype(np.float32)
-                    chip = chip[:, :, channel].ravel()
-                    # Ignore NODATA values.
-                    chip[chip == 0.0] = np.nan
-                    yield chip
-
-        # Sniff the number of channels.
-        window = next(raster_sources[0].get_extent().get_windows(
-            chip_size, stride))
-        nb_channels = raster_sources[0]._get_chip(window).shape[2]
-
-        self.means = []
-        self.stds = []
-        for channel in range(nb_channels):
-            mean = last(
-                imean(chip_stream(channel), axis=None, ignore_nan=True))
-            self.means.append(mean)
-            std = last(istd(chip_stream(channel), axis=None, ignore_nan=True))
-            self.stds.append(std)
+        """Compute the per-channel means and stds of a set of RasterSources.
+
+        All channels are computed together in a single pass over the chips of
+        each RasterSource.
+
+        Args:
+            raster_sources: list of RasterSource
+        """
+        self.reduce([
+            compute_partial_stats(raster_source)
+            for raster_source in raster_sources
+        ])
+
+    def reduce(self, partial_stats):
+        """Set the means and stds by merging partial stats.
+
+        Args:
+            partial_stats: list of RunningStats (eg. one per RasterSource)
+        """
+        running_stats = RunningStats()
+        for stats in partial_stats:
+            running_stats.merge(stats)
+
+        self.means = running_stats.get_means()
+        self.stds = running_stats.get_stds()
+        self.mean_errors = None
+        self.std_errors = None
+
+    def compute_approximate(self,
+                            raster_sources,
+                            nb_windows=None,
+                            window_fraction=0.1,
+                            use_overviews=False,
+                            chip_size=300):
+        """Estimate the per-channel means and stds of a set of RasterSources.
+
+        Reads either a random sample of the windows in each RasterSource, or
+        the lowest resolution overview of each RasterSource if use_overviews
+        is True and it has overviews. The pixels read from each RasterSource
+        are weighted by the number of pixels they stand for, so that each
+        RasterSource contributes in proportion to its extent. The estimated
+        standard errors of the means and stds are stored in mean_errors and
+        std_errors.
+
+        Args:
+            raster_sources: list of RasterSource
+            nb_windows: (int) number of windows to sample from each
+                RasterSource. Overrides window_fraction if set.
+            window_fraction: (float) fraction of the windows in each
+                RasterSource to sample
+            use_overviews: (bool) if True, read the lowest resolution overview
+                instead of sampling windows when one is available
+            chip_size: (int) size of the windows to read
+        """
+        running_stats = RunningStats()
+        window_sums = []
+        nb_sampled = 0
+        nb_total = 0
+        used_overviews = False
+
+        def add_chip(chip, source_stats, weight):
+            source_stats.update(chip)
+            pixels = chip.reshape(-1, chip.shape[-1]).astype(np.float64)
+            window_sums.append(
+                (weight * (pixels != 0).sum(axis=0),
+                 weight * pixels.sum(axis=0),
+                 weight * np.einsum('ij,ij->j', pixels, pixels)))
+
+        for raster_source in raster_sources:
+            source_stats = RunningStats()
+            extent = raster_source.get_extent()
+            overview = (raster_source.get_overview_array()
+                        if use_overviews else None)
+            if overview is not None:
+                # Split the overview into blocks to estimate the error.
+                height, width = overview.shape[0:2]
+                weight = (extent.get_height() * extent.get_width() /
+                          (height * width))
+                block_size = max(1, chip_size // 4)
+                blocks = WindowGrid.from_extent(
+                    Box(0, 0, height, width), block_size, block_size)
+                for block in blocks:
+                    add_chip(
+                        overview[block.ymin:block.ymax, block.xmin:
+                                 block.xmax, :], source_stats, weight)
+                used_overviews = True
+            else:
+                windows = WindowGrid.from_extent(extent, chip_size, chip_size)
+                if nb_windows is not None:
+                    nb_samples = nb_windows
+                else:
+                    nb_samples = math.ceil(window_fraction * len(windows))
+                nb_samples = max(1, min(nb_samples, len(windows)))
+                weight = len(windows) / nb_samples
+                sample_inds = random.sample(range(len(windows)), nb_samples)
+                for window in windows[np.array(sample_inds)]:
+                    add_chip(
+                        raster_source._get_chip(window), source_stats, weight)
+                nb_sampled += nb_samples
+                nb_total += len(windows)
+
+            source_stats.scale(weight)
+            running_stats.merge(source_stats)
+
+        self.means = running_stats.get_means()
+        self.stds = running_stats.get_stds()
+
+        counts, sums, sumsqs = [np.array(x) for x in zip(*window_sums)]
+        # Overview blocks are not a sample of the windows, so the finite
+        # population correction doesn't apply to them.
+        fpc = 1.0
+        if not used_overviews:
+            fpc = 1.0 - nb_sampled / nb_total
+        self.mean_errors, self.std_errors = jackknife_errors(
+            counts, sums, sumsqs, fpc=fpc)
 
     def load(self, stats_uri):
         stats = json.loads(file_to_str(stats_uri))
         self.means = stats['means']
         self.stds = stats['stds']
+        self.mean_errors = stats.get('mean_errors')
+        self.std_errors = stats.get('std_errors')
+        self.partial_stats = dict((fingerprint,
+                                   RunningStats.from_dict(stats_dict))
+                                  for fingerprint, stats_dict in stats.get(
+                                      'partial_stats', {}).items())
 
     def save(self, stats_uri):
         stats = {'means': self.means, 'stds': self.stds}
+        if self.mean_errors is not None:
+            stats['mean_errors'] = self.mean_errors
+            stats['std_errors'] = self.std_errors
+        if self.partial_stats:
+            stats['partial_stats'] = dict(
+                (fingerprint, running_stats.to_dict())
+                for fingerprint, running_stats in self.partial_stats.items())
         str_to_file(json.dumps(stats), stats_uri)
@@ -0,0 +1,159 @@
+import unittest
+import json
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.raster_source import RasterSource
+from rastervision.core.raster_stats import (RasterStats, RunningStats,
+                                            compute_partial_stats)
+
+
+class MockRasterSource(RasterSource):
+    def __init__(self, data):
+        self.data = data
+        super().__init__(None)
+
+    def get_extent(self):
+        return Box(0, 0, self.data.shape[0], self.data.shape[1])
+
+    def _get_chip(self, window):
+        chip = np.zeros(
+            (window.get_height(), window.get_width(), self.data.shape[2]),
+            dtype=self.data.dtype)
+        data = self.data[window.ymin:window.ymax, window.xmin:window.xmax, :]
+        chip[0:data.shape[0], 0:data.shape[1], :] = data
+        return chip
+
+    def get_crs_transformer(self):
+        return None
+
+
+def masked_stats(data):
+    means = []
+    stds = []
+    for channel in range(data.shape[2]):
+        values = data[:, :, channel].ravel().astype(np.float64)
+        values = values[values != 0]
+        means.append(np.mean(values))
+        stds.append(np.std(values))
+    return means, stds
+
+
+class TestRasterStats(unittest.TestCase):
+    def test_compute(self):
+        data1 = np.random.randint(0, 1000, (650, 400, 3)).astype(np.uint16)
+        data2 = np.random.randint(0, 50, (100, 700, 3)).astype(np.uint16)
+        # Channel with lots of NODATA values.
+        data2[:, 0:500, 2] = 0
+        raster_sources = [MockRasterSource(data1), MockRasterSource(data2)]
+
+        stats = RasterStats()
+        stats.compute(raster_sources)
+
+        all_data = np.concatenate([data1.reshape(-1, 3), data2.reshape(-1, 3)])
+        means, stds = masked_stats(all_data[:, np.newaxis, :])
+        np.testing.assert_allclose(stats.means, means)
+        np.testing.assert_allclose(stats.stds, stds)
+
+    def test_reduce_partial_stats(self):
+        data1 = np.random.randint(0, 1000, (300, 300, 2)).astype(np.uint16)
+        data2 = np.random.randint(500, 2000, (300, 300, 2)).astype(np.uint16)
+        partial_stats = [
+            compute_partial_stats(MockRasterSource(data1)),
+            compute_partial_stats(MockRasterSource(data2))
+        ]
+        # Round trip through the serialized format used by workers.
+        partial_stats = [
+            RunningStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+            for stats in partial_stats
+        ]
+
+        stats = RasterStats()
+        stats.reduce(partial_stats)
+
+        means, stds = masked_stats(np.concatenate([data1, data2]))
+        np.testing.assert_allclose(stats.means, means)
+        np.testing.assert_allclose(stats.stds, stds)
+
+    def test_compute_approximate(self):
+        data = np.random.randint(1, 1000, (900, 900, 2)).astype(np.uint16)
+        raster_sources = [MockRasterSource(data)]
+        means, stds = masked_stats(data)
+
+        # Sampling every window gives exact stats and no error.
+        stats = RasterStats()
+        stats.compute_approximate(raster_sources, window_fraction=1.0)
+        np.testing.assert_allclose(stats.means, means)
+        np.testing.assert_allclose(stats.stds, stds)
+        np.testing.assert_allclose(stats.mean_errors, [0, 0])
+
+        stats.compute_approximate(raster_sources, nb_windows=4)
+        self.assertEqual(len(stats.mean_errors), 2)
+        self.assertEqual(len(stats.std_errors), 2)
+        self.assertTrue(np.all(np.array(stats.mean_errors) > 0))
+        np.testing.assert_allclose(stats.means, means, rtol=0.05)
+        np.testing.assert_allclose(stats.stds, stds, rtol=0.05)
+
+    def test_compute_approximate_weights(self):
+        # Sources are weighted by their extent even if the same number of
+        # windows is sampled from each.
+        big_data = np.full((600, 600, 1), 100, dtype=np.uint16)
+        small_data = np.full((300, 300, 1), 900, dtype=np.uint16)
+        raster_sources = [
+            MockRasterSource(big_data),
+            MockRasterSource(small_data)
+        ]
+        means, stds = masked_stats(
+            np.concatenate(
+                [big_data.reshape(-1, 1, 1),
+                 small_data.reshape(-1, 1, 1)]))
+
+        stats = RasterStats()
+        stats.compute_approximate(raster_sources, nb_windows=1)
+        np.testing.assert_allclose(stats.means, means)
+        np.testing.assert_allclose(stats.stds, stds)
+
+        for raster_source, data in zip(raster_sources, [big_data, small_data]):
+            raster_source.get_overview_array = (
+                lambda data=data: data[::4, ::4, :])
+        stats.compute_approximate(raster_sources, use_overviews=True)
+        np.testing.assert_allclose(stats.means, means)
+        np.testing.assert_allclose(stats.stds, stds)
+
+    def test_compute_approximate_overviews(self):
+        data = np.random.randint(1, 1000, (600, 600, 2)).astype(np.uint16)
+        raster_source = MockRasterSource(data)
+        raster_source.get_overview_array = lambda: data[::4, ::4, :]
+        means, stds = masked_stats(data[::4, ::4, :])
+
+        stats = RasterStats()
+        stats.compute_approximate([raster_source], use_overviews=True)
+        np.testing.assert_allclose(stats.means, means)
+        np.testing.assert_allclose(stats.stds, stds)
+        self.assertTrue(np.all(np.array(stats.mean_errors) > 0))
+
+    def test_no_raster_sources(self):
+        stats = RasterStats()
+        with self.assertRaises(ValueError):
+            stats.compute([])
+        with self.assertRaises(ValueError):
+            stats.reduce([RunningStats()])
+        with self.assertRaises(ValueError):
+            stats.compute_approximate([])
+
+    def test_running_stats_all_nodata(self):
+        running_stats = RunningStats()
+        chip = np.ones((2, 2, 2), dtype=np.uint8)
+        chip[:, :, 1] = 0
+        running_stats.update(chip)
+        running_stats.update(chip)
+
+        self.assertEqual(running_stats.get_means()[0], 1.0)
+        self.assertEqual(running_stats.get_stds()[0], 0.0)
+        self.assertTrue(np.isnan(running_stats.get_means()[1]))
+        self.assertTrue(np.isnan(running_stats.get_stds()[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
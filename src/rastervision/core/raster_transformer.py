@@ -15,6 +15,64 @@ class RasterTransformer(object):
         """
         self.channel_order = channel_order
         self.raster_stats = raster_stats
+        self.uint16_luts = None
+
+    def get_uint16_luts(self):
+        """Return lookup tables for transforming uint16 values to uint8.
+
+        For uint16 imagery, the transform is a fixed function of the channel
+        and value, so it is precomputed once for every possible value.
+
+        Returns:
+            [channels, 65536] uint8 numpy array where channels is the number of
+                channels in raster_stats
+        """
+        if self.uint16_luts is None:
+            nb_channels = len(self.raster_stats.means)
+            values = np.arange(65536, dtype=np.uint16)
+            scratch = np.empty(values.shape, dtype=np.float32)
+            self.uint16_luts = np.empty((nb_channels, 65536), dtype=np.uint8)
+            for channel_ind in range(nb_channels):
+                self._transform_channel(values, channel_ind, scratch,
+                                        self.uint16_luts[channel_ind])
+        return self.uint16_luts
+
+    def _transform_channel(self, values, channel_ind, scratch, out):
+        """Transform values of one channel to uint8 using raster_stats.
+
+        Uses float32 intermediates which are computed in place in scratch.
+        Values that fall exactly on a rounding boundary may therefore differ
+        by one from the output of float64 intermediates.
+
+        Args:
+            values: numpy array with values of a channel
+            channel_ind: index of the channel in raster_stats
+            scratch: float32 numpy array with same shape as values
+            out: uint8 numpy array with same shape as values to write to
+        """
+        mean = np.float32(self.raster_stats.means[channel_ind])
+        std = np.float32(self.raster_stats.stds[channel_ind])
+
+        # Subtract mean and divide by std to get zscores.
+        np.subtract(values, mean, out=scratch, dtype=np.float32)
+        scratch /= std
+
+        # Make zscores that fall between -3 and 3 span 0 to 255.
+        scratch += 3
+        scratch /= 6
+
+        np.clip(scratch, 0, 1, out=scratch)
+        scratch *= 255
+        out[...] = scratch
+
+        # Don't transform NODATA zero values.
+        out[values == 0] = 0
+
+    def get_channel_order(self, nb_channels):
+        """Return the channel indices to use for chips with nb_channels."""
+        if self.channel_order is None:
+            return np.arange(nb_channels)
+        return self.channel_order
 
     def transform(self, chip):
         """Transform a chip.
@@ -29,40 +87,46 @@ class RasterTransformer(object):
             [height, width, channels] uint8 numpy array where channels is equal
                 to len(channel_order)
         """
-        if self.channel_order is None:
-            channel_order = np.arange(chip.shape[2])
-        else:
-            channel_order = self.channel_order
-
-        chip = chip[:, :, channel_order]
-
-        if chip.dtype != np.uint8:
-            if self.raster_stats:
-                # Subtract mean and divide by std to get zscores.
-                means = np.array(self.raster_stats.means)
-                means = means[np.newaxis, np.newaxis, channel_order].astype(
-                    np.float)
-                stds = np.array(self.raster_stats.stds)
-                stds = stds[np.newaxis, np.newaxis, channel_order].astype(
-                    np.float)
-
-                # Don't transform NODATA zero values.
-                nodata = chip == 0
+        return self.transform_batch(chip[np.newaxis, ...])[0]
 
-                chip = chip - means
-                chip = chip / stds
+    def transform_batch(self, chips, out=None):
+        """Transform a batch of chips.
 
-                # Make zscores that fall between -3 and 3 span 0 to 255.
-                chip += 3
-                chip /= 6
+        Selects a subset of the channels and transforms non-uint8 to
+        uint8 values using raster_stats.
 
-                chip = np.clip(chip, 0, 1)
-                chip *= 255
-                chip = chip.astype(np.uint8)
+        Args:
+            chips: [batch_size, height, width, channels] numpy array
+            out: optional preallocated [batch_size, height, width,
+                len(channel_order)] uint8 numpy array to write the output to
 
-                chip[nodata] = 0
-            else:
-                raise ValueError(
-                    'Need to provide raster_stats for non-uint8 rasters.')
+        Returns:
+            [batch_size, height, width, channels] uint8 numpy array where
+                channels is equal to len(channel_order)
+        """
+        channel_order = self.get_channel_order(chips.shape[3])
+        if chips.dtype != np.uint8 and not self.raster_stats:
+            raise ValueError(
+                'Need to provide raster_stats for non-uint8 rasters.')
+
+        if out is None:
+            out = np.empty(
+                chips.shape[0:3] + (len(channel_order), ), dtype=np.uint8)
+
+        if chips.dtype == np.uint8:
+            for out_ind, channel_ind in enumerate(channel_order):
+                out[:, :, :, out_ind] = chips[:, :, :, channel_ind]
+        elif chips.dtype == np.uint16:
+            # Fast path: look up the output value of each pixel.
+            luts = self.get_uint16_luts()
+            for out_ind, channel_ind in enumerate(channel_order):
+                out[:, :, :, out_ind] = \
+                    luts[channel_ind][chips[:, :, :, channel_ind]]
+        else:
+            scratch = np.empty(chips.shape[0:3], dtype=np.float32)
+            for out_ind, channel_ind in enumerate(channel_order):
+                self._transform_channel(chips[:, :, :, channel_ind],
+                                        channel_ind, scratch,
+                                        out[:, :, :, out_ind])
 
-        return chip
+        return out
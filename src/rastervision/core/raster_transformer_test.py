@@ -61,6 +61,67 @@ class TestRasterTransformer(unittest.TestCase):
         expected_out_chip = np.ones((2, 2, 3)) * 170
         np.testing.assert_equal(out_chip, expected_out_chip)
 
+    def test_uint16_lut_matches_float(self):
+        raster_stats = RasterStats()
+        raster_stats.means = [1000.0, 2000.0, 3000.0, 500.0]
+        raster_stats.stds = [300.0, 100.0, 1000.0, 50.0]
+        channel_order = [3, 0, 2]
+        transformer = RasterTransformer(
+            raster_stats=raster_stats, channel_order=channel_order)
+
+        chip = np.random.randint(0, 65536, (20, 30, 4)).astype(np.uint16)
+        chip[0:5, 0:5, :] = 0
+        out_chip = transformer.transform(chip)
+        expected_out_chip = transformer.transform(chip.astype(np.float64))
+
+        self.assertEqual(out_chip.dtype, np.uint8)
+        np.testing.assert_equal(out_chip, expected_out_chip)
+        np.testing.assert_equal(out_chip[0:5, 0:5, :], 0)
+
+    def test_transform_batch(self):
+        raster_stats = RasterStats()
+        raster_stats.means = [1000.0, 2000.0, 3000.0]
+        raster_stats.stds = [300.0, 100.0, 1000.0]
+        channel_order = [2, 0]
+        transformer = RasterTransformer(
+            raster_stats=raster_stats, channel_order=channel_order)
+
+        # z-scores of -3, 0, 1 and 3 (or beyond) map to 0, 127, 170 and 255,
+        # and NODATA zeros stay zero.
+        chips = np.zeros((2, 1, 3, 3))
+        chips[0, 0, :, 2] = [3000, 4000, 6000]
+        chips[0, 0, :, 0] = [100, 1000, 1300]
+        chips[1, 0, :, 2] = [0, 9000, 2000]
+        chips[1, 0, :, 0] = [2800, 0, 1]
+        expected_out_chips = np.zeros((2, 1, 3, 2), dtype=np.uint8)
+        expected_out_chips[0, 0] = [[127, 0], [170, 127], [255, 170]]
+        expected_out_chips[1, 0] = [[0, 255], [255, 0], [85, 0]]
+
+        for dtype in [np.uint16, np.float32, np.float64, np.int32]:
+            out = np.empty((2, 1, 3, 2), dtype=np.uint8)
+            out_chips = transformer.transform_batch(
+                chips.astype(dtype), out=out)
+            self.assertIs(out_chips, out)
+            np.testing.assert_equal(out_chips, expected_out_chips)
+            np.testing.assert_equal(
+                transformer.transform(chips[1].astype(dtype)),
+                expected_out_chips[1])
+
+        # uint8 chips only have their channels selected.
+        chips = np.random.randint(0, 256, (5, 8, 8, 3)).astype(np.uint8)
+        out_chips = transformer.transform_batch(chips)
+        np.testing.assert_equal(out_chips, chips[:, :, :, channel_order])
+
+    def test_transform_float32_rounding(self):
+        # The z-scores are computed in float32. The exact output for this
+        # value is 119, which float64 intermediates round down to 118.
+        raster_stats = RasterStats()
+        raster_stats.means = [500.0]
+        raster_stats.stds = [50.0]
+        transformer = RasterTransformer(raster_stats=raster_stats)
+        chip = np.full((1, 1, 1), 490, dtype=np.int16)
+        np.testing.assert_equal(transformer.transform(chip), [[[119]]])
+
 
 if __name__ == '__main__':
     unittest.main()
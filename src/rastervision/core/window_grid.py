@@ -0,0 +1,173 @@
+import numpy as np
+from shapely.prepared import prep
+
+from rastervision.core.box import Box
+
+# Number of windows to materialize into Boxes at a time when iterating.
+ITER_CHUNK_SIZE = 1024
+
+
+class WindowGrid(object):
+    """A set of windows stored as an nx4 numpy array.
+
+    This is a compact alternative to a list of Boxes for large grids of
+    windows. Filtering and clipping are vectorized, and Box objects are only
+    created lazily when iterating or indexing.
+    """
+
+    def __init__(self, npboxes):
+        """Construct a new WindowGrid.
+
+        Args:
+            npboxes: int numpy array of size nx4 with cols
+                ymin, xmin, ymax, xmax in pixel coordinates
+        """
+        self.npboxes = np.asarray(npboxes, dtype=np.int64).reshape(-1, 4)
+
+    @staticmethod
+    def from_extent(extent, chip_size, stride):
+        """Return grid of square windows within an extent.
+
+        This has the same windows in the same (row-major) order as
+        Box.get_windows.
+
+        Args:
+            extent: Box
+            chip_size: (int) the length of each square-shaped window
+            stride: (int) how much each window is offset from the last
+        """
+        row_starts = np.arange(0, extent.get_height(), stride, dtype=np.int64)
+        col_starts = np.arange(0, extent.get_width(), stride, dtype=np.int64)
+        ymins, xmins = np.meshgrid(row_starts, col_starts, indexing='ij')
+        ymins = ymins.ravel()
+        xmins = xmins.ravel()
+        return WindowGrid(
+            np.stack(
+                [ymins, xmins, ymins + chip_size, xmins + chip_size], axis=1))
+
+    @staticmethod
+    def from_boxes(boxes):
+        """Return WindowGrid with the windows in a list of Boxes.
+
+        Windows are in pixel coordinates, so the coordinates of the boxes
+        must be integers (or floats with integer values).
+
+        Args:
+            boxes: list of Box or WindowGrid
+
+        Raises:
+            ValueError: if any box has non-integer coordinates
+        """
+        if isinstance(boxes, WindowGrid):
+            return boxes
+        npboxes = np.array(
+            [box.tuple_format() for box in boxes], dtype=np.float64)
+        if np.any(npboxes != np.round(npboxes)):
+            raise ValueError('Windows must have integer coordinates')
+        return WindowGrid(npboxes)
+
+    def get_npboxes(self):
+        return self.npboxes
+
+    def get_boxes(self):
+        """Return list of Boxes."""
+        return [Box(*npbox) for npbox in self.npboxes.tolist()]
+
+    def __len__(self):
+        return self.npboxes.shape[0]
+
+    def __iter__(self):
+        for start in range(0, len(self), ITER_CHUNK_SIZE):
+            chunk = self.npboxes[start:start + ITER_CHUNK_SIZE].tolist()
+            for npbox in chunk:
+                yield Box(*npbox)
+
+    def __getitem__(self, key):
+        """Return a Box for an int key, or a WindowGrid otherwise.
+
+        Args:
+            key: int, slice, boolean mask or array of indices
+        """
+        if isinstance(key, (int, np.integer)):
+            return Box(*self.npboxes[key].tolist())
+        return WindowGrid(self.npboxes[key])
+
+    def filter(self, mask):
+        """Return WindowGrid with the windows where mask is True."""
+        return WindowGrid(self.npboxes[mask])
+
+    def clip(self, extent):
+        """Return WindowGrid with windows clipped to lie within extent.
+
+        Windows that do not overlap with the extent are removed.
+        """
+        npboxes = self.npboxes.copy()
+        npboxes[:, [0, 2]] = np.clip(npboxes[:, [0, 2]], extent.ymin,
+                                     extent.ymax)
+        npboxes[:, [1, 3]] = np.clip(npboxes[:, [1, 3]], extent.xmin,
+                                     extent.xmax)
+        is_nonempty = ((npboxes[:, 2] > npboxes[:, 0]) &
+                       (npboxes[:, 3] > npboxes[:, 1]))
+        return WindowGrid(npboxes[is_nonempty])
+
+    def get_inside_mask(self, extent):
+        """Return boolean mask of windows that lie completely in extent."""
+        return ((self.npboxes[:, 0] >= extent.ymin) &
+                (self.npboxes[:, 1] >= extent.xmin) &
+                (self.npboxes[:, 2] <= extent.ymax) &
+                (self.npboxes[:, 3] <= extent.xmax))
+
+    def get_aoi_mask(self, aoi_polygons):
+        """Return boolean mask of windows that lie inside an AOI polygon.
+
+        This is equivalent to calling is_window_inside_aoi on every window.
+        The bounds of each polygon are used to quickly rule out windows so
+        that the exact test is only run on windows within those bounds.
+
+        Args:
+            aoi_polygons: list of shapely polygons in pixel coordinates, or
+                None in which case every window is inside the AOI
+        """
+        if not aoi_polygons:
+            return np.ones((len(self), ), dtype=bool)
+
+        mask = np.zeros((len(self), ), dtype=bool)
+        for polygon in aoi_polygons:
+            minx, miny, maxx, maxy = polygon.bounds
+            candidates = np.flatnonzero(~mask & (
+                self.npboxes[:, 0] >= miny) & (self.npboxes[:, 1] >= minx) & (
+                    self.npboxes[:, 2] <= maxy) & (self.npboxes[:, 3] <= maxx))
+            if len(candidates) == 0:
+                continue
+
+            prepared_polygon = prep(polygon)
+            for ind in candidates:
+                window = Box(*self.npboxes[ind].tolist())
+                mask[ind] = prepared_polygon.contains(window.get_shapely())
+        return mask
+
+    def filter_inside_aoi(self, aoi_polygons):
+        """Return WindowGrid with the windows that lie inside the AOI."""
+        return self.filter(self.get_aoi_mask(aoi_polygons))
+
+    def get_nonempty_mask(self, raster_source, batch_size=64):
+        """Return boolean mask of windows whose chip has any nonzero values.
+
+        Chips are read and transformed in batches using
+        RasterSource.get_chips, so all windows need to be the same size.
+
+        Args:
+            raster_source: RasterSource
+            batch_size: (int) number of chips to read at a time
+        """
+        mask = np.zeros((len(self), ), dtype=bool)
+        for start in range(0, len(self), batch_size):
+            windows = self[start:start + batch_size].get_boxes()
+            chips = raster_source.get_chips(windows)
+            mask[start:start + len(windows)] = \
+                chips.reshape(len(windows), -1).any(axis=1)
+        return mask
+
+    def filter_nonempty(self, raster_source, batch_size=64):
+        """Return WindowGrid with windows whose chip is not all zeros."""
+        return self.filter(self.get_nonempty_mask(raster_source, batch_size))
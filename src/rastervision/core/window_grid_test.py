@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+from shapely.geometry import Polygon
+
+from rastervision.core.box import Box
+from rastervision.core.raster_transformer import RasterTransformer
+from rastervision.core.window_grid import WindowGrid
+from rastervision.core.raster_stats_test import MockRasterSource
+from rastervision.ml_tasks.utils import is_window_inside_aoi
+
+
+class TestWindowGrid(unittest.TestCase):
+    def test_from_extent(self):
+        extent = Box(0, 0, 100, 70)
+        windows = WindowGrid.from_extent(extent, 30, 20)
+        self.assertListEqual(list(windows), list(extent.get_windows(30, 20)))
+        self.assertEqual(len(windows), 20)
+
+    def test_from_boxes(self):
+        boxes = [Box(0, 0, 10, 10), Box(5, 5, 15, 20)]
+        windows = WindowGrid.from_boxes(boxes)
+        self.assertListEqual(windows.get_boxes(), boxes)
+        self.assertIs(WindowGrid.from_boxes(windows), windows)
+        self.assertEqual(len(WindowGrid.from_boxes([])), 0)
+
+        # Floats are allowed as long as they are integers.
+        windows = WindowGrid.from_boxes([Box(0., 1., 10., 11.)])
+        self.assertEqual(windows[0], Box(0, 1, 10, 11))
+        with self.assertRaises(ValueError):
+            WindowGrid.from_boxes([Box(0, 0, 10, 10), Box(0.5, 0, 10, 10)])
+
+    def test_getitem(self):
+        windows = WindowGrid.from_extent(Box(0, 0, 20, 20), 10, 10)
+        self.assertEqual(windows[1], Box(0, 10, 10, 20))
+        self.assertListEqual(
+            windows[2:].get_boxes(),
+            [Box(10, 0, 20, 10), Box(10, 10, 20, 20)])
+
+    def test_clip(self):
+        windows = WindowGrid([[0, 0, 10, 10], [5, 5, 15, 15], [20, 20, 30,
+                                                               30]])
+        clipped = windows.clip(Box(0, 0, 12, 12))
+        self.assertListEqual(
+            clipped.get_boxes(),
+            [Box(0, 0, 10, 10), Box(5, 5, 12, 12)])
+
+    def test_get_inside_mask(self):
+        windows = WindowGrid([[0, 0, 10, 10], [5, 5, 15, 15]])
+        mask = windows.get_inside_mask(Box(0, 0, 12, 12))
+        np.testing.assert_array_equal(mask, [True, False])
+
+    def test_get_aoi_mask(self):
+        aoi_polygons = [
+            Polygon([(0, 0), (50, 0), (0, 50)]),
+            Polygon([(60, 60), (100, 60), (100, 100), (60, 100)])
+        ]
+        windows = WindowGrid.from_extent(Box(0, 0, 100, 100), 10, 5)
+        mask = windows.get_aoi_mask(aoi_polygons)
+        expected_mask = [
+            is_window_inside_aoi(window, aoi_polygons) for window in windows
+        ]
+        np.testing.assert_array_equal(mask, expected_mask)
+        self.assertTrue(np.any(mask))
+
+        self.assertEqual(len(windows.filter_inside_aoi(None)), len(windows))
+
+    def test_filter_nonempty(self):
+        data = np.zeros((20, 20, 3), dtype=np.uint8)
+        data[15, 2, 1] = 1
+        windows = WindowGrid.from_extent(Box(0, 0, 20, 20), 10, 10)
+        raster_source = MockRasterSource(data)
+        raster_source.raster_transformer = RasterTransformer()
+        nonempty = windows.filter_nonempty(raster_source, batch_size=3)
+        self.assertListEqual(nonempty.get_boxes(), [Box(10, 0, 20, 10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import numpy as np
+
 from rastervision.core.crs_transformer import CRSTransformer
 
 
@@ -28,3 +30,25 @@ class IdentityCRSTransformer(CRSTransformer):
             (x, y) tuple in pixel coordinates
         """
         return pixel_point
+
+    def map_to_pixel_array(self, map_points):
+        """Identity function.
+
+        Args:
+            map_points: nx2 array-like of (x, y) points in pixel coordinates
+
+        Returns:
+            nx2 numpy array of (x, y) points in pixel coordinates
+        """
+        return np.asarray(map_points).reshape(-1, 2)
+
+    def pixel_to_map_array(self, pixel_points):
+        """Identity function.
+
+        Args:
+            pixel_points: nx2 array-like of (x, y) points in pixel coordinates
+
+        Returns:
+            nx2 numpy array of (x, y) points in pixel coordinates
+        """
+        return np.asarray(pixel_points).reshape(-1, 2)
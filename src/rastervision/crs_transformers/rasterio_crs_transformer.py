@@ -1,8 +1,29 @@
-import pyproj
+import numpy as np
+from pyproj import CRS, Transformer
 
 from rastervision.core.crs_transformer import CRSTransformer
 
 
+def get_inverse_transform(transform):
+    """Return the inverse of an affine transform.
+
+    This uses the same arithmetic as Affine.__invert__.
+
+    Args:
+        transform: 2x3 numpy array with the first two rows of the matrix
+
+    Returns:
+        2x3 numpy array
+    """
+    (a, b, c), (d, e, f) = transform.tolist()
+    inv_det = 1.0 / (a * e - b * d)
+    ra = e * inv_det
+    rb = -b * inv_det
+    rd = -d * inv_det
+    re = a * inv_det
+    return np.array([[ra, rb, -c * ra - f * rb], [rd, re, -c * rd - f * re]])
+
+
 class RasterioCRSTransformer(CRSTransformer):
     """Transformer for a RasterioRasterSource."""
 
@@ -14,9 +35,24 @@ class RasterioCRSTransformer(CRSTransformer):
             map_crs: CRS code
         """
         self.image_dataset = image_dataset
-        self.map_proj = pyproj.Proj(init=map_crs)
-        image_crs = image_dataset.crs['init']
-        self.image_proj = pyproj.Proj(init=image_crs)
+        # Rows of the affine transform from pixel to image coordinates and its
+        # inverse.
+        tr = image_dataset.transform
+        self.transform = np.array([[tr.a, tr.b, tr.c], [tr.d, tr.e, tr.f]])
+        self.inverse_transform = get_inverse_transform(self.transform)
+
+        # The pyproj Transformers are built once since building them is
+        # expensive. If the CRSs match, there is nothing to transform.
+        map_crs = CRS.from_user_input(map_crs)
+        image_crs = CRS.from_user_input(image_dataset.crs.to_wkt())
+        if map_crs.equals(image_crs, ignore_axis_order=True):
+            self.map_to_image = None
+            self.image_to_map = None
+        else:
+            self.map_to_image = Transformer.from_crs(
+                map_crs, image_crs, always_xy=True)
+            self.image_to_map = Transformer.from_crs(
+                image_crs, map_crs, always_xy=True)
 
     def map_to_pixel(self, map_point):
         """Transform point from map to pixel-based coordinates.
@@ -27,11 +63,7 @@ class RasterioCRSTransformer(CRSTransformer):
         Returns:
             (x, y) tuple in pixel coordinates
         """
-        image_point = pyproj.transform(self.map_proj, self.image_proj,
-                                       map_point[0], map_point[1])
-        pixel_point = self.image_dataset.index(image_point[0], image_point[1])
-        pixel_point = (pixel_point[1], pixel_point[0])
-        return pixel_point
+        return tuple(self.map_to_pixel_array([map_point])[0].tolist())
 
     def pixel_to_map(self, pixel_point):
         """Transform point from pixel to map-based coordinates.
@@ -42,8 +74,52 @@ class RasterioCRSTransformer(CRSTransformer):
         Returns:
             (x, y) tuple in map coordinates
         """
-        image_point = self.image_dataset.ul(
-            int(pixel_point[1]), int(pixel_point[0]))
-        map_point = pyproj.transform(self.image_proj, self.map_proj,
-                                     image_point[0], image_point[1])
-        return map_point
+        return tuple(self.pixel_to_map_array([pixel_point])[0].tolist())
+
+    def map_to_pixel_array(self, map_points):
+        """Transform array of points from map to pixel-based coordinates.
+
+        Each point is mapped to the column and row of the pixel containing it.
+
+        Args:
+            map_points: nx2 array-like of (x, y) points in map coordinates
+
+        Returns:
+            nx2 int numpy array of (x, y) points in pixel coordinates
+        """
+        map_points = np.asarray(map_points, dtype=np.float64).reshape(-1, 2)
+        xs = map_points[:, 0]
+        ys = map_points[:, 1]
+        if self.map_to_image is not None:
+            xs, ys = self.map_to_image.transform(xs, ys)
+
+        # This uses the same arithmetic as Affine.__mul__ and floors like
+        # DatasetReader.index.
+        (a, b, c), (d, e, f) = self.inverse_transform
+        cols = np.floor(xs * a + ys * b + c)
+        rows = np.floor(xs * d + ys * e + f)
+        return np.stack([cols, rows], axis=1).astype(np.int64)
+
+    def pixel_to_map_array(self, pixel_points):
+        """Transform array of points from pixel to map-based coordinates.
+
+        Each point is mapped to the upper left corner of the pixel containing
+        it.
+
+        Args:
+            pixel_points: nx2 array-like of (x, y) points in pixel coordinates
+
+        Returns:
+            nx2 numpy array of (x, y) points in map coordinates
+        """
+        pixel_points = np.trunc(
+            np.asarray(pixel_points, dtype=np.float64).reshape(-1, 2))
+        cols = pixel_points[:, 0]
+        rows = pixel_points[:, 1]
+
+        (a, b, c), (d, e, f) = self.transform
+        xs = cols * a + rows * b + c
+        ys = cols * d + rows * e + f
+        if self.image_to_map is not None:
+            xs, ys = self.image_to_map.transform(xs, ys)
+        return np.stack([xs, ys], axis=1)
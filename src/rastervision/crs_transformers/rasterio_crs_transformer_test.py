@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+from affine import Affine
+from rasterio.io import MemoryFile
+from pyproj import Transformer
+
+from rastervision.crs_transformers.rasterio_crs_transformer import (
+    RasterioCRSTransformer)
+
+
+class TestRasterioCRSTransformer(unittest.TestCase):
+    def setUp(self):
+        self.memory_file = MemoryFile()
+        self.image_dataset = self.memory_file.open(
+            driver='GTiff',
+            height=100,
+            width=200,
+            count=1,
+            dtype=np.uint8,
+            crs='EPSG:32616',
+            transform=Affine(0.5, 0, 500000, 0, -0.5, 4000000))
+        self.utm_to_wgs84 = Transformer.from_crs(
+            'EPSG:32616', 'EPSG:4326', always_xy=True)
+
+        # Points in pixel coords including points outside the image.
+        np.random.seed(0)
+        self.pixel_points = np.random.uniform(-10, 210, size=(50, 2))
+
+    def tearDown(self):
+        self.image_dataset.close()
+        self.memory_file.close()
+
+    def get_utm_points(self, pixel_points):
+        """Return UTM coords of upper left corners of pixels."""
+        pixel_points = np.trunc(pixel_points)
+        return np.stack(
+            [
+                500000 + 0.5 * pixel_points[:, 0],
+                4000000 - 0.5 * pixel_points[:, 1]
+            ],
+            axis=1)
+
+    def test_pixel_to_map_array(self):
+        crs_transformer = RasterioCRSTransformer(self.image_dataset)
+        map_points = crs_transformer.pixel_to_map_array(self.pixel_points)
+
+        utm_points = self.get_utm_points(self.pixel_points)
+        xs, ys = self.utm_to_wgs84.transform(utm_points[:, 0],
+                                             utm_points[:, 1])
+        np.testing.assert_allclose(map_points, np.stack([xs, ys], axis=1))
+
+        map_point = crs_transformer.pixel_to_map(self.pixel_points[0])
+        np.testing.assert_allclose(map_point, map_points[0])
+
+    def test_map_to_pixel_array(self):
+        crs_transformer = RasterioCRSTransformer(self.image_dataset)
+        # Use the centers of pixels so rounding errors don't change the
+        # pixel that a point is in.
+        utm_points = self.get_utm_points(self.pixel_points) + [0.25, -0.25]
+        xs, ys = self.utm_to_wgs84.transform(utm_points[:, 0],
+                                             utm_points[:, 1])
+        pixel_points = crs_transformer.map_to_pixel_array(
+            np.stack([xs, ys], axis=1))
+
+        np.testing.assert_array_equal(pixel_points,
+                                      np.trunc(self.pixel_points))
+
+        pixel_point = crs_transformer.map_to_pixel((xs[0], ys[0]))
+        self.assertTupleEqual(pixel_point, tuple(pixel_points[0].tolist()))
+
+    def test_same_crs(self):
+        crs_transformer = RasterioCRSTransformer(
+            self.image_dataset, map_crs='epsg:32616')
+        self.assertIsNone(crs_transformer.map_to_image)
+
+        map_points = crs_transformer.pixel_to_map_array(self.pixel_points)
+        np.testing.assert_array_equal(map_points,
+                                      self.get_utm_points(self.pixel_points))
+        pixel_points = crs_transformer.map_to_pixel_array(map_points)
+        np.testing.assert_array_equal(pixel_points,
+                                      np.trunc(self.pixel_points))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,30 +1,64 @@
 import numpy as np
-from sklearn import metrics
 
 from rastervision.core.evaluation import Evaluation
 from rastervision.core.evaluation_item import EvaluationItem
 
 
+def precision_recall_fscore_support(gt_class_ids, pred_class_ids, nb_labels):
+    """Compute per-class metrics using a confusion matrix.
+
+    This is equivalent to sklearn.metrics.precision_recall_fscore_support
+    with labels=np.arange(nb_labels) (and metrics that are undefined set to 0)
+    but runs in linear time using np.bincount.
+
+    Args:
+        gt_class_ids: int numpy array of ground truth class_ids
+        pred_class_ids: int numpy array of predicted class_ids
+        nb_labels: (int) number of class_ids starting at 0 to compute metrics
+            for
+
+    Returns:
+        (precision, recall, f1, support) tuple of numpy arrays of length
+            nb_labels
+    """
+    # Class ids outside of the labels are put in an extra bin.
+    gt_class_ids = np.where((gt_class_ids >= 0) & (gt_class_ids < nb_labels),
+                            gt_class_ids, nb_labels).astype(np.int64)
+    pred_class_ids = np.where(
+        (pred_class_ids >= 0) & (pred_class_ids < nb_labels), pred_class_ids,
+        nb_labels).astype(np.int64)
+    nb_bins = nb_labels + 1
+    confusion = np.bincount(
+        gt_class_ids * nb_bins + pred_class_ids,
+        minlength=nb_bins * nb_bins).reshape(nb_bins, nb_bins)
+
+    true_positives = np.diag(confusion)[0:nb_labels].astype(np.float64)
+    support = confusion.sum(axis=1)[0:nb_labels]
+    pred_counts = confusion.sum(axis=0)[0:nb_labels]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.nan_to_num(true_positives / pred_counts)
+        recall = np.nan_to_num(true_positives / support)
+        f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+    return precision, recall, f1, support
+
+
 def compute_eval_items(gt_labels, pred_labels, class_map):
     nb_classes = len(class_map)
     class_to_eval_item = {}
 
-    gt_class_ids = []
-    pred_class_ids = []
-
-    gt_cells = gt_labels.get_cells()
-    for gt_cell in gt_cells:
-        gt_class_id = gt_labels.get_cell_class_id(gt_cell)
-        pred_class_id = pred_labels.get_cell_class_id(gt_cell)
+    gt_class_ids = gt_labels.get_class_id_array()
+    pred_class_ids = pred_labels.get_cell_class_ids(gt_labels.get_cell_array())
 
-        if gt_class_id is not None and pred_class_id is not None:
-            gt_class_ids.append(gt_class_id)
-            pred_class_ids.append(pred_class_id)
+    # Only use cells that have a class_id in both. Null class_ids
+    # (NULL_CLASS_ID) and missing cells (NO_CELL) are negative.
+    is_valid = (gt_class_ids >= 0) & (pred_class_ids >= 0)
+    gt_class_ids = gt_class_ids[is_valid]
+    pred_class_ids = pred_class_ids[is_valid]
 
     # Add 1 because class_ids start at 1.
-    sklabels = np.arange(1 + nb_classes)
-    precision, recall, f1, support = metrics.precision_recall_fscore_support(
-        gt_class_ids, pred_class_ids, labels=sklabels, warn_for=())
+    nb_labels = 1 + nb_classes
+    precision, recall, f1, support = precision_recall_fscore_support(
+        gt_class_ids, pred_class_ids, nb_labels)
 
     for class_map_item in class_map.get_items():
         class_id = class_map_item.id
@@ -1,7 +1,10 @@
 import unittest
 
+import numpy as np
+from sklearn import metrics
+
 from rastervision.evaluations.classification_evaluation import (
-    ClassificationEvaluation)
+    ClassificationEvaluation, precision_recall_fscore_support)
 from rastervision.core.class_map import ClassItem, ClassMap
 from rastervision.core.box import Box
 from rastervision.labels.classification_labels import ClassificationLabels
@@ -58,6 +61,24 @@ class TestClassificationEvaluation(unittest.TestCase):
         self.assertAlmostEqual(avg_item.recall, 2 / 3, places=2)
         self.assertAlmostEqual(avg_item.f1, 2 / 3, places=2)
 
+    def test_precision_recall_fscore_support(self):
+        np.random.seed(1)
+        gt_class_ids = np.random.randint(1, 5, 1000)
+        pred_class_ids = np.random.randint(1, 6, 1000)
+        # Class 3 is never predicted.
+        pred_class_ids[pred_class_ids == 3] = 1
+        nb_labels = 5
+
+        scores = precision_recall_fscore_support(gt_class_ids, pred_class_ids,
+                                                 nb_labels)
+        expected_scores = metrics.precision_recall_fscore_support(
+            gt_class_ids,
+            pred_class_ids,
+            labels=np.arange(nb_labels),
+            warn_for=())
+        for score, expected_score in zip(scores, expected_scores):
+            np.testing.assert_allclose(score, expected_score)
+
     def test_compute_single_pred_null(self):
         eval = ClassificationEvaluation()
         class_map = self.make_class_map()
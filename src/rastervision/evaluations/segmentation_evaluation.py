@@ -24,8 +24,12 @@ class SegmentationEvaluation(Evaluation):
         else:
             raise ValueError('Must have source or sink.')
         raster_class_map = ground_truth_label_store.raster_class_map
+        # Class indices are read directly from single band predictions.
+        class_index = getattr(_prediction_label_store, 'class_index', False)
         prediction_label_store = SegmentationInputRasterFile(
-            source=raster_source, raster_class_map=raster_class_map)
+            source=raster_source,
+            raster_class_map=raster_class_map,
+            class_index=class_index)
 
         # Compute the intersection of the extents of the ground truth
         # labels and predicted labels.
@@ -1,12 +1,15 @@
+import os
+import tempfile
 import unittest
 
 import numpy as np
 
+from rastervision.core.box import Box
 from rastervision.core.class_map import (ClassItem, ClassMap)
 from rastervision.evaluations.segmentation_evaluation import (
     SegmentationEvaluation)
 from rastervision.label_stores.segmentation_raster_file import (
-    SegmentationInputRasterFile)
+    SegmentationInputRasterFile, SegmentationOutputRasterFile)
 from rastervision.label_stores.segmentation_raster_file_test import (
     TestingRasterSource)
 
@@ -52,6 +55,40 @@ class TestSegmentationEvaluation(unittest.TestCase):
         self.assertEqual(precision2, seval.class_to_eval_item[2].precision)
         self.assertAlmostEqual(recall2, seval.class_to_eval_item[2].recall)
 
+    def test_compute_class_index(self):
+        class_map = ClassMap([
+            ClassItem(id=1, name='one', color='#ff0000'),
+            ClassItem(id=2, name='two', color='#00ff00')
+        ])
+        raster_class_map = {'#010101': 1, '#020202': 2}
+
+        gt_array = np.ones((4, 4, 3), dtype=np.uint8)
+        gt_array[2, 2, :] = 2
+        gt_raster = TestingRasterSource(data=gt_array)
+        gt_label_store = SegmentationInputRasterFile(
+            source=gt_raster, raster_class_map=raster_class_map)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            p_label_store = SegmentationOutputRasterFile(
+                os.path.join(temp_dir, 'predictions.tif'),
+                class_map,
+                extent=Box(0, 0, 4, 4),
+                class_index=True)
+            p_labels = np.ones((4, 4), dtype=np.int64)
+            p_labels[1, 1] = 2
+            p_label_store.extend([(Box(0, 0, 4, 4), p_labels)])
+            p_label_store.save()
+
+            seval = SegmentationEvaluation()
+            seval.compute(class_map, gt_label_store, p_label_store)
+
+        # Class 1 has 14 true positives, 1 false positive at (2, 2) and 1
+        # false negative at (1, 1).
+        self.assertAlmostEqual(14. / 15, seval.class_to_eval_item[1].precision)
+        self.assertAlmostEqual(14. / 15, seval.class_to_eval_item[1].recall)
+        self.assertAlmostEqual(0., seval.class_to_eval_item[2].precision)
+        self.assertAlmostEqual(0., seval.class_to_eval_item[2].recall)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,236 @@
+import math
+
+import numpy as np
+from rasterio import features
+from rasterio.transform import Affine
+from shapely.strtree import STRtree
+
+from rastervision.core.window_grid import WindowGrid
+from rastervision.labels.classification_labels import (ClassificationLabels,
+                                                       NULL_CLASS_ID)
+
+# Maximum number of pixels to rasterize at a time. Rows of cells are
+# rasterized in bands that are at most this big.
+MAX_BAND_PIXELS = 2**24
+
+
+def get_overlap_layers(polygons):
+    """Split polygons into layers in which no two polygons overlap.
+
+    When rasterizing, a polygon overwrites the pixels of the polygons that
+    were rasterized before it, so overlapping polygons need to be rasterized
+    separately. Polygons that only touch along their boundaries can be in the
+    same layer.
+
+    Args:
+        polygons: list of shapely polygons
+
+    Returns:
+        int numpy array with the layer of each polygon
+    """
+    layers = np.zeros((len(polygons), ), dtype=np.int64)
+    if len(polygons) < 2:
+        return layers
+
+    polygon_inds = dict(
+        (id(polygon), ind) for ind, polygon in enumerate(polygons))
+    str_tree = STRtree(polygons)
+    for ind, polygon in enumerate(polygons):
+        used_layers = set()
+        for other in str_tree.query(polygon):
+            other_ind = polygon_inds[id(other)]
+            if other_ind >= ind:
+                continue
+            other_layer = int(layers[other_ind])
+            # Check that the interiors intersect.
+            if (other_layer not in used_layers
+                    and polygon.relate_pattern(other, 'T********')):
+                used_layers.add(other_layer)
+
+        layer = 0
+        while layer in used_layers:
+            layer += 1
+        layers[ind] = layer
+    return layers
+
+
+def count_cell_labels(pixels, resolution):
+    """Count the pixels with each non-zero label in each cell.
+
+    Args:
+        pixels: 2D int numpy array of labels with resolution x resolution
+            pixels per cell
+        resolution: (int) number of pixels along each side of a cell
+
+    Returns:
+        (cell_inds, labels, counts) tuple of numpy arrays with an entry for
+            each cell and label, where cells are numbered in row-major order
+    """
+    nb_rows = pixels.shape[0] // resolution
+    nb_cols = pixels.shape[1] // resolution
+    cell_pixels = pixels.reshape(nb_rows, resolution, nb_cols, resolution)
+    cell_pixels = cell_pixels.transpose(0, 2, 1, 3).reshape(
+        nb_rows * nb_cols, resolution * resolution)
+    # Sorting the pixels of each cell puts equal labels in runs.
+    cell_pixels = np.sort(cell_pixels, axis=1)
+    is_run_start = np.ones(cell_pixels.shape, dtype=bool)
+    is_run_start[:, 1:] = cell_pixels[:, 1:] != cell_pixels[:, :-1]
+
+    cell_pixels = cell_pixels.ravel()
+    run_starts = np.flatnonzero(is_run_start.ravel())
+    run_lengths = np.diff(np.append(run_starts, cell_pixels.shape[0]))
+    labels = cell_pixels[run_starts]
+    is_labeled = labels != 0
+    run_starts = run_starts[is_labeled]
+    return (run_starts // (resolution * resolution), labels[is_labeled],
+            run_lengths[is_labeled])
+
+
+def get_intersection_areas(polygons, nb_rows, nb_cols, cell_size, resolution):
+    """Return the areas of the intersections of polygons with grid cells.
+
+    The grid starts at (0, 0) and the cells are numbered in row-major order.
+    A polygon that lies within a single cell intersects it in its whole area.
+    The other polygons are rasterized with resolution x resolution pixels per
+    cell, and the area of each intersection is estimated by counting pixels.
+
+    Args:
+        polygons: list of shapely polygons in pixel coordinates
+        nb_rows: (int) number of rows of cells in the grid
+        nb_cols: (int) number of columns of cells in the grid
+        cell_size: (int) height and width of each cell
+        resolution: (int) number of pixels along each side of a cell
+
+    Returns:
+        (cell_inds, polygon_inds, areas) tuple of numpy arrays with an entry
+            for each cell and polygon that intersect
+    """
+    nb_polygons = len(polygons)
+    all_cell_inds = [np.empty((0, ), dtype=np.int64)]
+    all_polygon_inds = [np.empty((0, ), dtype=np.int64)]
+    all_areas = [np.empty((0, ), dtype=np.float64)]
+
+    # Columns are minx, miny, maxx, maxy.
+    bounds = np.array(
+        [polygon.bounds for polygon in polygons], dtype=np.float64).reshape(
+            -1, 4)
+    row_starts = np.floor(bounds[:, 1] / cell_size).astype(np.int64)
+    col_starts = np.floor(bounds[:, 0] / cell_size).astype(np.int64)
+    row_ends = np.ceil(bounds[:, 3] / cell_size).astype(np.int64)
+    col_ends = np.ceil(bounds[:, 2] / cell_size).astype(np.int64)
+
+    is_small = ((row_ends - row_starts <= 1) & (col_ends - col_starts <= 1))
+    in_grid = ((row_starts >= 0) & (row_starts < nb_rows) & (col_starts >= 0) &
+               (col_starts < nb_cols))
+    small_inds = np.flatnonzero(is_small & in_grid)
+    all_cell_inds.append(row_starts[small_inds] * nb_cols +
+                         col_starts[small_inds])
+    all_polygon_inds.append(small_inds)
+    all_areas.append(
+        np.array([polygons[ind].area for ind in small_inds], dtype=np.float64))
+
+    overlaps_grid = ((row_ends > 0) & (row_starts < nb_rows) & (col_ends > 0) &
+                     (col_starts < nb_cols))
+    large_inds = np.flatnonzero(~is_small & overlaps_grid)
+    layers = np.zeros((nb_polygons, ), dtype=np.int64)
+    layers[large_inds] = get_overlap_layers(
+        [polygons[ind] for ind in large_inds])
+
+    pixel_size = cell_size / resolution
+    pixel_area = pixel_size**2
+    band_nb_rows = max(1, MAX_BAND_PIXELS // (nb_cols * resolution**2))
+    for band_start in range(0, nb_rows, band_nb_rows):
+        band_end = min(band_start + band_nb_rows, nb_rows)
+        band_inds = large_inds[(row_starts[large_inds] < band_end)
+                               & (row_ends[large_inds] > band_start)]
+        if len(band_inds) == 0:
+            continue
+
+        out_shape = ((band_end - band_start) * resolution,
+                     nb_cols * resolution)
+        transform = Affine(pixel_size, 0, 0, 0, pixel_size,
+                           band_start * cell_size)
+        for layer in np.unique(layers[band_inds]):
+            layer_inds = band_inds[layers[band_inds] == layer]
+            # Pixels are labeled with polygon index + 1 so 0 is background.
+            pixels = features.rasterize(
+                [(polygons[ind], ind + 1) for ind in layer_inds],
+                out_shape=out_shape,
+                transform=transform,
+                fill=0,
+                dtype=np.int32)
+
+            cell_inds, labels, counts = count_cell_labels(pixels, resolution)
+            all_cell_inds.append(cell_inds + band_start * nb_cols)
+            all_polygon_inds.append(labels - 1)
+            all_areas.append(counts * pixel_area)
+
+    return (np.concatenate(all_cell_inds), np.concatenate(all_polygon_inds),
+            np.concatenate(all_areas))
+
+
+def infer_labels_by_rasterizing(polygons, extent, options):
+    """Infer ClassificationLabels grid by rasterizing polygons.
+
+    This is equivalent to calling infer_cell on each cell in the grid, except
+    that the areas of intersections are estimated by rasterizing the polygons
+    at a resolution finer than the cells. Instead of intersecting each cell
+    with each polygon, the intersections of all cells and polygons are found
+    with vectorized operations over the rasterized polygons.
+
+    Args:
+        polygons: list of shapely polygons in pixel coordinates with
+            class_id attributes
+        extent: Box representing the bounds of the grid
+        options: rastervision.protos.label_store_pb2.ClassificationGeoJSONFile.Options  # noqa
+
+    Returns:
+        ClassificationLabels
+    """
+    cell_size = options.cell_size
+    resolution = max(1, options.rasterize_resolution)
+    cells = WindowGrid.from_extent(extent, cell_size, cell_size)
+    nb_rows = int(math.ceil(extent.get_height() / cell_size))
+    nb_cols = int(math.ceil(extent.get_width() / cell_size))
+
+    # Polygons without area can't have an IOA with a cell.
+    polygons = [polygon for polygon in polygons if polygon.area > 0]
+    class_ids = np.array(
+        [polygon.class_id for polygon in polygons], dtype=np.int64)
+    polygon_areas = np.array(
+        [polygon.area for polygon in polygons], dtype=np.float64)
+
+    cell_inds, polygon_inds, areas = get_intersection_areas(
+        polygons, nb_rows, nb_cols, cell_size, resolution)
+
+    # Find polygons whose intersection with the cell is big enough.
+    if options.use_intersection_over_cell:
+        ioas = areas / float(cell_size * cell_size)
+    else:
+        ioas = areas / polygon_areas[polygon_inds]
+    is_candidate = ioas >= options.ioa_thresh
+    cell_inds = cell_inds[is_candidate]
+    polygon_inds = polygon_inds[is_candidate]
+    areas = areas[is_candidate]
+    candidate_class_ids = class_ids[polygon_inds]
+
+    # Sort the candidates of each cell so the one to pick comes first.
+    if options.pick_min_class_id:
+        order = np.lexsort((candidate_class_ids, cell_inds))
+    else:
+        # Pick class_id of the polygon with the biggest intersection over
+        # cell. If there is a tie, pick the first.
+        order = np.lexsort((polygon_inds, -areas, cell_inds))
+    cell_inds = cell_inds[order]
+    candidate_class_ids = candidate_class_ids[order]
+    is_first = np.diff(cell_inds, prepend=-1) != 0
+
+    background_class_id = (NULL_CLASS_ID if options.background_class_id == 0
+                           else options.background_class_id)
+    cell_class_ids = np.full(
+        (len(cells), ), background_class_id, dtype=np.int64)
+    cell_class_ids[cell_inds[is_first]] = candidate_class_ids[is_first]
+
+    labels = ClassificationLabels()
+    labels.set_cells(cells, cell_class_ids)
+    return labels
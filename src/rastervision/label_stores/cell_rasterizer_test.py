@@ -0,0 +1,102 @@
+import unittest
+
+import numpy as np
+from shapely import geometry
+from shapely.strtree import STRtree
+
+from rastervision.core.box import Box
+from rastervision.label_stores.cell_rasterizer import (
+    get_overlap_layers, get_intersection_areas, infer_labels_by_rasterizing)
+from rastervision.label_stores.classification_geojson_file import infer_cell
+from rastervision.protos.label_store_pb2 import (
+    ClassificationGeoJSONFile as ClassificationGeoJSONFileConfig)
+
+
+def make_polygon(ymin, xmin, ymax, xmax, class_id):
+    polygon = geometry.box(xmin, ymin, xmax, ymax)
+    polygon.class_id = class_id
+    return polygon
+
+
+class TestCellRasterizer(unittest.TestCase):
+    def setUp(self):
+        # Rectangles whose sides lie on the boundaries of pixels, so their
+        # rasterized areas are exact.
+        self.polygons = [
+            make_polygon(0, 0, 2, 2, 1),
+            make_polygon(2, 2, 4, 4, 2),
+            make_polygon(1, 1, 7, 5, 1),
+            make_polygon(4.5, 0.5, 8, 3, 2),
+            make_polygon(10.5, 10.5, 11, 11, 3),
+            make_polygon(6, 6, 20, 9, 3),
+            make_polygon(-2, -2, 1.5, 1.5, 2)
+        ]
+        self.extent = Box.make_square(0, 0, 10)
+
+    def make_options(self, ioa_thresh, use_intersection_over_cell,
+                     pick_min_class_id, background_class_id):
+        options = ClassificationGeoJSONFileConfig.Options()
+        options.ioa_thresh = ioa_thresh
+        options.use_intersection_over_cell = use_intersection_over_cell
+        options.pick_min_class_id = pick_min_class_id
+        options.background_class_id = background_class_id
+        options.infer_cells = True
+        options.cell_size = 4
+        options.rasterize_cells = True
+        options.rasterize_resolution = 8
+        return options
+
+    def test_get_overlap_layers(self):
+        polygons = [
+            make_polygon(0, 0, 2, 2, 1),
+            make_polygon(0, 2, 2, 4, 1),
+            make_polygon(1, 1, 3, 3, 1),
+            make_polygon(1, 0, 3, 1, 1)
+        ]
+        layers = get_overlap_layers(polygons)
+        np.testing.assert_array_equal(layers, [0, 0, 1, 1])
+
+    def test_get_intersection_areas(self):
+        cell_inds, polygon_inds, areas = get_intersection_areas(
+            self.polygons, 3, 3, 4, 8)
+        intersections = {}
+        for cell_ind, polygon_ind, area in zip(cell_inds, polygon_inds, areas):
+            intersections[(cell_ind, polygon_ind)] = area
+
+        cells = [
+            Box.make_square(y, x, 4) for y in range(0, 12, 4)
+            for x in range(0, 12, 4)
+        ]
+        for cell_ind, cell in enumerate(cells):
+            for polygon_ind, polygon in enumerate(self.polygons):
+                area = polygon.intersection(
+                    geometry.box(cell.xmin, cell.ymin, cell.xmax,
+                                 cell.ymax)).area
+                self.assertAlmostEqual(
+                    intersections.get((cell_ind, polygon_ind), 0.0), area)
+
+    def test_same_as_infer_cell(self):
+        str_tree = STRtree(self.polygons)
+        for ioa_thresh in [0.0001, 0.3, 0.5, 1.0]:
+            for use_intersection_over_cell in [False, True]:
+                for pick_min_class_id in [False, True]:
+                    for background_class_id in [0, 4]:
+                        options = self.make_options(
+                            ioa_thresh, use_intersection_over_cell,
+                            pick_min_class_id, background_class_id)
+                        labels = infer_labels_by_rasterizing(
+                            self.polygons, self.extent, options)
+
+                        cells = list(self.extent.get_windows(4, 4))
+                        self.assertEqual(len(labels), len(cells))
+                        for cell in cells:
+                            class_id = infer_cell(str_tree, cell, ioa_thresh,
+                                                  use_intersection_over_cell,
+                                                  background_class_id,
+                                                  pick_min_class_id)
+                            self.assertEqual(
+                                labels.get_cell_class_id(cell), class_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
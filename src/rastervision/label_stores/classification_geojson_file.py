@@ -1,16 +1,20 @@
-import json
+import math
+from multiprocessing import Pool
 
 import numpy as np
 from shapely.strtree import STRtree
 from shapely import geometry
 
+from rastervision.core.window_grid import WindowGrid
+from rastervision.label_stores.cell_rasterizer import (
+    infer_labels_by_rasterizing)
 from rastervision.labels.classification_labels import (ClassificationLabels)
 from rastervision.label_stores.object_detection_geojson_file import (
     geojson_to_labels as geojson_to_object_detection_labels)
 from rastervision.label_stores.utils import (
-    add_classes_to_geojson, load_label_store_json, boxes_to_geojson,
-    geojson_to_shapely_polygons)
-from rastervision.utils.files import str_to_file
+    stream_label_store_geojson, boxes_to_geojson, geojson_to_shapely_polygons)
+from rastervision.label_stores.geojson_stream import write_box_features
+from rastervision.utils.files import open_text_file
 from rastervision.label_stores.classification_label_store import (
     ClassificationLabelStore)
 
@@ -79,11 +83,43 @@ def infer_cell(str_tree, cell, ioa_thresh, use_intersection_over_cell,
     return class_id
 
 
+def infer_cells(polygons, class_ids, npboxes, options):
+    """Infer the class_ids of cells given a set of polygons.
+
+    This is a top-level function so that it can be run in a worker process.
+    The class_ids are passed separately from the polygons since attributes of
+    shapely geometries are lost when they are pickled.
+
+    Args:
+        polygons: list of shapely polygons
+        class_ids: list of the class_id of each polygon
+        npboxes: nx4 numpy array of cells
+        options: rastervision.protos.label_store_pb2.ClassificationGeoJSONFile.Options  # noqa
+
+    Returns:
+        list of the class_id (int or None) of each cell
+    """
+    for polygon, class_id in zip(polygons, class_ids):
+        polygon.class_id = class_id
+    str_tree = STRtree(polygons)
+
+    return [
+        infer_cell(str_tree, cell, options.ioa_thresh,
+                   options.use_intersection_over_cell,
+                   options.background_class_id, options.pick_min_class_id)
+        for cell in WindowGrid(npboxes)
+    ]
+
+
 def infer_labels(geojson_dict, crs_transformer, extent, options):
     """Infer ClassificationLabels grid from GeoJSON containing polygons.
 
     Given GeoJSON with polygons associated with class_ids, infer a grid of
-    cells and class_ids that best captures the contents of each cell.
+    cells and class_ids that best captures the contents of each cell. If
+    options.rasterize_cells is set, the polygons are rasterized instead of
+    being intersected with each cell. Otherwise, the grid is split into bands
+    of options.band_size rows which are inferred using options.num_workers
+    processes, and each band only considers the polygons overlapping with it.
 
     Args:
         geojson_dict: dict in GeoJSON format
@@ -96,16 +132,45 @@ def infer_labels(geojson_dict, crs_transformer, extent, options):
         ClassificationLabels
     """
     polygons = geojson_to_shapely_polygons(geojson_dict, crs_transformer)
-    str_tree = STRtree(polygons)
-    labels = ClassificationLabels()
+    if options.rasterize_cells:
+        return infer_labels_by_rasterizing(polygons, extent, options)
+
+    cells = WindowGrid.from_extent(extent, options.cell_size,
+                                   options.cell_size)
+    class_ids = [polygon.class_id for polygon in polygons]
+    # Columns are minx, miny, maxx, maxy.
+    bounds = np.array(
+        [polygon.bounds for polygon in polygons], dtype=np.float64).reshape(
+            -1, 4)
+
+    # Cells are in row-major order, so each band is a slice of the cells.
+    nb_cols = int(math.ceil(extent.get_width() / options.cell_size))
+    band_len = max(1, options.band_size) * max(1, nb_cols)
+    bands = [
+        cells[start:start + band_len]
+        for start in range(0, len(cells), band_len)
+    ]
+    band_args = []
+    for band in bands:
+        npboxes = band.get_npboxes()
+        ymin = npboxes[:, 0].min()
+        ymax = npboxes[:, 2].max()
+        # Polygons that touch the band may be candidates if ioa_thresh is 0.
+        polygon_inds = np.flatnonzero((bounds[:, 1] <= ymax)
+                                      & (bounds[:, 3] >= ymin))
+        band_args.append(
+            ([polygons[ind] for ind in polygon_inds],
+             [class_ids[ind] for ind in polygon_inds], npboxes, options))
+
+    if options.num_workers > 1 and len(bands) > 1:
+        with Pool(options.num_workers) as pool:
+            band_class_ids = pool.starmap(infer_cells, band_args)
+    else:
+        band_class_ids = [infer_cells(*args) for args in band_args]
 
-    cells = extent.get_windows(options.cell_size, options.cell_size)
-    for cell in cells:
-        class_id = infer_cell(str_tree, cell, options.ioa_thresh,
-                              options.use_intersection_over_cell,
-                              options.background_class_id,
-                              options.pick_min_class_id)
-        labels.set_cell(cell, class_id)
+    labels = ClassificationLabels()
+    for band, class_ids in zip(bands, band_class_ids):
+        labels.set_cells(band, class_ids)
     return labels
 
 
@@ -130,7 +195,7 @@ def read_labels(geojson_dict, crs_transformer, extent):
                                                    crs_transformer, extent)
 
     labels = ClassificationLabels()
-    boxes = od_labels.get_boxes()
+    boxes = od_labels.get_box_array()
     class_ids = od_labels.get_class_ids()
     for box, class_id in zip(boxes, class_ids):
         labels.set_cell(box, class_id)
@@ -175,7 +240,7 @@ def to_geojson(labels, crs_transformer, class_map):
     Returns:
         dict in GeoJSON format
     """
-    boxes = labels.get_cells()
+    boxes = labels.get_cell_array()
     class_ids = labels.get_class_ids()
 
     return boxes_to_geojson(boxes, class_ids, crs_transformer, class_map)
@@ -223,9 +288,8 @@ class ClassificationGeoJSONFile(ClassificationLabelStore):
 
         self.labels = ClassificationLabels()
 
-        geojson_dict = load_label_store_json(uri, readable)
-        if geojson_dict:
-            geojson_dict = add_classes_to_geojson(geojson_dict, class_map)
+        geojson_dict = stream_label_store_geojson(uri, readable, class_map)
+        if geojson_dict is not None:
             self.labels = load_geojson(geojson_dict, crs_transformer, extent,
                                        options)
 
@@ -236,9 +300,9 @@ class ClassificationGeoJSONFile(ClassificationLabelStore):
         written, not the original polygons.
         """
         if self.writable:
-            geojson_dict = to_geojson(self.labels, self.crs_transformer,
-                                      self.class_map)
-            geojson_str = json.dumps(geojson_dict)
-            str_to_file(geojson_str, self.uri)
+            with open_text_file(self.uri, 'w') as file_obj:
+                write_box_features(file_obj, self.labels.get_cell_array(),
+                                   self.labels.get_class_ids(),
+                                   self.crs_transformer, self.class_map)
         else:
             raise ValueError('Cannot save with writable=False')
@@ -13,6 +13,7 @@ from rastervision.label_stores.utils import geojson_to_shapely_polygons
 from rastervision.core.crs_transformer import CRSTransformer
 from rastervision.core.box import Box
 from rastervision.core.class_map import ClassMap, ClassItem
+from rastervision.utils.files import NotReadableError
 from rastervision.protos.label_store_pb2 import (
     ClassificationGeoJSONFile as ClassificationGeoJSONFileConfig)
 
@@ -240,6 +241,54 @@ class TestObjectDetectionJsonFile(unittest.TestCase):
         class_id = labels.get_cell_class_id(Box.make_square(2, 0, 2))
         self.assertEqual(class_id, self.background_class_id)
 
+    def test_infer_labels_rasterize(self):
+        extent = Box.make_square(0, 0, 4)
+        options = ClassificationGeoJSONFileConfig.Options()
+        options.ioa_thresh = 0.5
+        options.use_intersection_over_cell = False
+        options.background_class_id = self.background_class_id
+        options.pick_min_class_id = False
+        options.infer_cells = True
+        options.cell_size = 2
+        options.rasterize_cells = True
+
+        labels = infer_labels(self.geojson_dict, self.crs_transformer, extent,
+                              options)
+        cells = labels.get_cells()
+
+        self.assertEqual(len(cells), 4)
+        class_id = labels.get_cell_class_id(self.box1)
+        self.assertEqual(class_id, self.class_id1)
+        class_id = labels.get_cell_class_id(self.box2)
+        self.assertEqual(class_id, self.class_id2)
+        class_id = labels.get_cell_class_id(Box.make_square(0, 2, 2))
+        self.assertEqual(class_id, self.background_class_id)
+        class_id = labels.get_cell_class_id(Box.make_square(2, 0, 2))
+        self.assertEqual(class_id, self.background_class_id)
+
+    def test_infer_labels_bands(self):
+        extent = Box.make_square(0, 0, 8)
+        options = ClassificationGeoJSONFileConfig.Options()
+        options.ioa_thresh = 0.5
+        options.use_intersection_over_cell = False
+        options.background_class_id = self.background_class_id
+        options.pick_min_class_id = False
+        options.infer_cells = True
+        options.cell_size = 2
+        labels = infer_labels(self.geojson_dict, self.crs_transformer, extent,
+                              options)
+
+        options.band_size = 1
+        options.num_workers = 2
+        band_labels = infer_labels(self.geojson_dict, self.crs_transformer,
+                                   extent, options)
+
+        self.assertEqual(len(band_labels), 16)
+        self.assertDictEqual(band_labels.cell_to_class_id,
+                             labels.cell_to_class_id)
+        class_id = band_labels.get_cell_class_id(self.box2)
+        self.assertEqual(class_id, self.class_id2)
+
     def test_read_labels1(self):
         # Extent only has enough of first box in it.
         extent = Box.make_square(0, 0, 2.5)
@@ -301,6 +350,23 @@ class TestObjectDetectionJsonFile(unittest.TestCase):
         self.assertDictEqual(labels1.cell_to_class_id,
                              labels2.cell_to_class_id)
 
+    def test_read_invalid_uri(self):
+        invalid_uri = os.path.join(self.temp_dir.name, 'invalid.json')
+        options = ClassificationGeoJSONFileConfig.Options()
+        extent = Box.make_square(0, 0, 10)
+        with self.assertRaises(NotReadableError):
+            ClassificationGeoJSONFile(invalid_uri, self.crs_transformer,
+                                      options, self.class_map, extent)
+
+        label_store = ClassificationGeoJSONFile(
+            invalid_uri,
+            self.crs_transformer,
+            options,
+            self.class_map,
+            extent,
+            readable=False)
+        self.assertEqual(label_store.get_labels().get_cells(), [])
+
 
 if __name__ == '__main__':
     unittest.main()
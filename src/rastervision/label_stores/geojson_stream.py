@@ -0,0 +1,247 @@
+import json
+
+import numpy as np
+
+from rastervision.core.box_array import BoxArray
+
+# Number of characters to read from a file at a time.
+CHUNK_SIZE = 1 << 20
+
+# Number of features to format at a time when writing.
+FEATURE_CHUNK_SIZE = 10000
+
+# Template for a box feature, formatted with the reprs of the 10 coordinates
+# of its polygon followed by its class_id, JSON encoded class_name and score.
+# This produces the same string as json.dumps with finite coordinates and
+# scores.
+_BOX_FEATURE_TEMPLATE = (
+    '{"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [[' +
+    ', '.join(['[%s, %s]'] * 5) + ']]}, "properties": {"class_id": %r, '
+    '"class_name": %s, "score": %r}}')
+
+_WHITESPACE = ' \t\n\r'
+# Characters which can follow a JSON value.
+_DELIMITERS = ',:]}' + _WHITESPACE
+_decoder = json.JSONDecoder()
+
+
+class _JSONReader(object):
+    """Reads JSON values one at a time from a file-like object.
+
+    Only a chunk of the file and the value currently being decoded are kept
+    in memory.
+    """
+
+    def __init__(self, file_obj, chunk_size):
+        self.file_obj = file_obj
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _read_chunk(self):
+        """Read the next chunk into the buffer, discarding consumed text.
+
+        Returns:
+            False if the end of the file has been reached
+        """
+        chunk = self.file_obj.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character, or '' at end of file."""
+        while True:
+            while (self.pos < len(self.buffer)
+                   and self.buffer[self.pos] in _WHITESPACE):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_chunk():
+                return ''
+
+    def expect(self, chars):
+        """Consume the next non-whitespace character, which is one of chars.
+
+        Returns:
+            the consumed character
+        """
+        char = self.peek()
+        if char == '' or char not in chars:
+            raise json.JSONDecodeError('Expecting one of {}'.format(chars),
+                                       self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+    def decode(self):
+        """Decode and consume the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # A number may continue in the next chunk (eg. "-12" may be
+                # the start of "-12.5"), unless it is followed by a
+                # delimiter.
+                is_number = (isinstance(value, (int, float))
+                             and not isinstance(value, bool))
+                if (self.eof or not is_number
+                        or (end < len(self.buffer)
+                            and self.buffer[end] in _DELIMITERS)):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_chunk()
+
+
+def iter_features(file_obj, chunk_size=CHUNK_SIZE):
+    """Iterate over the features of a GeoJSON FeatureCollection.
+
+    The file is parsed incrementally, so only one feature is held in memory
+    at a time, instead of the whole file and the dict built from it.
+
+    Args:
+        file_obj: file-like object with a read method that returns strings
+        chunk_size: (int) number of characters to read at a time
+
+    Returns:
+        generator of features, each of which is a dict in GeoJSON format
+
+    Raises:
+        json.JSONDecodeError if the file does not contain a JSON object
+    """
+    reader = _JSONReader(file_obj, chunk_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        key = reader.decode()
+        reader.expect(':')
+        if key == 'features':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.expect(']')
+            else:
+                while True:
+                    yield reader.decode()
+                    if reader.expect(',]') == ']':
+                        break
+        else:
+            reader.decode()
+
+        if reader.expect(',}') == '}':
+            return
+
+
+def format_box_features(boxes,
+                        class_ids,
+                        crs_transformer,
+                        class_map,
+                        scores=None):
+    """Format boxes as GeoJSON features.
+
+    This is equivalent to calling json.dumps on each of the features returned
+    by boxes_to_geojson, but is much faster.
+
+    Args:
+        boxes: BoxArray in pixel row/col format
+        class_ids: numpy array of class_ids (one for each box)
+        crs_transformer: CRSTransformer used to convert pixel coords to map
+            coords in the GeoJSON
+        class_map: ClassMap used to infer class_name from class_id
+        scores: optional numpy array of scores (one for each box)
+
+    Returns:
+        list of strings
+    """
+    polygons = crs_transformer.pixel_to_map_array(
+        boxes.get_geojson_coordinates().reshape(-1, 2))
+    # The last point of each polygon is the same as the first.
+    polygons = np.asarray(polygons).reshape(-1, 5, 2)[:, 0:4].reshape(-1, 8)
+    class_ids = np.asarray(class_ids, dtype=np.int64)
+    if scores is None:
+        scores = np.zeros((len(boxes), ))
+    scores = np.asarray(scores)
+
+    class_ids = class_ids.tolist()
+    class_names = dict((class_id,
+                        json.dumps(class_map.get_by_id(class_id).name))
+                       for class_id in set(class_ids))
+
+    # repr doesn't produce valid JSON for NaN and infinity.
+    is_finite = (np.all(np.isfinite(polygons)) and np.all(np.isfinite(scores)))
+    features = []
+    for polygon, class_id, score in zip(polygons.tolist(), class_ids,
+                                        scores.tolist()):
+        if is_finite:
+            # Formatting floats is the bottleneck, so the first point is only
+            # formatted once.
+            x0, y0, x1, y1, x2, y2, x3, y3 = map(repr, polygon)
+            features.append(_BOX_FEATURE_TEMPLATE %
+                            (x0, y0, x1, y1, x2, y2, x3, y3, x0, y0, class_id,
+                             class_names[class_id], score))
+        else:
+            polygon = polygon + polygon[0:2]
+            features.append(
+                json.dumps({
+                    'type': 'Feature',
+                    'geometry': {
+                        'type':
+                        'Polygon',
+                        'coordinates':
+                        [[polygon[i:i + 2] for i in range(0, 10, 2)]]
+                    },
+                    'properties': {
+                        'class_id': class_id,
+                        'class_name': json.loads(class_names[class_id]),
+                        'score': score
+                    }
+                }))
+    return features
+
+
+def write_box_features(file_obj,
+                       boxes,
+                       class_ids,
+                       crs_transformer,
+                       class_map,
+                       scores=None,
+                       chunk_size=FEATURE_CHUNK_SIZE):
+    """Write boxes to a file as a GeoJSON FeatureCollection.
+
+    The output is the same as json.dumps of the output of boxes_to_geojson,
+    but features are formatted and written in chunks, so memory use doesn't
+    grow with the number of boxes.
+
+    Args:
+        file_obj: file-like object with a write method that takes strings
+        boxes: list of Box or BoxArray in pixel row/col format
+        class_ids: list or numpy array of class_ids (one for each box)
+        crs_transformer: CRSTransformer used to convert pixel coords to map
+            coords in the GeoJSON
+        class_map: ClassMap used to infer class_name from class_id
+        scores: optional list or numpy array of scores (one for each box)
+        chunk_size: (int) number of features to format at a time
+    """
+    boxes = BoxArray.from_boxes(boxes)
+    class_ids = np.asarray(class_ids)
+    if scores is not None:
+        scores = np.asarray(scores)
+
+    file_obj.write('{"type": "FeatureCollection", "features": [')
+    for start in range(0, len(boxes), chunk_size):
+        end = start + chunk_size
+        chunk_scores = None if scores is None else scores[start:end]
+        features = format_box_features(boxes[start:end], class_ids[start:end],
+                                       crs_transformer, class_map,
+                                       chunk_scores)
+        if start > 0:
+            file_obj.write(', ')
+        file_obj.write(', '.join(features))
+    file_obj.write(']}')
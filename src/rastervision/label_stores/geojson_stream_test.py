@@ -0,0 +1,149 @@
+import io
+import json
+import unittest
+
+import numpy as np
+
+from rastervision.core.box_array import BoxArray
+from rastervision.core.class_map import ClassMap, ClassItem
+from rastervision.crs_transformers.identity_crs_transformer import (
+    IdentityCRSTransformer)
+from rastervision.label_stores.geojson_stream import (iter_features,
+                                                      write_box_features)
+from rastervision.label_stores.utils import boxes_to_geojson
+
+
+class TestIterFeatures(unittest.TestCase):
+    def setUp(self):
+        self.features = [{
+            'type': 'Feature',
+            'geometry': {
+                'type': 'Polygon',
+                'coordinates': [[[0., 0.], [0., 1.5], [1e-3, 1.], [0., 0.]]]
+            },
+            'properties': {
+                'class_name': 'car "x" [1], {2}',
+                'class_id': 12345,
+                'score': 0.98765
+            }
+        }, {
+            'type': 'Feature',
+            'geometry': {
+                'type': 'Point',
+                'coordinates': [-12, 3]
+            },
+            'properties': None
+        }]
+
+    def iter_features(self, geojson_str, chunk_size):
+        return list(iter_features(io.StringIO(geojson_str), chunk_size))
+
+    def test_iter_features(self):
+        geojson = {
+            'type': 'FeatureCollection',
+            'crs': {
+                'properties': {
+                    'features': []
+                }
+            },
+            'features': self.features,
+            'bbox': [0, 1, 2, 3]
+        }
+        for indent in [None, 4]:
+            geojson_str = json.dumps(geojson, indent=indent)
+            for chunk_size in [1, 2, 7, 1000]:
+                features = self.iter_features(geojson_str, chunk_size)
+                self.assertListEqual(features, self.features)
+
+    def test_split_numbers(self):
+        # Numbers split across chunks are read whole.
+        for geojson in [{
+                'n': 1.5,
+                'features': self.features,
+                'm': -12.5e-3
+        }, {
+                'features': self.features,
+                'n': -12.5,
+                'm': 1e5
+        }]:
+            geojson_str = json.dumps(geojson)
+            for chunk_size in range(1, 17):
+                features = self.iter_features(geojson_str, chunk_size)
+                self.assertListEqual(features, self.features)
+
+    def test_empty(self):
+        self.assertListEqual(self.iter_features('{}', 1), [])
+        self.assertListEqual(
+            self.iter_features('{"features": [ ] , "type": 1}', 2), [])
+        self.assertListEqual(
+            self.iter_features('{"type": "FeatureCollection"}', 3), [])
+
+    def test_invalid_json(self):
+        with self.assertRaises(json.JSONDecodeError):
+            self.iter_features('[]', 1)
+        with self.assertRaises(json.JSONDecodeError):
+            self.iter_features('{"features": [{"a": 1}', 3)
+        with self.assertRaises(json.JSONDecodeError):
+            self.iter_features('{"features": [{"a": 1},]}', 3)
+
+
+class TestWriteBoxFeatures(unittest.TestCase):
+    def setUp(self):
+        self.crs_transformer = IdentityCRSTransformer()
+        self.class_map = ClassMap(
+            [ClassItem(1, 'car'),
+             ClassItem(2, 'house "big" \u00e9')])
+        np.random.seed(0)
+        self.boxes = BoxArray(np.random.uniform(0, 1000, size=(25, 4)))
+        self.class_ids = np.random.randint(1, 3, size=(25, ))
+        self.scores = np.random.uniform(size=(25, ))
+
+    def write_box_features(self, boxes, scores=None, chunk_size=7):
+        file_obj = io.StringIO()
+        write_box_features(
+            file_obj,
+            boxes,
+            self.class_ids[0:len(boxes)],
+            self.crs_transformer,
+            self.class_map,
+            scores=scores,
+            chunk_size=chunk_size)
+        return file_obj.getvalue()
+
+    def boxes_to_geojson_str(self, boxes, scores=None):
+        return json.dumps(
+            boxes_to_geojson(
+                boxes,
+                self.class_ids[0:len(boxes)],
+                self.crs_transformer,
+                self.class_map,
+                scores=scores))
+
+    def test_same_as_boxes_to_geojson(self):
+        self.assertEqual(
+            self.write_box_features(self.boxes, self.scores),
+            self.boxes_to_geojson_str(self.boxes, self.scores))
+        self.assertEqual(
+            self.write_box_features(self.boxes, chunk_size=100),
+            self.boxes_to_geojson_str(self.boxes))
+
+        int_boxes = BoxArray(self.boxes.get_npboxes().astype(np.int64))
+        self.assertEqual(
+            self.write_box_features(int_boxes),
+            self.boxes_to_geojson_str(int_boxes))
+
+    def test_empty(self):
+        empty_boxes = BoxArray.make_empty()
+        self.assertEqual(
+            self.write_box_features(empty_boxes),
+            self.boxes_to_geojson_str(empty_boxes))
+
+    def test_nan_scores(self):
+        self.scores[3] = np.nan
+        self.assertEqual(
+            self.write_box_features(self.boxes, self.scores),
+            self.boxes_to_geojson_str(self.boxes, self.scores))
+
+
+if __name__ == '__main__':
+    unittest.main()
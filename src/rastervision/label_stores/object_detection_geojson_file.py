@@ -1,15 +1,16 @@
-import json
+from array import array
 
 import numpy as np
 
-from rastervision.core.box import Box
 from rastervision.labels.object_detection_labels import (ObjectDetectionLabels)
-from rastervision.label_stores.utils import (add_classes_to_geojson,
-                                             load_label_store_json)
+from rastervision.label_stores.utils import stream_label_store_geojson
 from rastervision.label_stores.object_detection_label_store import (
     ObjectDetectionLabelStore)
-from rastervision.label_stores.utils import boxes_to_geojson
-from rastervision.utils.files import str_to_file, NotWritableError
+from rastervision.label_stores.geojson_stream import write_box_features
+from rastervision.utils.files import open_text_file, NotWritableError
+
+# Number of polygon vertices to transform to pixel coordinates at a time.
+VERTEX_BATCH_SIZE = 1 << 16
 
 
 def geojson_to_labels(geojson_dict, crs_transformer, extent=None):
@@ -19,7 +20,9 @@ def geojson_to_labels(geojson_dict, crs_transformer, extent=None):
     bit" outside the extent.
 
     Args:
-        geojson_dict: dict in GeoJSON format
+        geojson_dict: dict in GeoJSON format with class_id properties. The
+            features can be any iterable, such as the generator returned by
+            stream_label_store_geojson.
         crs_transformer: used to convert map coords in geojson to pixel coords
             in labels object
         extent: Box in pixel coords
@@ -27,39 +30,62 @@ def geojson_to_labels(geojson_dict, crs_transformer, extent=None):
     Returns:
         ObjectDetectionLabels
     """
-    features = geojson_dict['features']
-    boxes = []
-    class_ids = []
-    scores = []
-
-    def polygon_to_label(polygon, crs_transformer):
-        polygon = [crs_transformer.map_to_pixel(p) for p in polygon]
-        xmin, ymin = np.min(polygon, axis=0)
-        xmax, ymax = np.max(polygon, axis=0)
-        boxes.append(Box(ymin, xmin, ymax, xmax))
-
-        properties = feature['properties']
-        class_ids.append(properties['class_id'])
+    # Labels are accumulated in compact columnar arrays rather than lists of
+    # Python objects.
+    npboxes = array('d')
+    class_ids = array('q')
+    scores = array('d')
+    # Vertices of polygons which haven't been transformed into boxes yet.
+    # They are transformed in batches to amortize the cost of calling the
+    # crs_transformer.
+    vertices = array('d')
+    vertex_counts = array('q')
+
+    def flush_vertices():
+        if len(vertex_counts) == 0:
+            return
+        points = crs_transformer.map_to_pixel_array(
+            np.array(vertices, dtype=np.float64).reshape(-1, 2))
+        starts = np.cumsum(vertex_counts) - vertex_counts
+        xmins = np.minimum.reduceat(points[:, 0], starts)
+        ymins = np.minimum.reduceat(points[:, 1], starts)
+        xmaxs = np.maximum.reduceat(points[:, 0], starts)
+        ymaxs = np.maximum.reduceat(points[:, 1], starts)
+        npboxes.frombytes(
+            np.stack([ymins, xmins, ymaxs, xmaxs],
+                     axis=1).astype(np.float64).tobytes())
+        del vertices[:]
+        del vertex_counts[:]
+
+    def polygon_to_label(polygon, properties):
+        for point in polygon:
+            vertices.extend(point[0:2])
+        vertex_counts.append(len(polygon))
+        class_ids.append(int(properties['class_id']))
         scores.append(properties.get('score', 1.0))
+        if len(vertices) >= 2 * VERTEX_BATCH_SIZE:
+            flush_vertices()
 
-    for feature in features:
+    for feature in geojson_dict['features']:
         geom_type = feature['geometry']['type']
         coordinates = feature['geometry']['coordinates']
+        properties = feature['properties']
         if geom_type == 'MultiPolygon':
             for polygon in coordinates:
-                polygon_to_label(polygon[0], crs_transformer)
+                polygon_to_label(polygon[0], properties)
         elif geom_type == 'Polygon':
-            polygon_to_label(coordinates[0], crs_transformer)
+            polygon_to_label(coordinates[0], properties)
         else:
             raise Exception(
                 "Geometries of type {} are not supported in object detection \
                 labels.".format(geom_type))
 
-    if len(boxes):
-        boxes = np.array([box.npbox_format() for box in boxes], dtype=float)
-        class_ids = np.array(class_ids)
-        scores = np.array(scores)
-        labels = ObjectDetectionLabels(boxes, class_ids, scores=scores)
+    flush_vertices()
+    if len(class_ids):
+        labels = ObjectDetectionLabels(
+            np.frombuffer(npboxes, dtype=np.float64).reshape(-1, 4),
+            np.frombuffer(class_ids, dtype=np.int64),
+            scores=np.frombuffer(scores, dtype=np.float64))
     else:
         labels = ObjectDetectionLabels.make_empty()
 
@@ -95,27 +121,24 @@ class ObjectDetectionGeoJSONFile(ObjectDetectionLabelStore):
         self.readable = readable
         self.writable = writable
 
-        self.labels = ObjectDetectionLabels.make_empty()
+        super().__init__()
 
-        json_dict = load_label_store_json(uri, readable)
-        if json_dict:
-            geojson = add_classes_to_geojson(json_dict, class_map)
+        geojson = stream_label_store_geojson(uri, readable, class_map)
+        if geojson:
             self.labels = geojson_to_labels(
                 geojson, crs_transformer, extent=extent)
 
     def save(self):
         """Save labels to URI if writable."""
         if self.writable:
-            boxes = self.labels.get_boxes()
-            class_ids = self.labels.get_class_ids().tolist()
-            scores = self.labels.get_scores().tolist()
-            geojson_dict = boxes_to_geojson(
-                boxes,
-                class_ids,
-                self.crs_transformer,
-                self.class_map,
-                scores=scores)
-            geojson_str = json.dumps(geojson_dict)
-            str_to_file(geojson_str, self.uri)
+            labels = self.get_labels()
+            with open_text_file(self.uri, 'w') as file_obj:
+                write_box_features(
+                    file_obj,
+                    labels.get_box_array(),
+                    labels.get_class_ids(),
+                    self.crs_transformer,
+                    self.class_map,
+                    scores=labels.get_scores())
         else:
             raise NotWritableError('Cannot write with writable=False')
@@ -6,8 +6,11 @@ import json
 import numpy as np
 from moto import mock_s3
 
+from rastervision.label_stores import object_detection_geojson_file
 from rastervision.label_stores.object_detection_geojson_file import (
     ObjectDetectionGeoJSONFile, geojson_to_labels)
+from rastervision.crs_transformers.identity_crs_transformer import (
+    IdentityCRSTransformer)
 from rastervision.label_stores.utils import add_classes_to_geojson
 from rastervision.labels.object_detection_labels import ObjectDetectionLabels
 from rastervision.core.crs_transformer import CRSTransformer
@@ -155,6 +158,22 @@ class TestObjectDetectionJsonFile(unittest.TestCase):
 
         labels.assert_equal(expected_labels)
 
+    def test_geojson_to_labels_batches(self):
+        # Transform the vertices of each polygon in a separate batch.
+        batch_size = object_detection_geojson_file.VERTEX_BATCH_SIZE
+        object_detection_geojson_file.VERTEX_BATCH_SIZE = 1
+        try:
+            geojson = add_classes_to_geojson(self.geojson_dict, self.class_map)
+            labels = geojson_to_labels(geojson, IdentityCRSTransformer())
+        finally:
+            object_detection_geojson_file.VERTEX_BATCH_SIZE = batch_size
+
+        expected_npboxes = np.array([[0., 0., 1., 1.], [1., 1., 2., 2.]])
+        expected_labels = ObjectDetectionLabels(expected_npboxes,
+                                                np.array([1, 2]),
+                                                np.array([0.9, 0.9]))
+        labels.assert_equal(expected_labels)
+
     def test_read_invalid_geometry_type(self):
         with self.assertRaises(Exception):
             geojson = add_classes_to_geojson(self.linestring_geojson_dict,
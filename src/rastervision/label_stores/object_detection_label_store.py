@@ -1,5 +1,8 @@
+from rastervision.core.box_index import BoxIndex
 from rastervision.core.label_store import LabelStore
 from rastervision.labels.object_detection_labels import (ObjectDetectionLabels)
+from rastervision.labels.object_detection_labels_buffer import (
+    ObjectDetectionLabelsBuffer)
 
 
 class ObjectDetectionLabelStore(LabelStore):
@@ -8,18 +11,60 @@ class ObjectDetectionLabelStore(LabelStore):
 
     def clear(self):
         self.labels = ObjectDetectionLabels.make_empty()
+        # Labels added by extend that haven't been merged into self.labels.
+        self.buffer = ObjectDetectionLabelsBuffer()
+        # BoxIndex over indexed_labels, which is rebuilt when the labels
+        # change.
+        self.index = None
+        self.indexed_labels = None
 
     def set_labels(self, labels):
         self.labels = labels
+        self.buffer.clear()
+
+    def flush(self):
+        """Merge labels added by extend into self.labels."""
+        if len(self.buffer) > 0:
+            buffered_labels = self.buffer.get_labels()
+            if len(self.labels) == 0:
+                self.labels = buffered_labels
+            else:
+                self.labels = ObjectDetectionLabels.concatenate(
+                    self.labels, buffered_labels)
+            self.buffer.clear()
+
+    def get_index(self):
+        """Return BoxIndex over the boxes in the labels.
+
+        The index is built lazily and rebuilt whenever the labels have been
+        replaced (eg. by set_labels or extend) since it was last built.
+        """
+        self.flush()
+        if self.indexed_labels is not self.labels:
+            self.index = BoxIndex(self.labels.get_npboxes())
+            self.indexed_labels = self.labels
+        return self.index
 
     def get_labels(self, window=None):
+        self.flush()
         if window is None:
             return self.labels
 
-        return ObjectDetectionLabels.get_overlapping(self.labels, window)
+        candidate_inds = self.get_index().query(window)
+        candidates = self.labels.get_subset(candidate_inds)
+        return ObjectDetectionLabels.get_overlapping(candidates, window)
 
     def extend(self, labels):
-        self.labels = ObjectDetectionLabels.concatenate(self.labels, labels)
+        """Add labels to the LabelStore.
+
+        The labels are appended to a buffer which is only merged with the
+        rest of the labels when they are needed by get_labels or save, so that
+        extending many times (eg. once per batch of predictions) is cheap.
+
+        Args:
+            labels: ObjectDetectionLabels
+        """
+        self.buffer.append(labels)
 
     def save(self):
         raise NotImplementedError()
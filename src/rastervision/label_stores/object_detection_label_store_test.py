@@ -48,6 +48,24 @@ class TestObjectDetectionLabelStore(unittest.TestCase):
             npboxes, class_ids, scores=scores)
         labels.assert_equal(expected_labels)
 
+    def test_get_labels_after_extend(self):
+        store = ObjectDetectionLabelStore()
+        store.extend(self.labels)
+        window = Box.make_square(4, 4, 2)
+        self.assertEqual(len(store.get_labels(window=window)), 0)
+
+        # The spatial index should be rebuilt after adding labels.
+        store.extend(
+            ObjectDetectionLabels(
+                np.array([[5., 5., 7., 7.]]),
+                np.array([3]),
+                scores=np.array([0.5])))
+        labels = store.get_labels(window=window)
+        np.testing.assert_array_equal(labels.get_class_ids(), [3])
+
+        store.set_labels(self.labels)
+        self.assertEqual(len(store.get_labels(window=window)), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,173 @@
+import io
+
+import numpy as np
+
+from rastervision.labels.object_detection_labels import (ObjectDetectionLabels)
+from rastervision.label_stores.object_detection_label_store import (
+    ObjectDetectionLabelStore)
+from rastervision.label_stores.object_detection_geojson_file import (
+    geojson_to_labels)
+from rastervision.label_stores.utils import stream_label_store_geojson
+from rastervision.label_stores.geojson_stream import write_box_features
+from rastervision.utils.files import (file_to_bytes, bytes_to_file,
+                                      open_text_file, NotWritableError)
+
+
+def labels_to_npz(labels, crs_transformer=None):
+    """Serialize ObjectDetectionLabels into the npz format.
+
+    The file has a column for each field of the labels: npboxes (nx4 float64
+    array in pixel coords with cols ymin, xmin, ymax, xmax), class_ids (int64)
+    and scores (float64). If crs_transformer is provided, it also has
+    map_bounds, which are the xmin, ymin, xmax, ymax of the boxes in map
+    coords, so the file can be located without a raster.
+
+    Args:
+        labels: ObjectDetectionLabels
+        crs_transformer: optional CRSTransformer used to compute map_bounds
+
+    Returns:
+        (bytes) contents of npz file
+    """
+    arrays = {
+        'npboxes': labels.get_npboxes().astype(np.float64),
+        'class_ids': labels.get_class_ids().astype(np.int64),
+        'scores': labels.get_scores().astype(np.float64)
+    }
+    if crs_transformer is not None and len(labels) > 0:
+        points = crs_transformer.pixel_to_map_array(
+            labels.get_box_array().get_geojson_coordinates().reshape(-1, 2))
+        points = np.asarray(points, dtype=np.float64)
+        arrays['map_bounds'] = np.concatenate(
+            [points.min(axis=0), points.max(axis=0)])
+
+    with io.BytesIO() as file_buffer:
+        np.savez(file_buffer, **arrays)
+        return file_buffer.getvalue()
+
+
+def npz_to_labels(content_bytes, extent=None):
+    """Deserialize ObjectDetectionLabels from the npz format.
+
+    If extent is provided, filter out the boxes that lie "more than a little
+    bit" outside the extent, as in geojson_to_labels.
+
+    Args:
+        content_bytes: (bytes) contents of npz file written by labels_to_npz
+        extent: Box in pixel coords
+
+    Returns:
+        ObjectDetectionLabels
+    """
+    with np.load(io.BytesIO(content_bytes), allow_pickle=False) as npz:
+        labels = ObjectDetectionLabels(
+            npz['npboxes'].reshape(-1, 4),
+            npz['class_ids'],
+            scores=npz['scores'])
+
+    if extent is not None:
+        labels = ObjectDetectionLabels.get_overlapping(
+            labels, extent, ioa_thresh=0.8, clip=True)
+    return labels
+
+
+def get_npz_map_bounds(uri):
+    """Return the map_bounds of an npz label file.
+
+    Args:
+        uri: uri of npz file
+
+    Returns:
+        (xmin, ymin, xmax, ymax) tuple in map coords or None if the file has
+            no map_bounds
+    """
+    with np.load(io.BytesIO(file_to_bytes(uri)), allow_pickle=False) as npz:
+        if 'map_bounds' not in npz.files:
+            return None
+        return tuple(npz['map_bounds'].tolist())
+
+
+def geojson_to_npz(geojson_uri,
+                   npz_uri,
+                   crs_transformer,
+                   class_map,
+                   extent=None):
+    """Convert a GeoJSON label file into the npz format.
+
+    Args:
+        geojson_uri: uri of GeoJSON file to read
+        npz_uri: uri of npz file to write
+        crs_transformer: CRSTransformer to convert from map coords in the
+            GeoJSON file to pixel coords
+        class_map: ClassMap used to infer class_ids from class_name
+            (or label) field
+        extent: optional Box used to filter the labels by extent
+    """
+    geojson = stream_label_store_geojson(geojson_uri, True, class_map)
+    labels = geojson_to_labels(geojson, crs_transformer, extent=extent)
+    bytes_to_file(labels_to_npz(labels, crs_transformer), npz_uri)
+
+
+def npz_to_geojson(npz_uri, geojson_uri, crs_transformer, class_map):
+    """Convert an npz label file into a GeoJSON label file.
+
+    Args:
+        npz_uri: uri of npz file to read
+        geojson_uri: uri of GeoJSON file to write
+        crs_transformer: CRSTransformer to convert from pixel coords in the
+            npz file to map coords
+        class_map: ClassMap used to infer class_name from class_id
+    """
+    labels = npz_to_labels(file_to_bytes(npz_uri))
+    with open_text_file(geojson_uri, 'w') as file_obj:
+        write_box_features(
+            file_obj,
+            labels.get_box_array(),
+            labels.get_class_ids(),
+            crs_transformer,
+            class_map,
+            scores=labels.get_scores())
+
+
+class ObjectDetectionNpzFile(ObjectDetectionLabelStore):
+    def __init__(self,
+                 uri,
+                 crs_transformer,
+                 class_map,
+                 extent=None,
+                 readable=True,
+                 writable=False):
+        """Construct ObjectDetectionLabelStore backed by an npz file.
+
+        Unlike GeoJSON, the boxes are stored in pixel coords as columns of
+        binary arrays, so the file is compact and loads without parsing or
+        transforming coordinates.
+
+        Args:
+            uri: uri of npz file containing labels
+            crs_transformer: CRSTransformer used to compute the map_bounds
+                when saving
+            class_map: ClassMap of the classes in the labels
+            extent: Box used to filter the labels by extent
+            readable: if True, expect the file to exist
+            writable: if True, allow writing to disk
+        """
+        self.uri = uri
+        self.crs_transformer = crs_transformer
+        self.class_map = class_map
+        self.readable = readable
+        self.writable = writable
+
+        super().__init__()
+
+        if readable:
+            self.labels = npz_to_labels(file_to_bytes(uri), extent=extent)
+
+    def save(self):
+        """Save labels to URI if writable."""
+        if self.writable:
+            bytes_to_file(
+                labels_to_npz(self.get_labels(), self.crs_transformer),
+                self.uri)
+        else:
+            raise NotWritableError('Cannot write with writable=False')
@@ -0,0 +1,141 @@
+import unittest
+import tempfile
+import os
+import json
+
+import numpy as np
+
+from rastervision.label_stores.object_detection_npz_file import (
+    ObjectDetectionNpzFile, labels_to_npz, npz_to_labels, get_npz_map_bounds,
+    geojson_to_npz, npz_to_geojson)
+from rastervision.label_stores.object_detection_geojson_file import (
+    ObjectDetectionGeoJSONFile)
+from rastervision.labels.object_detection_labels import ObjectDetectionLabels
+from rastervision.core.crs_transformer import CRSTransformer
+from rastervision.core.box import Box
+from rastervision.core.class_map import ClassMap, ClassItem
+from rastervision.utils.files import (NotReadableError, NotWritableError,
+                                      file_to_str)
+
+
+class DoubleCRSTransformer(CRSTransformer):
+    """Mock CRSTransformer used for testing.
+
+    Assumes map coords are 2x pixels coords.
+    """
+
+    def map_to_pixel(self, web_point):
+        return (web_point[0] * 2, web_point[1] * 2)
+
+    def pixel_to_map(self, pixel_point):
+        return (pixel_point[0] / 2, pixel_point[1] / 2)
+
+
+class TestObjectDetectionNpzFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'labels.npz')
+
+        self.crs_transformer = DoubleCRSTransformer()
+        self.extent = Box.make_square(0, 0, 10)
+        self.class_map = ClassMap([ClassItem(1, 'car'), ClassItem(2, 'house')])
+        self.labels = ObjectDetectionLabels(
+            np.array([[0., 0., 2., 2.], [2., 2., 4., 4.5]]),
+            np.array([1, 2]),
+            scores=np.array([0.9, 0.7]))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_npz_round_trip(self):
+        labels = npz_to_labels(labels_to_npz(self.labels))
+        labels.assert_equal(self.labels)
+
+        labels = npz_to_labels(
+            labels_to_npz(ObjectDetectionLabels.make_empty()))
+        self.assertEqual(len(labels), 0)
+
+    def test_npz_to_labels_extent(self):
+        extent = Box.make_square(0, 0, 3)
+        labels = npz_to_labels(labels_to_npz(self.labels), extent=extent)
+        expected_labels = ObjectDetectionLabels(
+            np.array([[0., 0., 2., 2.]]),
+            np.array([1]),
+            scores=np.array([0.9]))
+        labels.assert_equal(expected_labels)
+
+    def test_map_bounds(self):
+        store = ObjectDetectionNpzFile(
+            self.file_path,
+            self.crs_transformer,
+            self.class_map,
+            readable=False,
+            writable=True)
+        store.set_labels(self.labels)
+        store.save()
+        self.assertEqual(
+            get_npz_map_bounds(self.file_path), (0., 0., 2.25, 2.))
+
+        store.crs_transformer = None
+        store.save()
+        self.assertIsNone(get_npz_map_bounds(self.file_path))
+
+    def test_read_write(self):
+        store = ObjectDetectionNpzFile(
+            self.file_path,
+            self.crs_transformer,
+            self.class_map,
+            readable=False,
+            writable=True)
+        store.extend(self.labels)
+        store.save()
+
+        store = ObjectDetectionNpzFile(
+            self.file_path,
+            self.crs_transformer,
+            self.class_map,
+            extent=self.extent,
+            readable=True,
+            writable=False)
+        store.get_labels().assert_equal(self.labels)
+
+        with self.assertRaises(NotWritableError):
+            store.save()
+
+    def test_read_invalid_uri(self):
+        invalid_uri = os.path.join(self.temp_dir.name, 'invalid.npz')
+        with self.assertRaises(NotReadableError):
+            ObjectDetectionNpzFile(invalid_uri, self.crs_transformer,
+                                   self.class_map)
+
+        store = ObjectDetectionNpzFile(
+            invalid_uri, self.crs_transformer, self.class_map, readable=False)
+        self.assertEqual(len(store.get_labels()), 0)
+
+    def test_geojson_conversion(self):
+        geojson_path = os.path.join(self.temp_dir.name, 'labels.json')
+        geojson_store = ObjectDetectionGeoJSONFile(
+            geojson_path,
+            self.crs_transformer,
+            self.class_map,
+            readable=False,
+            writable=True)
+        geojson_store.set_labels(self.labels)
+        geojson_store.save()
+
+        geojson_to_npz(geojson_path, self.file_path, self.crs_transformer,
+                       self.class_map)
+        store = ObjectDetectionNpzFile(self.file_path, self.crs_transformer,
+                                       self.class_map)
+        store.get_labels().assert_equal(self.labels)
+
+        out_geojson_path = os.path.join(self.temp_dir.name, 'out.json')
+        npz_to_geojson(self.file_path, out_geojson_path, self.crs_transformer,
+                       self.class_map)
+        self.assertEqual(
+            json.loads(file_to_str(out_geojson_path)),
+            json.loads(file_to_str(geojson_path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
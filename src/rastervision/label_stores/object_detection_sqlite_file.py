@@ -0,0 +1,319 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from urllib.parse import urlparse
+
+import numpy as np
+
+from rastervision.labels.object_detection_labels import (ObjectDetectionLabels)
+from rastervision.label_stores.object_detection_label_store import (
+    ObjectDetectionLabelStore)
+from rastervision.label_stores.object_detection_geojson_file import (
+    geojson_to_labels)
+from rastervision.label_stores.utils import iter_label_store_features
+from rastervision.utils.files import (download_if_needed, upload_if_needed,
+                                      make_dir, NotWritableError)
+
+# Number of features to insert into the database at a time.
+INSERT_BATCH_SIZE = 10000
+
+# The geometries are stored as GeoJSON in map coords, and the R-tree indexes
+# their bounds.
+_CREATE_TABLES_SQL = """
+CREATE TABLE features (
+    id INTEGER PRIMARY KEY,
+    class_id INTEGER NOT NULL,
+    score REAL,
+    geometry TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE features_index USING rtree(id, xmin, xmax, ymin, ymax);
+"""
+
+_INSERT_FEATURE_SQL = """
+INSERT INTO features (id, class_id, score, geometry) VALUES (?, ?, ?, ?)
+"""
+
+_INSERT_BOUNDS_SQL = """
+INSERT INTO features_index (id, xmin, xmax, ymin, ymax) VALUES (?, ?, ?, ?, ?)
+"""
+
+_SELECT_ALL_SQL = """
+SELECT class_id, score, geometry FROM features ORDER BY id
+"""
+
+_SELECT_BOUNDS_SQL = """
+SELECT features.class_id, features.score, features.geometry
+FROM features JOIN features_index ON features.id = features_index.id
+WHERE features_index.xmax >= ? AND features_index.xmin <= ?
+    AND features_index.ymax >= ? AND features_index.ymin <= ?
+ORDER BY features.id
+"""
+
+
+def get_geometry_bounds(geometry):
+    """Return the bounds of a GeoJSON Polygon or MultiPolygon.
+
+    Args:
+        geometry: dict in GeoJSON geometry format
+
+    Returns:
+        (xmin, ymin, xmax, ymax) tuple
+    """
+    polygons = geometry['coordinates']
+    if geometry['type'] == 'Polygon':
+        polygons = [polygons]
+    points = [point for polygon in polygons for point in polygon[0]]
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def insert_features(connection, features):
+    """Insert GeoJSON features into a label database.
+
+    Args:
+        connection: sqlite3 connection to a database with the tables
+            created by _CREATE_TABLES_SQL
+        features: iterable of GeoJSON features with class_id properties and
+            optional score properties
+    """
+    next_id = connection.execute(
+        'SELECT COALESCE(MAX(id), 0) + 1 FROM features').fetchone()[0]
+    feature_rows = []
+    bounds_rows = []
+
+    def flush():
+        connection.executemany(_INSERT_FEATURE_SQL, feature_rows)
+        connection.executemany(_INSERT_BOUNDS_SQL, bounds_rows)
+        del feature_rows[:]
+        del bounds_rows[:]
+
+    for feature in features:
+        geometry = feature['geometry']
+        properties = feature['properties']
+        xmin, ymin, xmax, ymax = get_geometry_bounds(geometry)
+        feature_rows.append((next_id, int(properties['class_id']),
+                             properties.get('score'), json.dumps(geometry)))
+        bounds_rows.append((next_id, xmin, xmax, ymin, ymax))
+        next_id += 1
+        if len(feature_rows) >= INSERT_BATCH_SIZE:
+            flush()
+    flush()
+
+
+def labels_to_features(labels, crs_transformer):
+    """Return GeoJSON features for ObjectDetectionLabels.
+
+    Args:
+        labels: ObjectDetectionLabels
+        crs_transformer: CRSTransformer used to convert pixel coords to map
+            coords
+
+    Returns:
+        generator of GeoJSON features
+    """
+    polygons = crs_transformer.pixel_to_map_array(
+        labels.get_box_array().get_geojson_coordinates().reshape(-1, 2))
+    polygons = np.asarray(polygons).reshape(-1, 5, 2).tolist()
+    class_ids = labels.get_class_ids().astype(np.int64).tolist()
+    scores = labels.get_scores().tolist()
+    for polygon, class_id, score in zip(polygons, class_ids, scores):
+        yield {
+            'type': 'Feature',
+            'geometry': {
+                'type': 'Polygon',
+                'coordinates': [polygon]
+            },
+            'properties': {
+                'class_id': class_id,
+                'score': score
+            }
+        }
+
+
+def write_label_database(path, features):
+    """Write GeoJSON features to a new label database.
+
+    Args:
+        path: local path of database file, which is replaced if it exists
+        features: iterable of GeoJSON features with class_id properties and
+            optional score properties
+    """
+    if os.path.isfile(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            connection.executescript(_CREATE_TABLES_SQL)
+            insert_features(connection, features)
+    finally:
+        connection.close()
+
+
+def save_label_database(features, uri):
+    """Write GeoJSON features to a label database at a URI.
+
+    Args:
+        features: iterable of GeoJSON features with class_id properties and
+            optional score properties
+        uri: URI of database file
+
+    Raises:
+        NotWritableError if URI cannot be written to
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'labels.sqlite')
+        write_label_database(path, features)
+        if urlparse(uri).scheme == 's3':
+            upload_if_needed(path, uri)
+        else:
+            make_dir(uri, use_dirname=True)
+            shutil.copyfile(path, uri)
+
+
+def geojson_to_sqlite(geojson_uri, sqlite_uri, class_map):
+    """Convert a GeoJSON label file into a label database.
+
+    The features are streamed from the GeoJSON file and kept in map coords,
+    so this doesn't need a raster.
+
+    Args:
+        geojson_uri: uri of GeoJSON file to read
+        sqlite_uri: uri of database file to write
+        class_map: ClassMap used to infer class_ids from class_name
+            (or label) field
+    """
+    save_label_database(
+        iter_label_store_features(geojson_uri, class_map), sqlite_uri)
+
+
+def get_map_bounds(window, crs_transformer, buffer_size=1):
+    """Return the bounds of a window in map coords.
+
+    Args:
+        window: Box in pixel coords
+        crs_transformer: CRSTransformer used to convert pixel coords to map
+            coords
+        buffer_size: number of pixels to buffer the window by, so that
+            features which are rounded into the window when converted to
+            pixel coords are included
+
+    Returns:
+        (xmin, ymin, xmax, ymax) tuple
+    """
+    ymin, xmin, ymax, xmax = window.tuple_format()
+    corners = np.array(
+        [[xmin, ymin], [xmin, ymax], [xmax, ymin], [xmax, ymax]],
+        dtype=np.float64)
+    corners += np.array([[-1, -1], [-1, 1], [1, -1], [1, 1]]) * buffer_size
+    points = np.asarray(crs_transformer.pixel_to_map_array(corners))
+    return tuple(points.min(axis=0).tolist() + points.max(axis=0).tolist())
+
+
+class ObjectDetectionSQLiteFile(ObjectDetectionLabelStore):
+    def __init__(self,
+                 uri,
+                 crs_transformer,
+                 class_map,
+                 extent=None,
+                 readable=True,
+                 writable=False):
+        """Construct ObjectDetectionLabelStore backed by a SQLite database.
+
+        The database has an R-tree index over the bounds of the features in
+        map coords. Instead of loading all the labels when constructed, each
+        call to get_labels only reads the features that intersect the window
+        (or the extent if there is no window).
+
+        Args:
+            uri: uri of database file containing labels
+            crs_transformer: CRSTransformer to convert from map coords in
+                the database to pixel coords.
+            class_map: ClassMap of the classes in the labels
+            extent: Box used to filter the labels by extent
+            readable: if True, expect the file to exist
+            writable: if True, allow writing to disk
+        """
+        self.uri = uri
+        self.crs_transformer = crs_transformer
+        self.class_map = class_map
+        self.extent = extent
+        self.readable = readable
+        self.writable = writable
+
+        super().__init__()
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        if readable:
+            path = download_if_needed(uri, self.temp_dir.name)
+            self.connection = sqlite3.connect(
+                'file:{}?mode=ro'.format(path), uri=True)
+
+    def clear(self):
+        super().clear()
+        # Labels in the database are no longer used after they are cleared
+        # or replaced.
+        self.connection = None
+
+    def set_labels(self, labels):
+        super().set_labels(labels)
+        self.connection = None
+
+    def read_labels(self, window=None):
+        """Read labels that overlap with a window from the database.
+
+        Args:
+            window: Box in pixel coords. If None, read the labels within the
+                extent, or all labels if there is no extent.
+
+        Returns:
+            ObjectDetectionLabels
+        """
+        query_window = window if window is not None else self.extent
+        if query_window is None:
+            rows = self.connection.execute(_SELECT_ALL_SQL)
+        else:
+            xmin, ymin, xmax, ymax = get_map_bounds(query_window,
+                                                    self.crs_transformer)
+            rows = self.connection.execute(_SELECT_BOUNDS_SQL,
+                                           (xmin, xmax, ymin, ymax))
+
+        def get_feature(class_id, score, geometry):
+            properties = {'class_id': class_id}
+            if score is not None:
+                properties['score'] = score
+            return {
+                'type': 'Feature',
+                'geometry': json.loads(geometry),
+                'properties': properties
+            }
+
+        features = (get_feature(*row) for row in rows)
+        labels = geojson_to_labels(
+            {
+                'features': features
+            }, self.crs_transformer, extent=self.extent)
+        if window is not None:
+            labels = ObjectDetectionLabels.get_overlapping(labels, window)
+        return labels
+
+    def get_labels(self, window=None):
+        labels = super().get_labels(window)
+        if self.connection is None:
+            return labels
+
+        db_labels = self.read_labels(window)
+        if len(labels) == 0:
+            return db_labels
+        return ObjectDetectionLabels.concatenate(db_labels, labels)
+
+    def save(self):
+        """Save labels to URI if writable."""
+        if self.writable:
+            save_label_database(
+                labels_to_features(self.get_labels(), self.crs_transformer),
+                self.uri)
+        else:
+            raise NotWritableError('Cannot write with writable=False')
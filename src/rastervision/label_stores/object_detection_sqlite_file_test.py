@@ -0,0 +1,157 @@
+import unittest
+import tempfile
+import os
+import json
+
+import numpy as np
+
+from rastervision.label_stores.object_detection_sqlite_file import (
+    ObjectDetectionSQLiteFile, geojson_to_sqlite, get_map_bounds)
+from rastervision.label_stores.object_detection_geojson_file import (
+    ObjectDetectionGeoJSONFile)
+from rastervision.labels.object_detection_labels import ObjectDetectionLabels
+from rastervision.core.crs_transformer import CRSTransformer
+from rastervision.core.box import Box
+from rastervision.core.class_map import ClassMap, ClassItem
+from rastervision.utils.files import (NotReadableError, NotWritableError,
+                                      str_to_file)
+
+
+class DoubleCRSTransformer(CRSTransformer):
+    """Mock CRSTransformer used for testing.
+
+    Assumes map coords are 2x pixels coords.
+    """
+
+    def map_to_pixel(self, web_point):
+        return (web_point[0] * 2, web_point[1] * 2)
+
+    def pixel_to_map(self, pixel_point):
+        return (pixel_point[0] / 2, pixel_point[1] / 2)
+
+
+class TestObjectDetectionSQLiteFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'labels.sqlite')
+        self.geojson_path = os.path.join(self.temp_dir.name, 'labels.json')
+
+        self.crs_transformer = DoubleCRSTransformer()
+        self.class_map = ClassMap([ClassItem(1, 'car'), ClassItem(2, 'house')])
+        self.geojson_dict = {
+            'type':
+            'FeatureCollection',
+            'features': [{
+                'type': 'Feature',
+                'geometry': {
+                    'type':
+                    'Polygon',
+                    'coordinates': [[[0., 0.], [0., 1.], [1., 1.], [1., 0.],
+                                     [0., 0.]]]
+                },
+                'properties': {
+                    'class_name': 'car',
+                    'score': 0.9
+                }
+            }, {
+                'type': 'Feature',
+                'geometry': {
+                    'type':
+                    'MultiPolygon',
+                    'coordinates':
+                    [[[[5., 5.], [5., 6.], [6., 6.], [6., 5.], [5., 5.]]],
+                     [[[20., 20.], [20., 21.], [21., 21.], [21., 20.],
+                       [20., 20.]]]]
+                },
+                'properties': {
+                    'class_name': 'house'
+                }
+            }]
+        }
+        str_to_file(json.dumps(self.geojson_dict), self.geojson_path)
+        geojson_to_sqlite(self.geojson_path, self.file_path, self.class_map)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_map_bounds(self):
+        bounds = get_map_bounds(
+            Box(2, 4, 6, 10), self.crs_transformer, buffer_size=0)
+        self.assertEqual(bounds, (2., 1., 5., 3.))
+
+    def test_get_labels(self):
+        store = ObjectDetectionSQLiteFile(self.file_path, self.crs_transformer,
+                                          self.class_map)
+        expected_labels = ObjectDetectionLabels(
+            np.array([[0., 0., 2., 2.], [10., 10., 12., 12.],
+                      [40., 40., 42., 42.]]),
+            np.array([1, 2, 2]),
+            scores=np.array([0.9, 1.0, 1.0]))
+        store.get_labels().assert_equal(expected_labels)
+
+        store.get_labels(Box.make_square(8, 8, 8)).assert_equal(
+            expected_labels.get_subset(np.array([1])))
+        self.assertEqual(len(store.get_labels(Box.make_square(20, 20, 5))), 0)
+
+    def test_get_labels_extent(self):
+        store = ObjectDetectionSQLiteFile(
+            self.file_path,
+            self.crs_transformer,
+            self.class_map,
+            extent=Box.make_square(0, 0, 11))
+        expected_labels = ObjectDetectionLabels(
+            np.array([[0., 0., 2., 2.]]),
+            np.array([1]),
+            scores=np.array([0.9]))
+        store.get_labels().assert_equal(expected_labels)
+        self.assertEqual(len(store.get_labels(Box.make_square(8, 8, 8))), 0)
+
+    def test_same_as_geojson(self):
+        store = ObjectDetectionSQLiteFile(self.file_path, self.crs_transformer,
+                                          self.class_map)
+        geojson_store = ObjectDetectionGeoJSONFile(
+            self.geojson_path, self.crs_transformer, self.class_map)
+        store.get_labels().assert_equal(geojson_store.get_labels())
+        window = Box.make_square(0, 0, 11)
+        store.get_labels(window).assert_equal(geojson_store.get_labels(window))
+
+    def test_extend_and_save(self):
+        store = ObjectDetectionSQLiteFile(
+            self.file_path,
+            self.crs_transformer,
+            self.class_map,
+            writable=True)
+        new_labels = ObjectDetectionLabels(
+            np.array([[1., 1., 3., 3.]]),
+            np.array([2]),
+            scores=np.array([0.5]))
+        store.extend(new_labels)
+        window = Box.make_square(0, 0, 4)
+        labels = store.get_labels(window)
+        np.testing.assert_array_equal(labels.get_class_ids(), [1, 2])
+
+        out_path = os.path.join(self.temp_dir.name, 'out.sqlite')
+        store.uri = out_path
+        store.save()
+        out_store = ObjectDetectionSQLiteFile(out_path, self.crs_transformer,
+                                              self.class_map)
+        out_store.get_labels().assert_equal(store.get_labels())
+
+        store.set_labels(new_labels)
+        store.get_labels().assert_equal(new_labels)
+
+    def test_read_invalid_uri(self):
+        invalid_uri = os.path.join(self.temp_dir.name, 'invalid.sqlite')
+        with self.assertRaises(NotReadableError):
+            ObjectDetectionSQLiteFile(invalid_uri, self.crs_transformer,
+                                      self.class_map)
+
+        store = ObjectDetectionSQLiteFile(
+            invalid_uri, self.crs_transformer, self.class_map, readable=False)
+        self.assertEqual(len(store.get_labels()), 0)
+        with self.assertRaises(NotWritableError):
+            store.save()
+
+
+if __name__ == '__main__':
+    unittest.main()
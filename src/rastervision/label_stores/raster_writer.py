@@ -0,0 +1,94 @@
+import queue
+import threading
+
+import rasterio
+
+# Default maximum number of windows waiting to be written.
+DEFAULT_WRITE_QUEUE_SIZE = 8
+
+
+class RasterWriter(object):
+    """Writes windows of a raster file as they arrive.
+
+    The file is opened and written by a background thread. Windows are passed
+    to it through a bounded queue, so writing overlaps with producing the
+    windows, and at most queue_size windows are held in memory at a time.
+    """
+
+    def __init__(self,
+                 path,
+                 profile,
+                 queue_size=DEFAULT_WRITE_QUEUE_SIZE,
+                 colormap=None):
+        """Open a raster file for writing.
+
+        Args:
+            path: local path of file to write
+            profile: dict of keyword arguments to rasterio.open, including
+                driver, height, width, count and dtype
+            queue_size: maximum number of windows waiting to be written
+            colormap: optional dict from values of the first band to RGBA
+                tuples, which is embedded in the file
+        """
+        self.height = profile['height']
+        self.width = profile['width']
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.closed = False
+        self.thread = threading.Thread(
+            target=self._run, args=(path, profile, colormap), daemon=True)
+        self.thread.start()
+
+    def _run(self, path, profile, colormap):
+        done = False
+        try:
+            with rasterio.open(path, 'w', **profile) as dataset:
+                if colormap is not None:
+                    dataset.write_colormap(1, colormap)
+                while True:
+                    item = self.queue.get()
+                    if item is None:
+                        done = True
+                        break
+                    window, data = item
+                    dataset.write(data, window=window)
+        except Exception as e:
+            self.error = e
+            # Keep consuming so that writers don't block on a full queue.
+            while not done:
+                done = self.queue.get() is None
+
+    def _check_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def write(self, window, data):
+        """Queue a window to be written.
+
+        The part of the window outside of the raster is discarded.
+
+        Args:
+            window: Box in pixel coords
+            data: numpy array of shape (count, height, width) with the
+                contents of the window
+        """
+        self._check_error()
+        ymin = max(0, int(window.ymin))
+        xmin = max(0, int(window.xmin))
+        ymax = min(self.height, int(window.ymax))
+        xmax = min(self.width, int(window.xmax))
+        if ymax <= ymin or xmax <= xmin:
+            return
+
+        data = data[:, ymin - int(window.ymin):ymax - int(window.ymin), xmin -
+                    int(window.xmin):xmax - int(window.xmin)]
+        self.queue.put((((ymin, ymax), (xmin, xmax)), data))
+
+    def close(self):
+        """Wait for the queued windows to be written and close the file."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+        self._check_error()
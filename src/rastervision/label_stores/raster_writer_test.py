@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import rasterio
+
+from rastervision.core.box import Box
+from rastervision.label_stores.raster_writer import RasterWriter
+
+
+class TestRasterWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'out.tif')
+        self.profile = {
+            'driver': 'GTiff',
+            'height': 5,
+            'width': 6,
+            'count': 2,
+            'dtype': np.uint8
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write(self):
+        writer = RasterWriter(self.path, self.profile, queue_size=1)
+        data = np.arange(2 * 4 * 4, dtype=np.uint8).reshape(2, 4, 4)
+        writer.write(Box(0, 0, 4, 4), data)
+        writer.write(Box(3, 4, 7, 8), data)
+        writer.write(Box(5, 0, 9, 4), data)
+        writer.close()
+        writer.close()
+
+        expected = np.zeros((2, 5, 6), dtype=np.uint8)
+        expected[:, 0:4, 0:4] = data
+        expected[:, 3:5, 4:6] = data[:, 0:2, 0:2]
+        with rasterio.open(self.path) as dataset:
+            np.testing.assert_array_equal(dataset.read(), expected)
+
+    def test_error(self):
+        path = os.path.join(self.temp_dir.name, 'missing', 'out.tif')
+        writer = RasterWriter(path, self.profile, queue_size=1)
+        data = np.zeros((2, 4, 4), dtype=np.uint8)
+        with self.assertRaises(Exception):
+            for _ in range(10):
+                writer.write(Box(0, 0, 4, 4), data)
+            writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
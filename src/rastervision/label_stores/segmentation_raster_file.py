@@ -10,6 +10,8 @@ from rastervision.core.box import Box
 from rastervision.core.class_map import ClassMap
 from rastervision.core.label_store import LabelStore
 from rastervision.core.raster_source import RasterSource
+from rastervision.label_stores.raster_writer import (RasterWriter,
+                                                     DEFAULT_WRITE_QUEUE_SIZE)
 from rastervision.protos.raster_source_pb2 import (RasterSource as
                                                    RasterSourceProto)
 from rastervision.utils.files import (get_local_path, make_dir, sync_dir)
@@ -17,6 +19,134 @@ from rastervision.utils.misc import (color_to_integer, color_to_triple)
 
 RasterUnion = Union[RasterSource, RasterSourceProto, str, None]
 
+# Number of rows of the label raster to read at a time when building a
+# target count table.
+TABLE_BAND_HEIGHT = 512
+
+# Maximum number of source classes for which pixels are translated by
+# comparing them to each class instead of by binary search.
+MAX_COMPARED_CLASSES = 16
+
+
+def pack_rgb(labels: np.ndarray) -> np.ndarray:
+    """Pack the RGB channels of a label chip into integers.
+
+    This is the vectorized equivalent of color_to_integer.
+
+    Args:
+         labels: An array of shape (height, width, 3) or more channels.
+
+    Returns:
+         A uint32 array of shape (height, width).
+
+    """
+    packed = labels[:, :, 0].astype(np.uint32)
+    for channel in (1, 2):
+        packed <<= 8
+        packed |= labels[:, :, channel].astype(np.uint32)
+    return packed
+
+
+def make_palette(class_map: Union[ClassMap, None]) -> np.ndarray:
+    """Make a lookup table from classes to colors.
+
+    Args:
+         class_map: A class map object with the colors of the classes.
+
+    Returns:
+         A uint8 array of shape (n, 3) where row c is the RGB color of
+              class c. Classes without a color, including the last row,
+              are black.
+
+    """
+    if class_map is None or len(class_map) == 0:
+        return np.zeros((1, 3), dtype=np.uint8)
+
+    rv_classes = class_map.get_keys()
+    palette = np.zeros((max(rv_classes) + 2, 3), dtype=np.uint8)
+    for item in class_map.get_items():
+        palette[item.id] = color_to_triple(item.color)
+    return palette
+
+
+def colorize(labels: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Convert an array of classes into RGB bands.
+
+    Args:
+         labels: A 2d array of classes.
+         palette: A lookup table produced by make_palette.
+
+    Returns:
+         A uint8 array of shape (3, height, width).
+
+    """
+    # Classes outside of the palette are looked up in its last (black) row.
+    inds = np.clip(labels, 0, len(palette) - 1)
+    inds[labels < 0] = len(palette) - 1
+    return np.moveaxis(palette[inds], 2, 0)
+
+
+def to_class_index(labels: np.ndarray) -> np.ndarray:
+    """Convert an array of classes into a uint8 array.
+
+    Args:
+         labels: A 2d array of classes.
+
+    Returns:
+         A uint8 array with the same classes, and 0 for classes that don't
+              fit in a uint8.
+
+    """
+    labels = np.asarray(labels)
+    if labels.dtype == np.uint8:
+        return labels
+    return np.where((labels >= 0) & (labels <= 0xff), labels,
+                    0).astype(np.uint8)
+
+
+def count_target_pixels(labels: np.ndarray,
+                        target_classes: List[int]) -> np.ndarray:
+    """Count the target classes equal to each pixel.
+
+    Args:
+         labels: An array of raster vision classes.
+         target_classes: The classes of interest.
+
+    Returns:
+         A uint32 array of the same shape as labels.
+
+    """
+    counts = np.zeros(labels.shape, dtype=np.uint32)
+    for i in target_classes:
+        counts += labels == i
+    return counts
+
+
+def make_cog(src_path: str,
+             dst_path: str,
+             compression: str = 'deflate',
+             block_size: int = 256) -> None:
+    """Copy a raster into a Cloud Optimized GeoTIFF with overviews.
+
+    Args:
+         src_path: The path of the raster to copy.
+         dst_path: The path of the COG to write.
+         compression: The compression of the COG, or 'none'.
+         block_size: The height and width of the tiles of the COG, or 0 to
+              use the default.
+
+    """
+    import rasterio.shutil
+
+    options = {
+        'compress': compression,
+        'overview_resampling': 'nearest',
+        'overviews': 'auto'
+    }
+    if block_size > 0:
+        options['blocksize'] = block_size
+    rasterio.shutil.copy(src_path, dst_path, driver='COG', **options)
+
 
 class SegmentationInputRasterFile(LabelStore):
     """A read-only label store for segmentation raster files.
@@ -25,7 +155,8 @@ class SegmentationInputRasterFile(LabelStore):
 
     def __init__(self,
                  source: RasterUnion,
-                 raster_class_map: Dict[str, int] = {}):
+                 raster_class_map: Dict[str, int] = {},
+                 class_index: bool = False):
         """Constructor.
 
         Args:
@@ -34,6 +165,9 @@ class SegmentationInputRasterFile(LabelStore):
              raster_class_map: A mapping between the labels found in
                   the source (the given labels) and those desired in
                   the destination (those produced by the predictions).
+             class_index: If True, the first band of the source contains
+                  raster vision classes, which are used directly instead
+                  of translating colors with raster_class_map.
 
         """
         if isinstance(source, RasterSource):
@@ -46,6 +180,9 @@ class SegmentationInputRasterFile(LabelStore):
             raise ValueError('Unsure how to handle source={}'.format(
                 type(source)))
         self.raster_class_map = raster_class_map
+        self.class_index = class_index
+        self.target_count_table = None
+        self.target_count_classes = None
 
         if isinstance(raster_class_map, dict):
             source_classes = list(
@@ -61,31 +198,133 @@ class SegmentationInputRasterFile(LabelStore):
         self.source_classes = source_classes
         self.rv_classes = rv_classes
 
-        def source_to_rv(n: int) -> int:
-            """Translate source classes to raster vision classes.
+        # The mapping is stored as sorted arrays of source classes and the
+        # corresponding raster vision classes so that chips can be
+        # translated with vectorized operations instead of per-pixel lookups.
+        sorted_items = sorted(source_to_rv_class_map.items())
+        self.source_keys = np.array(
+            [k for k, v in sorted_items], dtype=np.uint32)
+        self.rv_values = np.array([v for k, v in sorted_items], dtype=np.uint8)
 
-            Args:
-                 n: A source class represented as a packed RGB pixel
-                      (an integer in the range 0 to 2**24-1).
+    def source_to_rv(self, packed: np.ndarray) -> np.ndarray:
+        """Translate source classes to raster vision classes.
 
-            Returns:
-                 The destination class as an integer.
+        Args:
+             packed: An array of source classes represented as packed RGB
+                  pixels (integers in the range 0 to 2**24-1).
 
-            """
-            if n in source_to_rv_class_map:
-                return source_to_rv_class_map.get(n)
-            else:
-                return 0x00
+        Returns:
+             A uint8 array of the same shape containing the destination
+                  classes, with 0 for source classes that are not in the
+                  mapping.
+
+        """
+        if len(self.source_keys) <= MAX_COMPARED_CLASSES:
+            # Comparing against a few classes is faster than searching.
+            # Each pixel matches at most one class, so the masks can be
+            # summed, which is faster than assigning through them.
+            translated = np.zeros(packed.shape, dtype=np.uint8)
+            for key, value in zip(self.source_keys.tolist(), self.rv_values):
+                translated += (packed == key).view(np.uint8) * value
+            return translated
+
+        inds = np.searchsorted(self.source_keys, packed)
+        np.minimum(inds, len(self.source_keys) - 1, out=inds)
+        translated = self.rv_values[inds]
+        translated[self.source_keys[inds] != packed] = 0
+        return translated
+
+    def get_rv_chip(self, window: Box) -> np.ndarray:
+        """Read a chip from the source and translate it to raster vision
+        classes.
+
+        Args:
+             window: The window to read, given as a Box object.
+
+        Returns:
+             A uint8 array of raster vision classes.
 
-        self.source_to_rv = np.vectorize(source_to_rv, otypes=[np.uint8])
+        """
+        chip = self.source._get_chip(window)
+        if self.class_index:
+            return to_class_index(chip[:, :, 0])
+        return self.source_to_rv(pack_rgb(chip))
 
     def clear(self):
         """Clear all labels."""
         self.source = None
+        self.target_count_table = None
+        self.target_count_classes = None
 
     def set_labels(self, source):
         raise NotImplementedError("Method not applicable")
 
+    def build_target_count_table(self, target_classes: List[int]) -> None:
+        """Precompute a summed-area table of the number of target pixels.
+
+        Entry (y, x) of the table is the number of target pixels above and
+        to the left of (y, x), so the number of target pixels in any window
+        can be found by looking up its four corners. The label raster is
+        read once in bands of rows, and the table uses 4 bytes per pixel.
+        The sums are modulo 2**32, which doesn't affect the counts as long
+        as windows have fewer than 2**32 pixels.
+
+        Args:
+             target_classes: The classes of interest.
+
+        """
+        extent = self.source.get_extent()
+        height = int(extent.ymax)
+        width = int(extent.xmax)
+        table = np.zeros((height + 1, width + 1), dtype=np.uint32)
+        for ymin in range(0, height, TABLE_BAND_HEIGHT):
+            ymax = min(ymin + TABLE_BAND_HEIGHT, height)
+            counts = count_target_pixels(
+                self.get_rv_chip(Box(ymin, 0, ymax, width)), target_classes)
+            band = table[ymin + 1:ymax + 1, 1:]
+            np.cumsum(counts, axis=1, out=band)
+            np.cumsum(band, axis=0, out=band)
+            band += table[ymin, 1:]
+
+        self.target_count_table = table
+        self.target_count_classes = list(target_classes)
+
+    def get_target_count(self, window: Box, target_classes: List[int]) -> int:
+        """Return the number of pixels in the target classes in a window.
+
+        If build_target_count_table has been called with the same target
+        classes, this only looks up the table, and the part of the window
+        outside of the extent is ignored. Otherwise, the window is read from
+        the source.
+
+        Args:
+             window: The window to count pixels in.
+             target_classes: The classes of interest.
+
+        Returns:
+             The number of target pixels.
+
+        """
+        table = self.target_count_table
+        if table is not None and list(
+                target_classes) == self.target_count_classes:
+            height = table.shape[0] - 1
+            width = table.shape[1] - 1
+            ymin = min(max(int(window.ymin), 0), height)
+            xmin = min(max(int(window.xmin), 0), width)
+            ymax = min(max(int(window.ymax), ymin), height)
+            xmax = min(max(int(window.xmax), xmin), width)
+            # The sums wrap around on scenes with 2**32 or more pixels, but
+            # the differences are still correct when computed in uint32.
+            corners = table[[ymin, ymax]][:, [xmin, xmax]]
+            return int(np.diff(np.diff(corners, axis=0), axis=1)[0, 0])
+
+        translated = self.get_rv_chip(window)
+        target_count = 0
+        for i in target_classes:
+            target_count = target_count + np.count_nonzero(translated == i)
+        return target_count
+
     def enough_target_pixels(self, window: Box, ioa_threshold: int,
                              target_classes: List[int]) -> bool:
         """Given a window, answer whether the window contains enough pixels in
@@ -104,16 +343,7 @@ class SegmentationInputRasterFile(LabelStore):
 
         """
         if self.source is not None:
-            labels = self.source._get_chip(window)
-            r = np.array(labels[:, :, 0], dtype=np.uint32) * (1 << 16)
-            g = np.array(labels[:, :, 1], dtype=np.uint32) * (1 << 8)
-            b = np.array(labels[:, :, 2], dtype=np.uint32) * (1 << 0)
-            packed = r + g + b
-            translated = self.source_to_rv(packed)
-
-            target_count = 0
-            for i in target_classes:
-                target_count = target_count + (translated == i).sum()
+            target_count = self.get_target_count(window, target_classes)
 
             if target_count < (ioa_threshold):
                 return False
@@ -137,12 +367,7 @@ class SegmentationInputRasterFile(LabelStore):
 
         """
         if window is not None:
-            labels = self.source._get_chip(window)
-            r = np.array(labels[:, :, 0], dtype=np.uint32) * (1 << 16)
-            g = np.array(labels[:, :, 1], dtype=np.uint32) * (1 << 8)
-            b = np.array(labels[:, :, 2], dtype=np.uint32) * (1 << 0)
-            packed = r + g + b
-            return self.source_to_rv(packed)
+            return self.get_rv_chip(window)
 
     def extend(self, labels):
         raise NotImplementedError("Method not applicable")
@@ -154,20 +379,55 @@ class SegmentationInputRasterFile(LabelStore):
 class SegmentationOutputRasterFile(LabelStore):
     """A write-only label store for segmentation raster files.
 
+    If the extent is known, the sink is opened when the first labels
+    arrive, and each window is colorized and written as it arrives instead
+    of being held in memory until save is called.
+
     """
 
-    def __init__(self, sink: Union[str, None],
-                 class_map: Union[ClassMap, None]):
+    def __init__(self,
+                 sink: Union[str, None],
+                 class_map: Union[ClassMap, None],
+                 extent: Union[Box, None] = None,
+                 write_queue_size: int = DEFAULT_WRITE_QUEUE_SIZE,
+                 class_index: bool = False,
+                 compression: str = 'deflate',
+                 block_size: int = 256,
+                 overviews: bool = False):
         """Constructor.
 
         Args:
              sink: A destination for raster label data.
              class_map: A class map object used for producing output
                   rasters.
+             extent: The extent of the scene, which determines the size of
+                  the output raster. If None, labels are held in memory
+                  until save is called, and the size is that of the
+                  union of the windows.
+             write_queue_size: The maximum number of windows waiting to be
+                  written.
+             class_index: If True, write a single band of classes with
+                  the colors of the classes in an embedded colormap.
+                  Otherwise, write three bands with the colors of the
+                  classes.
+             compression: The compression of the output raster (eg.
+                  'deflate' or 'lzw'), or 'none'.
+             block_size: The height and width of the internal tiles of the
+                  output raster, or 0 to write it in strips.
+             overviews: If True, add overviews to the output raster and
+                  lay it out as a Cloud Optimized GeoTIFF.
 
         """
         self.label_pairs = []
         self.class_map = class_map
+        self.extent = extent
+        self.write_queue_size = write_queue_size
+        self.class_index = class_index
+        self.compression = compression
+        self.block_size = block_size
+        self.overviews = overviews
+        self.writer = None
+        self.palette = make_palette(class_map)
 
         if sink is None or sink is '':
             self.sink = None
@@ -177,7 +437,10 @@ class SegmentationOutputRasterFile(LabelStore):
             raise ValueError('Unsure how to handle sink={}'.format(type(sink)))
 
     def clear(self):
-        pass
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.label_pairs = []
 
     def set_labels(self, labels) -> None:
         pass
@@ -185,8 +448,64 @@ class SegmentationOutputRasterFile(LabelStore):
     def get_labels(self) -> None:
         return None
 
+    def open_writer(self, height: int, width: int) -> None:
+        """Open the sink for writing.
+
+        Args:
+             height: The height of the output raster.
+             width: The width of the output raster.
+
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.local_sink = get_local_path(self.sink, self.temp_dir.name)
+        make_dir(self.local_sink, use_dirname=True)
+
+        profile = {
+            'driver': 'GTiff',
+            'height': height,
+            'width': width,
+            'count': 1 if self.class_index else 3,
+            'dtype': np.uint8
+        }
+        if self.block_size > 0:
+            profile.update(
+                tiled=True,
+                blockxsize=self.block_size,
+                blockysize=self.block_size)
+        profile['compress'] = self.compression
+
+        colormap = None
+        if self.class_index:
+            colormap = dict(
+                (class_id, tuple(color) + (255, ))
+                for class_id, color in enumerate(self.palette[:-1].tolist()))
+
+        # A COG is made by copying the raster once it is complete, since
+        # the overviews come before the full resolution data.
+        path = self.local_sink
+        if self.overviews:
+            path = os.path.join(self.temp_dir.name, 'uncompressed.tif')
+            profile['compress'] = 'none'
+        self.writer = RasterWriter(
+            path, profile, queue_size=self.write_queue_size, colormap=colormap)
+        self.writer_path = path
+
+    def write_labels(self, labels: List[Tuple[Box, np.ndarray]]) -> None:
+        """Colorize labels and queue them to be written to the sink.
+
+        Args:
+             labels: A list of Box × np.ndarray pairs.
+
+        """
+        for (box, data) in labels:
+            if self.class_index:
+                data = to_class_index(data)[np.newaxis, :, :]
+            else:
+                data = colorize(data, self.palette)
+            self.writer.write(box, data)
+
     def extend(self, labels: List[Tuple[Box, np.ndarray]]) -> None:
-        """Add incoming labels to the list of labels.
+        """Add incoming labels to the output raster.
 
         Args:
              labels: A list of Box × np.ndarray pairs.
@@ -195,78 +514,50 @@ class SegmentationOutputRasterFile(LabelStore):
              None.
 
         """
-        self.label_pairs.extend(labels)
+        if self.extent is None:
+            self.label_pairs.extend(labels)
+            return
+
+        if self.writer is None:
+            self.open_writer(int(self.extent.ymax), int(self.extent.xmax))
+        self.write_labels(labels)
 
     def save(self):
         """Save the labels to a GeoTiff raster at the location pointed-to by
         self.sink.
 
         """
-        import rasterio
-
-        temp_dir_obj = tempfile.TemporaryDirectory()
-        temp_dir = temp_dir_obj.name
-        local_sink = get_local_path(self.sink, temp_dir)
-
-        make_dir(local_sink, use_dirname=True)
-
-        boxes = list(map(lambda c: c[0], self.label_pairs))
-        xmax = max(map(lambda b: b.xmax, boxes))
-        ymax = max(map(lambda b: b.ymax, boxes))
-
-        rv_classes = self.class_map.get_keys()
-        colors = map(lambda c: c.color, self.class_map.get_items())
-        triples = list(
-            map(lambda c: np.array(color_to_triple(c), dtype=np.uint8),
-                colors))
-        mapping = dict(zip(rv_classes, triples))
-
-        def class_to_channel(channel: int, c: int) -> int:
-            """Given a channel (red, green, or blue) and a class, return the
-            intensity of that channel.
-
-            Args:
-
-                 channel: An integer with value 0, 1, or 2
-                      representing the channel.
-                 c: The class value represented as an integer.
-
-            Returns:
-                 The intensity of the channel for the color associated
-                      with the given class.
-
-            """
-            if c in mapping:
-                return mapping.get(c)[channel]
+        if self.writer is None:
+            if self.extent is None:
+                boxes = list(map(lambda c: c[0], self.label_pairs))
+                height = max(map(lambda b: b.ymax, boxes))
+                width = max(map(lambda b: b.xmax, boxes))
             else:
-                return 0x00
-
-        class_to_r = np.vectorize(
-            lambda c: class_to_channel(0, c), otypes=[np.uint8])
-        class_to_g = np.vectorize(
-            lambda c: class_to_channel(1, c), otypes=[np.uint8])
-        class_to_b = np.vectorize(
-            lambda c: class_to_channel(2, c), otypes=[np.uint8])
-        class_to = [class_to_r, class_to_g, class_to_b]
-
-        # https://github.com/mapbox/rasterio/blob/master/docs/quickstart.rst
-        # https://rasterio.readthedocs.io/en/latest/topics/windowed-rw.html
-        with rasterio.open(
-                local_sink,
-                'w',
-                driver='GTiff',
-                height=ymax,
-                width=xmax,
-                count=3,
-                dtype=np.uint8) as dataset:
-            for (box, data) in self.label_pairs:
-                window = (box.ymin, box.ymax), (box.xmin, box.xmax)
-                for chan in range(3):
-                    pixels = class_to[chan](data)
-                    dataset.write_band(chan + 1, pixels, window=window)
+                height = self.extent.ymax
+                width = self.extent.xmax
+            self.open_writer(int(height), int(width))
+            self.write_labels(self.label_pairs)
+            self.label_pairs = []
+
+        self.writer.close()
+        self.writer = None
+        if self.overviews:
+            make_cog(self.writer_path, self.local_sink, self.compression,
+                     self.block_size)
 
         # sync to s3
         if urlparse(self.sink).scheme == 's3':
-            local_sink_dir = os.path.dirname(local_sink)
+            local_sink_dir = os.path.dirname(self.local_sink)
             remote_sink_dir = os.path.dirname(self.sink)  # sic
             sync_dir(local_sink_dir, remote_sink_dir, delete=False)
+
+    def abort(self) -> None:
+        """Save the labels that have been added so far.
+
+        This flushes the windows that have been written to the sink, so
+        that the output of a scene which fails partway through is kept.
+
+        """
+        if self.writer is None and len(self.label_pairs) == 0:
+            return
+        self.save()
@@ -1,10 +1,23 @@
+import os
+import tempfile
 import unittest
+from types import SimpleNamespace
+
 import numpy as np
+import rasterio
 
 from rastervision.core.raster_source import RasterSource
+from rastervision.core.raster_transformer import RasterTransformer
 from rastervision.core.box import Box
+from rastervision.core.class_map import ClassMap, ClassItem
+from rastervision.core.scene import Scene
+from rastervision.raster_sources.image_file import ImageFile
+from rastervision.label_stores import segmentation_raster_file
 from rastervision.label_stores.segmentation_raster_file import (
-    SegmentationInputRasterFile)
+    SegmentationInputRasterFile, SegmentationOutputRasterFile, pack_rgb,
+    make_palette, colorize)
+from rastervision.ml_tasks.semantic_segmentation import SemanticSegmentation
+from rastervision.utils.misc import color_to_integer
 
 
 class TestingRasterSource(RasterSource):
@@ -66,6 +79,230 @@ class TestSegmentationRasterFile(unittest.TestCase):
         extent = Box(0, 0, 10, 10)
         self.assertFalse(label_store.enough_target_pixels(extent, 30, [1]))
 
+    def test_target_count_table(self):
+        np.random.seed(1)
+        data = np.zeros((30, 20, 3), dtype=np.uint8)
+        data[np.random.rand(30, 20) < 0.3] = [1, 1, 1]
+        data[np.random.rand(30, 20) < 0.3] = [2, 2, 2]
+        raster_source = TestingRasterSource(data=data)
+        label_store = SegmentationInputRasterFile(
+            source=raster_source,
+            raster_class_map={
+                '#010101': 1,
+                '#020202': 2
+            })
+        windows = [
+            Box(0, 0, 30, 20),
+            Box(3, 4, 13, 14),
+            Box(20, 10, 30, 20),
+            Box(7, 0, 8, 20)
+        ]
+        expected_counts = [
+            label_store.get_target_count(window, [1, 2]) for window in windows
+        ]
+        self.assertEqual(expected_counts[0], np.count_nonzero(data[:, :, 0]))
+
+        band_height = segmentation_raster_file.TABLE_BAND_HEIGHT
+        segmentation_raster_file.TABLE_BAND_HEIGHT = 7
+        try:
+            label_store.build_target_count_table([1, 2])
+        finally:
+            segmentation_raster_file.TABLE_BAND_HEIGHT = band_height
+        counts = [
+            label_store.get_target_count(window, [1, 2]) for window in windows
+        ]
+        self.assertEqual(counts, expected_counts)
+
+        # Counts are still correct when the sums wrap around, as they do on
+        # scenes with 2**32 or more pixels.
+        label_store.target_count_table += np.uint32(2**32 - 10)
+        counts = [
+            label_store.get_target_count(window, [1, 2]) for window in windows
+        ]
+        self.assertEqual(counts, expected_counts)
+
+        # Other target classes are counted by reading the window.
+        self.assertEqual(
+            label_store.get_target_count(Box(0, 0, 30, 20), [1]),
+            np.count_nonzero(data[:, :, 0] == 1))
+        self.assertTrue(
+            label_store.enough_target_pixels(Box(0, 0, 30, 20), 1, [1, 2]))
+
+    def test_pack_rgb(self):
+        data = np.array([[[1, 2, 3], [255, 0, 128]]], dtype=np.uint8)
+        np.testing.assert_array_equal(
+            pack_rgb(data),
+            [[color_to_integer('#010203'),
+              color_to_integer('#ff0080')]])
+        np.testing.assert_array_equal(
+            pack_rgb(data.astype(np.float32)), pack_rgb(data))
+
+    def test_get_labels(self):
+        data = np.zeros((5, 4, 3), dtype=np.uint8)
+        data[0, :, :] = [1, 1, 1]
+        data[1, :, :] = [255, 0, 0]
+        data[2, :, :] = [0, 0, 255]
+        data[3, :, :] = [2, 2, 2]
+        data[4, :, :] = [10, 10, 3]
+        raster_source = TestingRasterSource(data=data)
+        raster_class_map = {'#010101': 1, '#ff0000': 3, '#0000ff': 2}
+        label_store = SegmentationInputRasterFile(
+            source=raster_source, raster_class_map=raster_class_map)
+        labels = label_store.get_labels(Box(0, 0, 5, 4))
+        self.assertEqual(labels.dtype, np.uint8)
+        np.testing.assert_array_equal(labels[:, 0], [1, 3, 2, 0, 0])
+
+        # Translate by binary search when there are many source classes.
+        for n in range(segmentation_raster_file.MAX_COMPARED_CLASSES):
+            raster_class_map['#0a0a{:02x}'.format(n)] = 4
+        label_store = SegmentationInputRasterFile(
+            source=raster_source, raster_class_map=raster_class_map)
+        labels = label_store.get_labels(Box(0, 0, 5, 4))
+        np.testing.assert_array_equal(labels[:, 0], [1, 3, 2, 0, 4])
+
+        label_store = SegmentationInputRasterFile(
+            source=raster_source, raster_class_map={})
+        labels = label_store.get_labels(Box(0, 0, 5, 4))
+        np.testing.assert_array_equal(labels, np.zeros((5, 4)))
+
+
+class TestSegmentationOutputRasterFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.sink = os.path.join(self.temp_dir.name, 'out', 'labels.tif')
+        self.class_map = ClassMap([
+            ClassItem(1, 'car', color='#ff0000'),
+            ClassItem(3, 'building', color='#0000ff')
+        ])
+        self.labels = np.zeros((4, 4), dtype=np.int64)
+        self.labels[0:2, :] = 1
+        self.labels[2, :] = 3
+        self.labels[3, :] = [2, 7, -1, 0]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_sink(self):
+        with rasterio.open(self.sink) as dataset:
+            return dataset.read()
+
+    def test_colorize(self):
+        palette = make_palette(self.class_map)
+        rgb = colorize(self.labels, palette)
+        self.assertEqual(rgb.shape, (3, 4, 4))
+        np.testing.assert_array_equal(rgb[:, 0, 0], [255, 0, 0])
+        np.testing.assert_array_equal(rgb[:, 2, 0], [0, 0, 255])
+        np.testing.assert_array_equal(rgb[:, 3, :], np.zeros((3, 4)))
+
+    def test_save_streaming(self):
+        label_store = SegmentationOutputRasterFile(
+            self.sink,
+            self.class_map,
+            extent=Box(0, 0, 6, 6),
+            write_queue_size=1)
+        label_store.clear()
+        label_store.extend([(Box(0, 0, 4, 4), self.labels)])
+        # The part of a window outside of the extent is discarded.
+        label_store.extend([(Box(4, 4, 8, 8), self.labels)])
+        self.assertEqual(label_store.label_pairs, [])
+        label_store.save()
+
+        rgb = self.read_sink()
+        self.assertEqual(rgb.shape, (3, 6, 6))
+        expected_rgb = np.zeros((3, 6, 6), dtype=np.uint8)
+        palette = make_palette(self.class_map)
+        expected_rgb[:, 0:4, 0:4] = colorize(self.labels, palette)
+        expected_rgb[:, 4:6, 4:6] = colorize(self.labels, palette)[:, 0:2, 0:2]
+        np.testing.assert_array_equal(rgb, expected_rgb)
+
+    def test_abort(self):
+        class FailingBackend(object):
+            def __init__(self, labels):
+                self.labels = labels
+                self.num_batches = 0
+
+            def predict(self, chips, windows, options):
+                self.num_batches += 1
+                if self.num_batches > 2:
+                    raise ValueError('predict failed')
+                return [(window, self.labels) for window in windows]
+
+        label_store = SegmentationOutputRasterFile(
+            self.sink, self.class_map, extent=Box(0, 0, 8, 8))
+        raster_source = TestingRasterSource(
+            data=np.ones((8, 8, 3), dtype=np.uint8))
+        raster_source.raster_transformer = RasterTransformer()
+        scene = Scene(
+            'scene', raster_source, prediction_label_store=label_store)
+        options = SimpleNamespace(
+            chip_size=4, batch_size=1, debug=False, prediction_package_uri='')
+        ml_task = SemanticSegmentation(
+            FailingBackend(self.labels), self.class_map)
+        with self.assertRaises(ValueError):
+            ml_task.predict([scene], SimpleNamespace(options=options))
+
+        # The windows predicted before the failure are in the sink.
+        expected_rgb = np.zeros((3, 8, 8), dtype=np.uint8)
+        expected_rgb[:, 0:4, 0:8] = np.tile(
+            colorize(self.labels, make_palette(self.class_map)), (1, 1, 2))
+        np.testing.assert_array_equal(self.read_sink(), expected_rgb)
+
+    def test_save_without_extent(self):
+        label_store = SegmentationOutputRasterFile(self.sink, self.class_map)
+        label_store.extend([(Box(0, 4, 4, 8), self.labels)])
+        label_store.save()
+
+        rgb = self.read_sink()
+        self.assertEqual(rgb.shape, (3, 4, 8))
+        np.testing.assert_array_equal(
+            rgb[:, :, 4:8], colorize(self.labels,
+                                     make_palette(self.class_map)))
+
+    def test_save_class_index(self):
+        label_store = SegmentationOutputRasterFile(
+            self.sink,
+            self.class_map,
+            extent=Box(0, 0, 40, 40),
+            class_index=True,
+            compression='lzw',
+            block_size=16)
+        label_store.extend([(Box(0, 0, 4, 4), self.labels)])
+        label_store.save()
+
+        with rasterio.open(self.sink) as dataset:
+            self.assertEqual(dataset.count, 1)
+            self.assertEqual(dataset.compression.value, 'LZW')
+            self.assertEqual(dataset.block_shapes, [(16, 16)])
+            self.assertEqual(dataset.colormap(1)[3], (0, 0, 255, 255))
+            np.testing.assert_array_equal(
+                dataset.read(1, window=((0, 3), (0, 4))), self.labels[0:3])
+            np.testing.assert_array_equal(
+                dataset.read(1, window=((3, 4), (0, 4))), [[2, 7, 0, 0]])
+
+        # Classes are read directly from the single band.
+        input_label_store = SegmentationInputRasterFile(
+            source=ImageFile(None, self.sink), class_index=True)
+        np.testing.assert_array_equal(
+            input_label_store.get_labels(Box(0, 0, 3, 4)), self.labels[0:3])
+
+    def test_save_overviews(self):
+        label_store = SegmentationOutputRasterFile(
+            self.sink,
+            self.class_map,
+            extent=Box(0, 0, 1024, 1024),
+            class_index=True,
+            block_size=256,
+            overviews=True)
+        label_store.extend([(Box(0, 0, 4, 4), self.labels)])
+        label_store.save()
+
+        with rasterio.open(self.sink) as dataset:
+            self.assertEqual(dataset.overviews(1), [2, 4])
+            self.assertEqual(dataset.compression.value, 'DEFLATE')
+            self.assertEqual(dataset.colormap(1)[1], (255, 0, 0, 255))
+            np.testing.assert_array_equal(
+                dataset.read(1, window=((0, 3), (0, 4))), self.labels[0:3])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,12 @@
 import copy
 import json
 
+import numpy as np
 from shapely import geometry
 
-from rastervision.utils.files import file_to_str
+from rastervision.core.box_array import BoxArray
+from rastervision.label_stores.geojson_stream import iter_features
+from rastervision.utils.files import file_to_str, open_text_file
 
 
 def boxes_to_geojson(boxes, class_ids, crs_transformer, class_map,
@@ -11,7 +14,7 @@ def boxes_to_geojson(boxes, class_ids, crs_transformer, class_map,
     """Convert boxes and associated data into a GeoJSON dict.
 
     Args:
-        boxes: list of Box in pixel row/col format.
+        boxes: list of Box or BoxArray in pixel row/col format.
         class_ids: list of int (one for each box)
         crs_transformer: CRSTransformer used to convert pixel coords to map
             coords in the GeoJSON
@@ -22,13 +25,21 @@ def boxes_to_geojson(boxes, class_ids, crs_transformer, class_map,
     Returns:
         dict in GeoJSON format
     """
+    polygons = BoxArray.from_boxes(boxes).get_geojson_coordinates()
+    class_ids = np.asarray(class_ids, dtype=np.int64).tolist()
+    if scores is not None:
+        scores = np.asarray(scores).tolist()
+    class_names = dict((class_id, class_map.get_by_id(class_id).name)
+                       for class_id in set(class_ids))
+
+    polygons = crs_transformer.pixel_to_map_array(polygons.reshape(-1, 2))
+    polygons = np.asarray(polygons).reshape(-1, 5, 2)
+
     features = []
-    for box_ind, box in enumerate(boxes):
-        polygon = box.geojson_coordinates()
-        polygon = [list(crs_transformer.pixel_to_map(p)) for p in polygon]
+    for box_ind, polygon in enumerate(polygons.tolist()):
 
-        class_id = int(class_ids[box_ind])
-        class_name = class_map.get_by_id(class_id).name
+        class_id = class_ids[box_ind]
+        class_name = class_names[class_id]
         score = 0.0
         if scores is not None:
             score = scores[box_ind]
@@ -50,33 +61,44 @@ def boxes_to_geojson(boxes, class_ids, crs_transformer, class_map,
     return {'type': 'FeatureCollection', 'features': features}
 
 
+def add_classes_to_feature(feature, class_map):
+    """Add missing class_name and class_id to a label feature in place.
+
+    Args:
+        feature: dict in GeoJSON Feature format
+        class_map: ClassMap
+
+    Returns:
+        feature
+    """
+    properties = feature.get('properties') or {}
+    if 'class_id' not in properties:
+        if 'class_name' in properties:
+            properties['class_id'] = \
+                class_map.get_by_name(properties['class_name']).id
+        elif 'label' in properties:
+            # label is considered a synonym of class_name for now in order
+            # to interface with Raster Foundry.
+            properties['class_id'] = \
+                class_map.get_by_name(properties['label']).id
+            properties['class_name'] = properties['label']
+        else:
+            # if no class_id, class_name, or label, then just assume
+            # everything corresponds to class_id = 1.
+            class_id = 1
+            class_name = class_map.get_by_id(class_id).name
+            properties['class_id'] = class_id
+            properties['class_name'] = class_name
+
+    feature['properties'] = properties
+    return feature
+
+
 def add_classes_to_geojson(geojson, class_map):
     """Add missing class_names and class_ids from label GeoJSON."""
     geojson = copy.deepcopy(geojson)
-    features = geojson['features']
-
-    for feature in features:
-        properties = feature.get('properties', {})
-        if 'class_id' not in properties:
-            if 'class_name' in properties:
-                properties['class_id'] = \
-                    class_map.get_by_name(properties['class_name']).id
-            elif 'label' in properties:
-                # label is considered a synonym of class_name for now in order
-                # to interface with Raster Foundry.
-                properties['class_id'] = \
-                    class_map.get_by_name(properties['label']).id
-                properties['class_name'] = properties['label']
-            else:
-                # if no class_id, class_name, or label, then just assume
-                # everything corresponds to class_id = 1.
-                class_id = 1
-                class_name = class_map.get_by_id(class_id).name
-                properties['class_id'] = class_id
-                properties['class_name'] = class_name
-
-        feature['properties'] = properties
-
+    for feature in geojson['features']:
+        add_classes_to_feature(feature, class_map)
     return geojson
 
 
@@ -91,6 +113,55 @@ def load_label_store_json(uri, readable):
     return json.loads(file_to_str(uri))
 
 
+def iter_label_store_features(uri, class_map):
+    """Iterate over the features of a label GeoJSON file.
+
+    The file is parsed one feature at a time, and missing class_names and
+    class_ids are added to each feature in place.
+
+    Args:
+        uri: URI of GeoJSON file containing a FeatureCollection
+        class_map: ClassMap
+
+    Returns:
+        generator of dicts in GeoJSON Feature format
+
+    Raises:
+        NotReadableError if the URI cannot be read from
+    """
+    # The file is opened before the generator is made, so that an unreadable
+    # URI is reported immediately instead of on the first iteration.
+    return _iter_file_features(open_text_file(uri), class_map)
+
+
+def _iter_file_features(file_obj, class_map):
+    with file_obj:
+        for feature in iter_features(file_obj):
+            yield add_classes_to_feature(feature, class_map)
+
+
+def stream_label_store_geojson(uri, readable, class_map):
+    """Load GeoJSON for LabelStore without holding all features in memory.
+
+    This is equivalent to calling add_classes_to_geojson on the output of
+    load_label_store_json, except that the features are a generator which
+    can only be iterated over once.
+
+    Returns:
+        dict in GeoJSON format or None if it is not readable
+
+    Raises:
+        NotReadableError if readable is True and the URI cannot be read from
+    """
+    if not readable:
+        return None
+
+    return {
+        'type': 'FeatureCollection',
+        'features': iter_label_store_features(uri, class_map)
+    }
+
+
 def json_to_shapely(geojson_dict, crs_transformer):
     """Load geojson as shapely polygon
 
@@ -116,26 +187,18 @@ def geojson_to_shapely_polygons(geojson_dict, crs_transformer):
     if not geojson_dict:
         return None
 
-    features = geojson_dict['features']
-    json_polygons = []
-    class_ids = []
-
-    for feature in features:
+    polygons = []
+    for feature in geojson_dict['features']:
         # Convert polygon to pixel coords.
         polygon = feature['geometry']['coordinates'][0]
-        polygon = [crs_transformer.map_to_pixel(p) for p in polygon]
-        json_polygons.append(polygon)
-
-        properties = feature.get('properties', {})
-        class_ids.append(properties.get('class_id', 1))
-
-    # Convert polygons to shapely
-    polygons = []
-    for json_polygon, class_id in zip(json_polygons, class_ids):
-        polygon = geometry.Polygon([(p[0], p[1]) for p in json_polygon])
+        polygon = np.array(polygon, dtype=np.float64)[:, 0:2]
+        polygon = crs_transformer.map_to_pixel_array(polygon)
+        polygon = geometry.Polygon(polygon)
         # Trick to handle self-intersecting polygons which otherwise cause an
         # error.
         polygon = polygon.buffer(0)
-        polygon.class_id = class_id
+
+        properties = feature.get('properties') or {}
+        polygon.class_id = properties.get('class_id', 1)
         polygons.append(polygon)
     return polygons
@@ -3,9 +3,12 @@ import tempfile
 import os
 import json
 
-from rastervision.label_stores.utils import json_to_shapely
+from rastervision.label_stores.utils import (
+    json_to_shapely, add_classes_to_geojson, stream_label_store_geojson)
+from rastervision.core.class_map import ClassMap, ClassItem
 from rastervision.core.crs_transformer import CRSTransformer
 from rastervision.core.box import Box
+from rastervision.utils.files import NotReadableError
 
 
 class DoubleCRSTransformer(CRSTransformer):
@@ -49,7 +52,7 @@ class TestLabelStoreUtils(unittest.TestCase):
             aoi_file.write(self.aoi_str)
 
     def tearDown(self):
-        pass
+        self.temp_dir.cleanup()
 
     def test_json_to_shapely(self):
         self.assertIsNone(json_to_shapely(None, self.crs_transformer))
@@ -60,6 +63,46 @@ class TestLabelStoreUtils(unittest.TestCase):
         self.assertEqual(len(aoi_polygon), 1)
         self.assertTrue(aoi_polygon[0].equals(aoi_box.get_shapely()))
 
+    def test_stream_label_store_geojson(self):
+        self.assertIsNone(
+            stream_label_store_geojson(self.aoi_file_path, False, None))
+
+        # A missing file is reported before the features are iterated over.
+        invalid_path = os.path.join(self.temp_dir.name, 'invalid.json')
+        with self.assertRaises(NotReadableError):
+            stream_label_store_geojson(invalid_path, True, None)
+
+        class_map = ClassMap([ClassItem(1, 'car'), ClassItem(2, 'house')])
+        geojson = {
+            'type':
+            'FeatureCollection',
+            'features': [
+                self.aoi_dict['features'][0], {
+                    'type': 'Feature',
+                    'geometry': None,
+                    'properties': {
+                        'label': 'house'
+                    }
+                }, {
+                    'type': 'Feature',
+                    'geometry': None,
+                    'properties': {
+                        'class_name': 'car',
+                        'score': 0.5
+                    }
+                }
+            ]
+        }
+        geojson_path = os.path.join(self.temp_dir.name, 'labels.json')
+        with open(geojson_path, 'w') as geojson_file:
+            json.dump(geojson, geojson_file)
+
+        streamed_geojson = stream_label_store_geojson(geojson_path, True,
+                                                      class_map)
+        streamed_geojson['features'] = list(streamed_geojson['features'])
+        self.assertDictEqual(streamed_geojson,
+                             add_classes_to_geojson(geojson, class_map))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,25 +1,244 @@
+import numpy as np
+
 from rastervision.core.labels import Labels
-from rastervision.core.box import Box
+from rastervision.core.box_array import BoxArray
+
+# Values in the class_id grid for cells that are absent, and for cells that
+# are present but have a null (ie. None) class_id.
+NO_CELL = -2
+NULL_CLASS_ID = -1
 
 
-# TODO also store scores
 class ClassificationLabels(Labels):
-    """Represents a spatial grid of cells associated with classes."""
+    """Represents a spatial grid of cells associated with classes.
+
+    Cells that lie on a regular grid are stored densely in numpy arrays: an
+    int16 array of class_ids and an optional float32 array of scores. The grid
+    is defined by an origin and cell_size, which are taken from the first
+    square cell that is set unless given, and the arrays grow as needed. Cells
+    that don't lie on the grid are stored in dicts keyed by
+    Box.tuple_format().
+    """
+
+    def __init__(self, origin=None, cell_size=None):
+        """Construct a new ClassificationLabels.
 
-    def __init__(self):
-        self.cell_to_class_id = {}
+        Args:
+            origin: (ymin, xmin) tuple of a cell on the grid
+            cell_size: height and width of cells on the grid
+        """
+        self.origin = origin
+        self.cell_size = cell_size
+        # Grid coordinates of the cell at index [0, 0] of the arrays.
+        self.row_offset = 0
+        self.col_offset = 0
+        self.class_id_grid = np.full((0, 0), NO_CELL, dtype=np.int16)
+        # Scores are NaN where not set. This is None until a score is set.
+        self.score_grid = None
+
+        # Cells which are not on the grid.
+        self.irregular_class_ids = {}
+        self.irregular_scores = {}
 
     def __len__(self):
-        return len(self.cell_to_class_id)
+        return (int(np.count_nonzero(self.class_id_grid != NO_CELL)) + len(
+            self.irregular_class_ids))
+
+    @property
+    def cell_to_class_id(self):
+        """Dict mapping Box.tuple_format() of each cell to its class_id."""
+        return dict(
+            zip([cell.tuple_format() for cell in self.get_cells()],
+                self.get_class_ids()))
+
+    def _init_grid(self, npboxes):
+        """Set the grid using the first square cell if not set yet."""
+        if self.cell_size is not None:
+            return
+        heights = npboxes[:, 2] - npboxes[:, 0]
+        widths = npboxes[:, 3] - npboxes[:, 1]
+        square_inds = np.flatnonzero((heights == widths) & (heights > 0))
+        if len(square_inds) > 0:
+            ymin, xmin, ymax, _ = npboxes[square_inds[0]].tolist()
+            self.origin = (ymin, xmin)
+            self.cell_size = ymax - ymin
+
+    def _get_grid_inds(self, npboxes):
+        """Return grid coordinates of cells.
+
+        Args:
+            npboxes: nx4 numpy array of cells
+
+        Returns:
+            (rows, cols, is_on_grid) tuple of numpy arrays where is_on_grid
+                is False for cells that do not lie exactly on the grid
+        """
+        nb_cells = npboxes.shape[0]
+        if self.cell_size is None:
+            zeros = np.zeros((nb_cells, ), dtype=np.int64)
+            return zeros, zeros, np.zeros((nb_cells, ), dtype=bool)
+
+        origin_y, origin_x = self.origin
+        rows = np.round(
+            (npboxes[:, 0] - origin_y) / self.cell_size).astype(np.int64)
+        cols = np.round(
+            (npboxes[:, 1] - origin_x) / self.cell_size).astype(np.int64)
+        # Check that cells are exactly equal to the ones made by _get_cells so
+        # that cells round trip without any change.
+        ymins = origin_y + rows * self.cell_size
+        xmins = origin_x + cols * self.cell_size
+        is_on_grid = ((ymins == npboxes[:, 0]) & (xmins == npboxes[:, 1]) &
+                      (ymins + self.cell_size == npboxes[:, 2]) &
+                      (xmins + self.cell_size == npboxes[:, 3]))
+        return rows, cols, is_on_grid
 
-    def set_cell(self, cell, class_id):
+    def _get_cells(self, rows, cols):
+        """Return nx4 numpy array of cells at grid coordinates."""
+        origin_y, origin_x = self.origin
+        ymins = origin_y + rows * self.cell_size
+        xmins = origin_x + cols * self.cell_size
+        return np.stack(
+            [ymins, xmins, ymins + self.cell_size, xmins + self.cell_size],
+            axis=1)
+
+    def _reserve(self, rows, cols):
+        """Grow the grid arrays so they contain the grid coordinates.
+
+        The arrays are at least doubled in size along each axis they grow in,
+        so setting cells one at a time takes amortized constant time.
+        """
+        height, width = self.class_id_grid.shape
+        row_min = int(rows.min())
+        row_max = int(rows.max()) + 1
+        col_min = int(cols.min())
+        col_max = int(cols.max()) + 1
+        if self.class_id_grid.size > 0:
+            row_min = min(row_min, self.row_offset)
+            row_max = max(row_max, self.row_offset + height)
+            col_min = min(col_min, self.col_offset)
+            col_max = max(col_max, self.col_offset + width)
+        if (row_min == self.row_offset and col_min == self.col_offset
+                and row_max - row_min == height
+                and col_max - col_min == width):
+            return
+
+        if row_min < self.row_offset:
+            row_min = min(row_min, row_max - 2 * height)
+        elif row_max > self.row_offset + height:
+            row_max = max(row_max, row_min + 2 * height)
+        if col_min < self.col_offset:
+            col_min = min(col_min, col_max - 2 * width)
+        elif col_max > self.col_offset + width:
+            col_max = max(col_max, col_min + 2 * width)
+
+        def grow(grid, fill_value):
+            new_grid = np.full(
+                (row_max - row_min, col_max - col_min),
+                fill_value,
+                dtype=grid.dtype)
+            row_start = self.row_offset - row_min
+            col_start = self.col_offset - col_min
+            new_grid[row_start:row_start + height, col_start:col_start +
+                     width] = grid
+            return new_grid
+
+        self.class_id_grid = grow(self.class_id_grid, NO_CELL)
+        if self.score_grid is not None:
+            self.score_grid = grow(self.score_grid, np.nan)
+        self.row_offset = row_min
+        self.col_offset = col_min
+
+    def set_cells(self, cells, class_ids, scores=None):
+        """Set cells and their class_ids and scores.
+
+        Args:
+            cells: list of Box or BoxArray
+            class_ids: list of (int or None) or int numpy array which is
+                NULL_CLASS_ID for null class_ids
+            scores: optional list or numpy array of floats which are None or
+                NaN for missing scores
+        """
+        npboxes = BoxArray.from_boxes(cells).get_npboxes()
+        if npboxes.shape[0] == 0:
+            return
+        if not isinstance(class_ids, np.ndarray):
+            class_ids = np.array(
+                [
+                    NULL_CLASS_ID if class_id is None else class_id
+                    for class_id in class_ids
+                ],
+                dtype=np.int16)
+        if scores is not None:
+            scores = np.array(
+                [np.nan if score is None else score for score in scores],
+                dtype=np.float32)
+
+        self._init_grid(npboxes)
+        rows, cols, is_on_grid = self._get_grid_inds(npboxes)
+        if np.any(is_on_grid):
+            rows = rows[is_on_grid]
+            cols = cols[is_on_grid]
+            self._reserve(rows, cols)
+            rows -= self.row_offset
+            cols -= self.col_offset
+            self.class_id_grid[rows, cols] = class_ids[is_on_grid]
+            if scores is not None and self.score_grid is None:
+                self.score_grid = np.full(
+                    self.class_id_grid.shape, np.nan, dtype=np.float32)
+            if self.score_grid is not None:
+                self.score_grid[rows, cols] = (np.nan if scores is None else
+                                               scores[is_on_grid])
+
+        for cell_ind in np.flatnonzero(~is_on_grid):
+            key = tuple(npboxes[cell_ind].tolist())
+            class_id = int(class_ids[cell_ind])
+            self.irregular_class_ids[key] = (None if class_id == NULL_CLASS_ID
+                                             else class_id)
+            score = None if scores is None else float(scores[cell_ind])
+            self.irregular_scores[key] = (None if score is None
+                                          or np.isnan(score) else score)
+
+    def set_cell(self, cell, class_id, score=None):
         """Set cell and its class_id.
 
         Args:
             cell: (Box)
-            class_id: int
+            class_id: int or None
+            score: optional float
         """
-        self.cell_to_class_id[cell.tuple_format()] = class_id
+        scores = None if score is None else [score]
+        self.set_cells([cell], [class_id], scores=scores)
+
+    def get_cell_class_ids(self, cells):
+        """Return class_ids of cells.
+
+        Args:
+            cells: list of Box or BoxArray
+
+        Returns:
+            int16 numpy array with NULL_CLASS_ID for cells with a null
+                class_id and NO_CELL for cells that are not in these labels
+        """
+        npboxes = BoxArray.from_boxes(cells).get_npboxes()
+        class_ids = np.full((npboxes.shape[0], ), NO_CELL, dtype=np.int16)
+
+        rows, cols, is_on_grid = self._get_grid_inds(npboxes)
+        rows -= self.row_offset
+        cols -= self.col_offset
+        height, width = self.class_id_grid.shape
+        is_in_grid = (is_on_grid & (rows >= 0) & (rows < height) &
+                      (cols >= 0) & (cols < width))
+        class_ids[is_in_grid] = self.class_id_grid[rows[is_in_grid], cols[
+            is_in_grid]]
+
+        if self.irregular_class_ids:
+            for cell_ind in np.flatnonzero(~is_on_grid):
+                key = tuple(npboxes[cell_ind].tolist())
+                if key in self.irregular_class_ids:
+                    class_id = self.irregular_class_ids[key]
+                    class_ids[cell_ind] = (NULL_CLASS_ID
+                                           if class_id is None else class_id)
+        return class_ids
 
     def get_cell_class_id(self, cell):
         """Return class_id for a cell.
@@ -27,7 +246,31 @@ class ClassificationLabels(Labels):
         Args:
             cell: (Box)
         """
-        return self.cell_to_class_id.get(cell.tuple_format())
+        class_id = int(self.get_cell_class_ids([cell])[0])
+        return None if class_id < 0 else class_id
+
+    def get_cell_score(self, cell):
+        """Return score for a cell or None if it doesn't have one.
+
+        Args:
+            cell: (Box)
+        """
+        key = cell.tuple_format()
+        if key in self.irregular_scores:
+            return self.irregular_scores[key]
+        if self.score_grid is None:
+            return None
+
+        rows, cols, is_on_grid = self._get_grid_inds(
+            np.array([key], dtype=np.float64))
+        row = rows[0] - self.row_offset
+        col = cols[0] - self.col_offset
+        height, width = self.score_grid.shape
+        if (not is_on_grid[0] or row < 0 or row >= height or col < 0
+                or col >= width):
+            return None
+        score = float(self.score_grid[row, col])
+        return None if np.isnan(score) else score
 
     def get_singleton_labels(self, cell):
         """Return Labels object representing a single cell.
@@ -37,19 +280,74 @@ class ClassificationLabels(Labels):
         """
         class_id = self.get_cell_class_id(cell)
         labels = ClassificationLabels()
-        labels.set_cell(cell, class_id)
+        labels.set_cell(cell, class_id, score=self.get_cell_score(cell))
         return labels
 
+    def _get_grid_inds_present(self):
+        """Return (rows, cols) of cells in the grid arrays."""
+        return np.nonzero(self.class_id_grid != NO_CELL)
+
+    def get_cell_array(self):
+        """Return BoxArray of all cells.
+
+        The cells on the grid are in row-major order, followed by the cells
+        which are not on the grid.
+        """
+        rows, cols = self._get_grid_inds_present()
+        npboxes = np.empty((0, 4))
+        if len(rows) > 0:
+            npboxes = self._get_cells(rows + self.row_offset,
+                                      cols + self.col_offset)
+        if self.irregular_class_ids:
+            npboxes = np.concatenate([
+                npboxes,
+                np.array(list(self.irregular_class_ids.keys()), ndmin=2)
+            ])
+        return BoxArray(npboxes)
+
+    def get_class_id_array(self):
+        """Return int16 numpy array of class_ids for all cells.
+
+        The order is the same as get_cell_array, and null class_ids are
+        NULL_CLASS_ID.
+        """
+        rows, cols = self._get_grid_inds_present()
+        irregular_class_ids = [
+            NULL_CLASS_ID if class_id is None else class_id
+            for class_id in self.irregular_class_ids.values()
+        ]
+        return np.concatenate([
+            self.class_id_grid[rows, cols],
+            np.array(irregular_class_ids, dtype=np.int16)
+        ])
+
+    def get_score_array(self):
+        """Return float32 numpy array of scores for all cells.
+
+        The order is the same as get_cell_array, and missing scores are NaN.
+        """
+        rows, cols = self._get_grid_inds_present()
+        grid_scores = (np.full(len(rows), np.nan, dtype=np.float32)
+                       if self.score_grid is None else
+                       self.score_grid[rows, cols])
+        irregular_scores = [
+            np.nan if score is None else score
+            for score in self.irregular_scores.values()
+        ]
+        return np.concatenate(
+            [grid_scores,
+             np.array(irregular_scores, dtype=np.float32)])
+
     def get_cells(self):
         """Return list of all cells (list of Box)."""
-        return [
-            Box.from_npbox(box_tup)
-            for box_tup in self.cell_to_class_id.keys()
-        ]
+        return self.get_cell_array().get_boxes()
 
     def get_class_ids(self):
         """Return list of class_ids for all cells."""
-        return list(self.cell_to_class_id.values())
+        return [
+            None if class_id < 0 else class_id
+            for class_id in self.get_class_id_array().tolist()
+        ]
 
     def extend(self, labels):
         """Adds cells contained in labels.
@@ -57,6 +355,12 @@ class ClassificationLabels(Labels):
         Args:
             labels: ClassificationLabels
         """
-        for cell in labels.get_cells():
-            class_id = labels.get_cell_class_id(cell)
-            self.set_cell(cell, class_id)
+        scores = None
+        if (labels.score_grid is not None
+                or any(score is not None
+                       for score in labels.irregular_scores.values())):
+            scores = labels.get_score_array()
+        self.set_cells(
+            labels.get_cell_array(),
+            labels.get_class_id_array(),
+            scores=scores)
@@ -1,7 +1,10 @@
 import unittest
 
+import numpy as np
+
 from rastervision.core.box import Box
-from rastervision.labels.classification_labels import ClassificationLabels
+from rastervision.labels.classification_labels import (ClassificationLabels,
+                                                       NO_CELL, NULL_CLASS_ID)
 
 
 class TestClassificationLabels(unittest.TestCase):
@@ -63,6 +66,51 @@ class TestClassificationLabels(unittest.TestCase):
         self.assertEqual(len(cells), 3)
         self.assertTrue(cell3 in cells)
 
+    def test_grid(self):
+        # Cells are set out of order, including to the left of the origin.
+        labels = ClassificationLabels()
+        cells = [
+            Box.make_square(y, x, 2) for y, x in [(4, 4), (0, -2), (2, 6)]
+        ]
+        labels.set_cells(cells, [1, None, 3], scores=[0.5, 0.7, None])
+
+        self.assertEqual(labels.class_id_grid.dtype, np.int16)
+        self.assertEqual(len(labels), 3)
+        self.assertEqual(len(labels.irregular_class_ids), 0)
+        np.testing.assert_array_equal(
+            labels.get_cell_class_ids(cells + [Box.make_square(2, 2, 2)]),
+            [1, NULL_CLASS_ID, 3, NO_CELL])
+        self.assertEqual(labels.get_cell_score(cells[0]), 0.5)
+        self.assertIsNone(labels.get_cell_score(cells[2]))
+        self.assertDictEqual(labels.cell_to_class_id, {
+            (4, 4, 6, 6): 1,
+            (0, -2, 2, 0): None,
+            (2, 6, 4, 8): 3
+        })
+
+    def test_irregular_cells(self):
+        labels = ClassificationLabels()
+        labels.set_cell(Box.make_square(0, 0, 2), 1)
+        # Not aligned with the grid.
+        cell = Box.make_square(1, 1, 2)
+        labels.set_cell(cell, 2)
+        self.assertEqual(len(labels.irregular_class_ids), 1)
+        self.assertEqual(labels.get_cell_class_id(cell), 2)
+        self.assertEqual(len(labels.get_cells()), 2)
+
+    def test_extend_grid(self):
+        labels1 = ClassificationLabels()
+        labels2 = ClassificationLabels()
+        windows = list(Box(0, 0, 100, 100).get_windows(10, 10))
+        class_ids = np.arange(len(windows)) % 3 + 1
+        labels1.set_cells(windows[0:50], class_ids[0:50])
+        labels2.set_cells(windows[50:], class_ids[50:])
+        labels1.extend(labels2)
+
+        np.testing.assert_array_equal(
+            labels1.get_cell_class_ids(windows), class_ids)
+        self.assertEqual(labels1.class_id_grid.shape, (10, 10))
+
 
 if __name__ == '__main__':
     unittest.main()
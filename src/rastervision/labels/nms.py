@@ -0,0 +1,219 @@
+from multiprocessing import Pool
+
+import numpy as np
+
+from rastervision.core.box_index import BoxIndex
+
+# Boxes, bucket contents and bucket offsets shared with worker processes.
+_worker_state = {}
+
+
+def get_ious(npboxes1, npboxes2):
+    """Return IOUs of corresponding rows of two nx4 arrays of boxes.
+
+    This uses the same arithmetic as the TF Object Detection API's
+    np_box_ops.iou so the results are bitwise identical.
+    """
+    zeros = np.zeros(npboxes1.shape[0])
+    heights = np.maximum(
+        zeros,
+        np.minimum(npboxes1[:, 2], npboxes2[:, 2]) - np.maximum(
+            npboxes1[:, 0], npboxes2[:, 0]))
+    widths = np.maximum(
+        zeros,
+        np.minimum(npboxes1[:, 3], npboxes2[:, 3]) - np.maximum(
+            npboxes1[:, 1], npboxes2[:, 1]))
+    intersections = heights * widths
+    areas1 = (npboxes1[:, 2] - npboxes1[:, 0]) * (
+        npboxes1[:, 3] - npboxes1[:, 1])
+    areas2 = (npboxes2[:, 2] - npboxes2[:, 0]) * (
+        npboxes2[:, 3] - npboxes2[:, 1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return intersections / (areas1 + areas2 - intersections)
+
+
+def get_overlapping_pairs(npboxes, inds1, inds2, iou_thresh):
+    """Return the pairs of boxes whose IOU is greater than iou_thresh.
+
+    Args:
+        npboxes: nx4 numpy array of boxes
+        inds1: int numpy array of indices of the first box of each pair
+        inds2: int numpy array of indices of the second box of each pair
+        iou_thresh: (float) IOU threshold
+
+    Returns:
+        [m, 2] int numpy array of pairs of indices
+    """
+    ious = get_ious(npboxes[inds1], npboxes[inds2])
+    is_overlapping = ious > iou_thresh
+    return np.stack([inds1[is_overlapping], inds2[is_overlapping]], axis=1)
+
+
+def _init_worker(npboxes, box_inds, offsets):
+    _worker_state['npboxes'] = npboxes
+    _worker_state['box_inds'] = box_inds
+    _worker_state['offsets'] = offsets
+
+
+def _get_cell_pairs(cells, iou_thresh):
+    """Return overlapping pairs of boxes within the same grid cell.
+
+    This is a top-level function so that it can be run in a worker process
+    initialized with _init_worker.
+
+    Args:
+        cells: int numpy array of cell ids in the BoxIndex
+        iou_thresh: (float) IOU threshold
+
+    Returns:
+        [m, 2] int numpy array of pairs of indices
+    """
+    npboxes = _worker_state['npboxes']
+    box_inds = _worker_state['box_inds']
+    offsets = _worker_state['offsets']
+
+    inds1 = []
+    inds2 = []
+    for cell in cells:
+        cell_box_inds = box_inds[offsets[cell]:offsets[cell + 1]]
+        pair_inds1, pair_inds2 = np.triu_indices(len(cell_box_inds), 1)
+        inds1.append(cell_box_inds[pair_inds1])
+        inds2.append(cell_box_inds[pair_inds2])
+    if not inds1:
+        return np.empty((0, 2), dtype=np.int64)
+    return get_overlapping_pairs(npboxes, np.concatenate(inds1),
+                                 np.concatenate(inds2), iou_thresh)
+
+
+def get_all_overlapping_pairs(npboxes, iou_thresh, num_workers=1):
+    """Return all the pairs of boxes whose IOU is greater than iou_thresh.
+
+    Boxes are bucketed by the grid cells of a BoxIndex, and only boxes in the
+    same cell (ie. boxes that may intersect) are compared. The cells are
+    split into tiles which are processed in parallel.
+
+    Args:
+        npboxes: nx4 numpy array of boxes
+        iou_thresh: (float) IOU threshold which is >= 0
+        num_workers: (int) number of processes to use
+
+    Returns:
+        [m, 2] int numpy array of unique pairs of indices (i, j) with i < j
+    """
+    index = BoxIndex(npboxes)
+    cell_counts = np.diff(index.offsets)
+    cells = np.flatnonzero(cell_counts > 1)
+
+    all_pairs = []
+    if num_workers > 1 and len(cells) > 1:
+        # Split the cells into tiles of roughly equal amounts of work.
+        nb_tiles = num_workers * 4
+        work = np.cumsum(cell_counts[cells]**2)
+        tile_ids = np.minimum(work * nb_tiles // (work[-1] + 1), nb_tiles - 1)
+        tiles = np.split(cells, np.flatnonzero(np.diff(tile_ids)) + 1)
+        with Pool(
+                num_workers,
+                initializer=_init_worker,
+                initargs=(npboxes, index.box_inds, index.offsets)) as pool:
+            all_pairs.extend(
+                pool.starmap(_get_cell_pairs,
+                             [(tile, iou_thresh) for tile in tiles]))
+    else:
+        _init_worker(npboxes, index.box_inds, index.offsets)
+        all_pairs.append(_get_cell_pairs(cells, iou_thresh))
+    _worker_state.clear()
+
+    # Boxes too big to be bucketed may intersect with any box.
+    nb_boxes = npboxes.shape[0]
+    for large_box_ind in index.large_box_inds:
+        other_inds = np.arange(nb_boxes)
+        other_inds = other_inds[other_inds != large_box_ind]
+        all_pairs.append(
+            get_overlapping_pairs(npboxes,
+                                  np.full(other_inds.shape, large_box_ind),
+                                  other_inds, iou_thresh))
+
+    pairs = np.concatenate(all_pairs).astype(np.int64)
+    # Pairs of boxes that share more than one cell appear more than once.
+    pairs = np.sort(pairs, axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def tiled_non_max_suppression(npboxes,
+                              scores,
+                              iou_thresh,
+                              score_thresh=-10.0,
+                              max_output_size=1000000,
+                              num_workers=1):
+    """Greedy non-maximum suppression using spatial tiling.
+
+    The result is identical to the TF Object Detection API's
+    np_box_list_ops.non_max_suppression, but only boxes that are near each
+    other are compared. In greedy NMS, a box is kept if and only if it does
+    not overlap with a box with a higher priority that has been kept. So,
+    given the pairs of overlapping boxes, the kept boxes can be found in
+    one pass over the boxes in order of decreasing score.
+
+    Args:
+        npboxes: nx4 numpy array of boxes with non-negative areas
+        scores: numpy array of length n of scores
+        iou_thresh: (float) boxes with an IOU greater than this with a kept
+            box are removed
+        score_thresh: (float) boxes with a score not greater than this are
+            removed
+        max_output_size: (int) maximum number of boxes to keep
+        num_workers: (int) number of processes to use when finding
+            overlapping boxes
+
+    Returns:
+        int numpy array of the indices of the kept boxes in order of
+            decreasing score
+    """
+    if iou_thresh < 0. or iou_thresh > 1.0:
+        raise ValueError('IOU threshold must be in [0, 1]')
+
+    candidate_inds = np.flatnonzero(scores > score_thresh)
+    npboxes = npboxes[candidate_inds]
+    # Use the same ordering as the TF Object Detection API for ties.
+    order = np.argsort(scores[candidate_inds])[::-1]
+
+    # Prevent further computation if NMS is disabled.
+    if iou_thresh == 1.0 or len(candidate_inds) == 0:
+        return candidate_inds[order[0:max_output_size]]
+
+    # Make adjacency lists from each box to the overlapping boxes which
+    # come after it in order of decreasing score.
+    ranks = np.empty(order.shape, dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    pairs = get_all_overlapping_pairs(npboxes, iou_thresh, num_workers)
+    swap = ranks[pairs[:, 0]] > ranks[pairs[:, 1]]
+    pairs[swap] = pairs[swap][:, ::-1]
+    pairs = pairs[np.argsort(pairs[:, 0], kind='stable')]
+    neighbors = pairs[:, 1]
+    offsets = np.concatenate([[0],
+                              np.cumsum(
+                                  np.bincount(
+                                      pairs[:, 0], minlength=len(order)))])
+
+    # The IOU of two boxes with zero area is NaN, which non_max_suppression
+    # treats as overlapping, so only the first of those boxes is kept.
+    is_zero_area = (
+        (npboxes[:, 2] - npboxes[:, 0]) * (npboxes[:, 3] - npboxes[:, 1])) == 0
+    zero_area_kept = False
+
+    is_suppressed = np.zeros(order.shape, dtype=bool)
+    kept_inds = []
+    for ind in order.tolist():
+        if is_suppressed[ind]:
+            continue
+        if is_zero_area[ind]:
+            if zero_area_kept:
+                continue
+            zero_area_kept = True
+
+        kept_inds.append(ind)
+        if len(kept_inds) == max_output_size:
+            break
+        is_suppressed[neighbors[offsets[ind]:offsets[ind + 1]]] = True
+
+    return candidate_inds[np.array(kept_inds, dtype=np.int64)]
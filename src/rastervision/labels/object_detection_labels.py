@@ -1,12 +1,11 @@
 import numpy as np
 
 from object_detection.utils.np_box_list import BoxList
-from object_detection.utils.np_box_list_ops import (
-    prune_non_overlapping_boxes, clip_to_window, concatenate,
-    non_max_suppression)
+from object_detection.utils.np_box_list_ops import concatenate
 
-from rastervision.core.box import Box
+from rastervision.core.box_array import BoxArray
 from rastervision.core.labels import Labels
+from rastervision.labels.nms import tiled_non_max_suppression
 
 
 class ObjectDetectionLabels(Labels):
@@ -60,11 +59,26 @@ class ObjectDetectionLabels(Labels):
 
     def get_boxes(self):
         """Return list of Boxes."""
-        return [Box.from_npbox(npbox) for npbox in self.boxlist.get()]
+        return self.get_box_array().get_boxes()
+
+    def get_box_array(self):
+        """Return BoxArray backed by the boxes in these labels."""
+        return BoxArray(self.boxlist.get())
 
     def get_npboxes(self):
         return self.boxlist.get()
 
+    def get_subset(self, inds):
+        """Return ObjectDetectionLabels with the labels at some indices.
+
+        Args:
+            inds: int numpy array of indices or boolean mask
+        """
+        return ObjectDetectionLabels(
+            self.get_npboxes()[inds],
+            self.get_class_ids()[inds],
+            scores=self.get_scores()[inds])
+
     def get_scores(self):
         if self.boxlist.has_field('scores'):
             return self.boxlist.get_field('scores')
@@ -137,14 +151,23 @@ class ObjectDetectionLabels(Labels):
                 overlapping
             clip: if True, clip label boxes to the window
         """
-        window_npbox = window.npbox_format()
-        window_boxlist = BoxList(np.expand_dims(window_npbox, axis=0))
-        boxlist = prune_non_overlapping_boxes(
-            labels.boxlist, window_boxlist, minoverlap=ioa_thresh)
+        boxes = labels.get_box_array()
+        # The IOA of empty boxes is NaN, so they are never kept.
+        with np.errstate(invalid='ignore'):
+            keep = boxes.get_ioas(window)[:, 0] >= ioa_thresh
+        npboxes = boxes.get_npboxes()[keep]
+        class_ids = labels.get_class_ids()[keep]
+        scores = labels.get_scores()[keep]
+
         if clip:
-            boxlist = clip_to_window(boxlist, window_npbox)
+            clipped_boxes = BoxArray(npboxes).clip(window)
+            nonempty = clipped_boxes.get_areas() > 0
+            npboxes = clipped_boxes.get_npboxes()[nonempty]
+            class_ids = class_ids[nonempty]
+            scores = scores[nonempty]
 
-        return ObjectDetectionLabels.from_boxlist(boxlist)
+        return ObjectDetectionLabels(
+            npboxes.astype(np.float64), class_ids, scores=scores)
 
     @staticmethod
     def concatenate(labels1, labels2):
@@ -158,7 +181,7 @@ class ObjectDetectionLabels(Labels):
         return ObjectDetectionLabels.from_boxlist(new_boxlist)
 
     @staticmethod
-    def prune_duplicates(labels, score_thresh, merge_thresh):
+    def prune_duplicates(labels, score_thresh, merge_thresh, num_workers=1):
         """Remove duplicate boxes.
 
         Runs non-maximum suppression to remove duplicate boxes that result from
@@ -169,14 +192,20 @@ class ObjectDetectionLabels(Labels):
             score_thresh: the minimum allowed score of boxes
             merge_thresh: the minimum IOA allowed when merging two boxes
                 together
+            num_workers: number of processes to use for finding duplicates
 
         Returns:
             ObjectDetectionLabels
         """
         max_output_size = 1000000
-        pruned_boxlist = non_max_suppression(
-            labels.boxlist,
+        # This gives the same result as running non_max_suppression from the
+        # TF Object Detection API on all the boxes, but only compares nearby
+        # boxes.
+        kept_inds = tiled_non_max_suppression(
+            labels.get_npboxes(),
+            labels.get_scores(),
+            merge_thresh,
+            score_thresh=score_thresh,
             max_output_size=max_output_size,
-            iou_threshold=merge_thresh,
-            score_threshold=score_thresh)
-        return ObjectDetectionLabels.from_boxlist(pruned_boxlist)
+            num_workers=num_workers)
+        return labels.get_subset(kept_inds)
@@ -0,0 +1,84 @@
+import numpy as np
+
+from rastervision.labels.object_detection_labels import ObjectDetectionLabels
+
+# Initial number of labels the buffer has room for.
+INITIAL_CAPACITY = 1024
+
+
+class ObjectDetectionLabelsBuffer(object):
+    """Buffer for accumulating ObjectDetectionLabels.
+
+    Concatenating ObjectDetectionLabels copies all the labels, so repeatedly
+    concatenating small batches of labels takes quadratic time. This buffer
+    stores the boxes, class_ids and scores in columnar arrays whose capacity
+    is doubled when they are full, so appending takes amortized time
+    proportional to the size of the appended labels.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.size = 0
+        self.npboxes = None
+        self.class_ids = None
+        self.scores = None
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, capacity, class_ids_dtype):
+        """Grow the arrays so they have room for at least capacity labels."""
+        if self.npboxes is None:
+            new_capacity = max(capacity, INITIAL_CAPACITY)
+            self.npboxes = np.empty((new_capacity, 4), dtype=np.float64)
+            self.class_ids = np.empty((new_capacity, ), dtype=class_ids_dtype)
+            self.scores = np.empty((new_capacity, ), dtype=np.float64)
+            return
+
+        class_ids_dtype = np.result_type(self.class_ids, class_ids_dtype)
+        old_capacity = self.npboxes.shape[0]
+        same_dtype = class_ids_dtype == self.class_ids.dtype
+        if capacity <= old_capacity and same_dtype:
+            return
+
+        new_capacity = old_capacity
+        while new_capacity < capacity:
+            new_capacity *= 2
+
+        def grow(arr, dtype):
+            new_arr = np.empty((new_capacity, ) + arr.shape[1:], dtype=dtype)
+            new_arr[0:self.size] = arr[0:self.size]
+            return new_arr
+
+        self.npboxes = grow(self.npboxes, np.float64)
+        self.class_ids = grow(self.class_ids, class_ids_dtype)
+        self.scores = grow(self.scores, np.float64)
+
+    def append(self, labels):
+        """Append labels to the buffer.
+
+        Args:
+            labels: ObjectDetectionLabels
+        """
+        nb_labels = len(labels)
+        if nb_labels == 0:
+            return
+
+        class_ids = labels.get_class_ids()
+        self._reserve(self.size + nb_labels, class_ids.dtype)
+        end = self.size + nb_labels
+        self.npboxes[self.size:end] = labels.get_npboxes()
+        self.class_ids[self.size:end] = class_ids
+        self.scores[self.size:end] = labels.get_scores()
+        self.size = end
+
+    def get_labels(self):
+        """Return ObjectDetectionLabels with copies of the labels in buffer."""
+        if self.size == 0:
+            return ObjectDetectionLabels.make_empty()
+        return ObjectDetectionLabels(
+            self.npboxes[0:self.size].copy(),
+            self.class_ids[0:self.size].copy(),
+            scores=self.scores[0:self.size].copy())
@@ -0,0 +1,40 @@
+import unittest
+
+import numpy as np
+
+from rastervision.labels.object_detection_labels import ObjectDetectionLabels
+from rastervision.labels.object_detection_labels_buffer import (
+    ObjectDetectionLabelsBuffer)
+
+
+def make_labels(nb_labels, offset=0):
+    npboxes = np.arange(nb_labels * 4, dtype=np.float64).reshape(-1, 4)
+    return ObjectDetectionLabels(
+        npboxes + offset,
+        np.arange(nb_labels) % 3 + 1,
+        scores=np.linspace(0, 1, nb_labels))
+
+
+class TestObjectDetectionLabelsBuffer(unittest.TestCase):
+    def test_append(self):
+        buffer = ObjectDetectionLabelsBuffer()
+        self.assertEqual(len(buffer.get_labels()), 0)
+
+        # Append enough labels to grow the buffer a few times.
+        labels_list = [make_labels(n, offset=n) for n in [0, 5, 1000, 3000]]
+        expected_labels = ObjectDetectionLabels.make_empty()
+        for labels in labels_list:
+            buffer.append(labels)
+            expected_labels = ObjectDetectionLabels.concatenate(
+                expected_labels, labels)
+
+        self.assertEqual(len(buffer), 4005)
+        buffer.get_labels().assert_equal(expected_labels)
+
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(len(buffer.get_labels()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
 import numpy as np
+from object_detection.utils.np_box_list_ops import non_max_suppression
 from object_detection.utils.np_box_list import BoxList
 
 from rastervision.core.box import Box
@@ -142,6 +143,32 @@ class ObjectDetectionLabelsTest(unittest.TestCase):
             npboxes, class_ids, scores=scores)
         new_labels.assert_equal(expected_labels)
 
+    def test_prune_duplicates_same_as_global_nms(self):
+        np.random.seed(1)
+        nb_boxes = 2000
+        ymins = np.random.uniform(0, 500, nb_boxes)
+        xmins = np.random.uniform(0, 500, nb_boxes)
+        sizes = np.random.uniform(5, 20, (nb_boxes, 2))
+        # Add some big boxes, empty boxes, and ties in scores.
+        sizes[0:3, :] = 300
+        sizes[3:6, 0] = 0
+        npboxes = np.stack(
+            [ymins, xmins, ymins + sizes[:, 0], xmins + sizes[:, 1]], axis=1)
+        scores = np.round(np.random.uniform(0, 1, nb_boxes), 2)
+        class_ids = np.random.randint(1, 3, nb_boxes)
+        labels = ObjectDetectionLabels(npboxes, class_ids, scores=scores)
+
+        expected_labels = ObjectDetectionLabels.from_boxlist(
+            non_max_suppression(
+                labels.to_boxlist(),
+                max_output_size=1000000,
+                iou_threshold=0.3,
+                score_threshold=0.1))
+        for num_workers in [1, 2]:
+            pruned_labels = ObjectDetectionLabels.prune_duplicates(
+                labels, 0.1, 0.3, num_workers=num_workers)
+            pruned_labels.assert_equal(expected_labels)
+
     def test_prune_duplicates(self):
         # This first box has a score below score_thresh so it should get
         # pruned. The third box overlaps with the second, but has higher score,
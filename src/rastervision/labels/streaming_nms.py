@@ -0,0 +1,109 @@
+import numpy as np
+
+from rastervision.labels.nms import (get_all_overlapping_pairs,
+                                     tiled_non_max_suppression)
+from rastervision.labels.object_detection_labels_buffer import (
+    ObjectDetectionLabelsBuffer)
+
+
+class StreamingNMS(object):
+    """Non-maximum suppression of labels that arrive strip by strip.
+
+    Labels are added as predictions are made over windows ordered by their
+    ymin. Given a frontier such that all labels added later lie below it,
+    boxes that can no longer overlap (directly or through a chain of
+    overlapping boxes) with future boxes are resolved by running NMS on them.
+    Only the band of unresolved boxes along the frontier is kept in memory.
+    The kept boxes are the same as when running tiled_non_max_suppression on
+    all the labels at the end.
+    """
+
+    def __init__(self, score_thresh, iou_thresh, num_workers=1):
+        """Construct a new StreamingNMS.
+
+        Args:
+            score_thresh: (float) boxes with a score not greater than this
+                are removed
+            iou_thresh: (float) boxes with an IOU greater than this with a
+                kept box are removed
+            num_workers: (int) number of processes to use when finding
+                overlapping boxes
+        """
+        self.score_thresh = score_thresh
+        self.iou_thresh = iou_thresh
+        self.num_workers = num_workers
+        self.unresolved = ObjectDetectionLabelsBuffer()
+        self.resolved = ObjectDetectionLabelsBuffer()
+
+    def add(self, labels, frontier=None):
+        """Add labels and resolve the boxes that lie above the frontier.
+
+        Args:
+            labels: ObjectDetectionLabels
+            frontier: (float) y coordinate such that all labels added later
+                have ymin >= frontier. If None, nothing is resolved.
+        """
+        labels = labels.get_subset(labels.get_scores() > self.score_thresh)
+        self.unresolved.append(labels)
+        if frontier is not None:
+            self.resolve(frontier)
+
+    def resolve(self, frontier):
+        """Run NMS on the boxes that can't overlap with boxes below frontier.
+
+        Args:
+            frontier: (float) y coordinate such that all labels added later
+                have ymin >= frontier
+        """
+        if len(self.unresolved) == 0:
+            return
+
+        labels = self.unresolved.get_labels()
+        npboxes = labels.get_npboxes()
+
+        # Boxes that extend past the frontier, and the boxes connected to them
+        # by chains of overlapping boxes, may be affected by future boxes.
+        is_unresolved = npboxes[:, 2] > frontier
+        if self.iou_thresh < 1.0 and np.any(is_unresolved):
+            pairs = get_all_overlapping_pairs(npboxes, self.iou_thresh,
+                                              self.num_workers)
+            while True:
+                is_pair_unresolved = (is_unresolved[pairs[:, 0]]
+                                      | is_unresolved[pairs[:, 1]])
+                new_unresolved = np.unique(pairs[is_pair_unresolved])
+                if np.all(is_unresolved[new_unresolved]):
+                    break
+                is_unresolved[new_unresolved] = True
+
+        # The IOU of two empty boxes is NaN, so empty boxes are treated as
+        # overlapping with each other no matter where they are, and are only
+        # resolved at the end.
+        if np.isfinite(frontier):
+            is_unresolved |= ((npboxes[:, 2] - npboxes[:, 0]) *
+                              (npboxes[:, 3] - npboxes[:, 1])) == 0
+
+        if np.all(is_unresolved):
+            return
+
+        to_resolve = labels.get_subset(~is_unresolved)
+        kept_inds = tiled_non_max_suppression(
+            to_resolve.get_npboxes(),
+            to_resolve.get_scores(),
+            self.iou_thresh,
+            score_thresh=self.score_thresh,
+            num_workers=self.num_workers)
+        self.resolved.append(to_resolve.get_subset(kept_inds))
+
+        self.unresolved.clear()
+        self.unresolved.append(labels.get_subset(is_unresolved))
+
+    def get_labels(self):
+        """Resolve all remaining boxes and return the kept labels.
+
+        Returns:
+            ObjectDetectionLabels sorted by decreasing score
+        """
+        self.resolve(np.inf)
+        labels = self.resolved.get_labels()
+        order = np.argsort(-labels.get_scores(), kind='stable')
+        return labels.get_subset(order)
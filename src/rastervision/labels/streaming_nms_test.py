@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.labels.object_detection_labels import ObjectDetectionLabels
+from rastervision.labels.streaming_nms import StreamingNMS
+
+
+def sort_rows(arr):
+    return arr[np.lexsort(arr.T[::-1])]
+
+
+class TestStreamingNMS(unittest.TestCase):
+    def test_same_as_prune_duplicates(self):
+        np.random.seed(1)
+        chip_size = 100
+        stride = 50
+        extent = Box(0, 0, 500, 500)
+
+        # Make overlapping detections in each window in row-major order.
+        windows = list(extent.get_windows(chip_size, stride))
+        window_labels = []
+        for window in windows:
+            nb_boxes = 20
+            ymins = np.random.uniform(window.ymin, window.ymax - 20, nb_boxes)
+            xmins = np.random.uniform(window.xmin, window.xmax - 20, nb_boxes)
+            sizes = np.random.uniform(5, 20, (nb_boxes, 2))
+            npboxes = np.stack(
+                [ymins, xmins, ymins + sizes[:, 0], xmins + sizes[:, 1]],
+                axis=1)
+            window_labels.append(
+                ObjectDetectionLabels(
+                    npboxes,
+                    np.random.randint(1, 3, nb_boxes),
+                    scores=np.random.uniform(0, 1, nb_boxes)))
+
+        all_labels = ObjectDetectionLabels.make_empty()
+        for labels in window_labels:
+            all_labels = ObjectDetectionLabels.concatenate(all_labels, labels)
+        expected_labels = ObjectDetectionLabels.prune_duplicates(
+            all_labels, 0.2, 0.3)
+
+        nms = StreamingNMS(0.2, 0.3)
+        max_unresolved = 0
+        for window_ind, labels in enumerate(window_labels):
+            frontier = None
+            if window_ind + 1 < len(windows):
+                frontier = windows[window_ind + 1].ymin
+            nms.add(labels, frontier)
+            max_unresolved = max(max_unresolved, len(nms.unresolved))
+        streamed_labels = nms.get_labels()
+
+        # Only a band of boxes along the frontier is kept unresolved.
+        self.assertLess(max_unresolved, len(all_labels) / 2)
+        self.assertEqual(len(streamed_labels), len(expected_labels))
+        expected = np.concatenate(
+            [
+                expected_labels.get_npboxes(),
+                expected_labels.get_scores()[:, np.newaxis]
+            ],
+            axis=1)
+        streamed = np.concatenate(
+            [
+                streamed_labels.get_npboxes(),
+                streamed_labels.get_scores()[:, np.newaxis]
+            ],
+            axis=1)
+        np.testing.assert_array_equal(sort_rows(streamed), sort_rows(expected))
+        self.assertTrue(np.all(np.diff(streamed_labels.get_scores()) <= 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
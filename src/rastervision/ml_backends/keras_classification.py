@@ -251,11 +251,8 @@ class KerasClassification(MLBackend):
         probs = predict(chips, self.model)
 
         labels = ClassificationLabels()
-
-        for chip_probs, window in zip(probs, windows):
-            # Add 1 to class_id since they start at 1.
-            class_id = int(np.argmax(chip_probs) + 1)
-
-            labels.set_cell(window, class_id)
+        # Add 1 to class_id since they start at 1.
+        class_ids = np.argmax(probs, axis=1).astype(np.int16) + 1
+        labels.set_cells(windows, class_ids, scores=np.max(probs, axis=1))
 
         return labels
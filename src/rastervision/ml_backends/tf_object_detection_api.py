@@ -25,6 +25,7 @@ from object_detection.protos.string_int_label_map_pb2 import (
 from object_detection.protos.pipeline_pb2 import TrainEvalPipelineConfig
 
 from rastervision.core.ml_backend import MLBackend
+from rastervision.core.box_array import BoxArray
 from rastervision.ml_tasks.object_detection import save_debug_image
 from rastervision.labels.object_detection_labels import (ObjectDetectionLabels)
 from rastervision.utils.files import (get_local_path, upload_if_needed,
@@ -502,19 +503,20 @@ def compute_prediction(image_nps, windows, detection_graph, session):
     (boxes, scores, class_ids) = session.run(
         [boxes, scores, class_ids], feed_dict={image_tensor: image_nps})
 
-    labels = ObjectDetectionLabels.make_empty()
-    for chip_boxes, chip_scores, chip_class_ids, window in zip(
-            boxes, scores, class_ids, windows):
-        chip_boxes = ObjectDetectionLabels.normalized_to_local(
-            chip_boxes, window)
-        chip_boxes = ObjectDetectionLabels.local_to_global(chip_boxes, window)
-        chip_class_ids = chip_class_ids.astype(np.int32)
-        labels = ObjectDetectionLabels.concatenate(
-            labels,
-            ObjectDetectionLabels(
-                chip_boxes, chip_class_ids, scores=chip_scores))
-
-    return labels
+    # Convert the boxes of all chips from normalized to global coordinates at
+    # once rather than concatenating the labels of each chip.
+    windows = BoxArray.from_boxes(windows)
+    heights = windows.get_heights()
+    widths = windows.get_widths()
+    scales = np.stack([heights, widths, heights, widths], axis=1)
+    offsets = np.stack(
+        [windows.ymins, windows.xmins, windows.ymins, windows.xmins], axis=1)
+    boxes = boxes * scales[:, np.newaxis, :] + offsets[:, np.newaxis, :]
+
+    return ObjectDetectionLabels(
+        boxes.reshape(-1, 4).astype(np.float64),
+        class_ids.reshape(-1).astype(np.int32),
+        scores=scores.reshape(-1).astype(np.float64))
 
 
 class TFObjectDetectionAPI(MLBackend):
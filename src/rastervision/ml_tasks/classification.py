@@ -1,10 +1,10 @@
 from os.path import join
 import tempfile
 
-import numpy as np
 from PIL import Image, ImageDraw
 
 from rastervision.core.ml_task import MLTask
+from rastervision.core.window_grid import WindowGrid
 from rastervision.evaluations.classification_evaluation import (
     ClassificationEvaluation)
 from rastervision.utils.files import (get_local_path, upload_if_needed,
@@ -30,12 +30,8 @@ class Classification(MLTask):
         extent = scene.raster_source.get_extent()
         chip_size = options.chip_size
         stride = chip_size
-        windows = []
-        for window in extent.get_windows(chip_size, stride):
-            chip = scene.raster_source.get_chip(window)
-            if np.sum(chip.ravel()) > 0:
-                windows.append(window)
-        return windows
+        windows = WindowGrid.from_extent(extent, chip_size, stride)
+        return windows.filter_nonempty(scene.raster_source)
 
     def get_train_labels(self, window, scene, options):
         return scene.ground_truth_label_store.get_labels(window=window)
@@ -43,7 +39,7 @@ class Classification(MLTask):
     def get_predict_windows(self, extent, options):
         chip_size = options.chip_size
         stride = chip_size
-        return extent.get_windows(chip_size, stride)
+        return WindowGrid.from_extent(extent, chip_size, stride)
 
     def post_process_predictions(self, labels, options):
         return labels
@@ -6,8 +6,9 @@ from rastervision.core.ml_task import MLTask
 from rastervision.evaluations.object_detection_evaluation import (
     ObjectDetectionEvaluation)
 from rastervision.labels.object_detection_labels import ObjectDetectionLabels
+from rastervision.labels.streaming_nms import StreamingNMS
 from rastervision.utils.misc import save_img
-from rastervision.core.box import BoxSizeError
+from rastervision.core.window_grid import WindowGrid
 
 
 def save_debug_image(im, labels, class_map, output_path):
@@ -32,39 +33,40 @@ def save_debug_image(im, labels, class_map, output_path):
 def _make_chip_pos_windows(image_extent, label_store, options):
     chip_size = options.chip_size
     pos_windows = []
-    boxes = label_store.get_labels().get_boxes()
+    boxes = label_store.get_labels().get_box_array()
     done_boxes = set()
 
-    # Get a random window around each box. If a box was previously included
-    # in a window, then it is skipped.
-    for box in boxes:
+    # Make a random window around each box that fits in a chip at once.
+    pixel_containers = boxes.make_pixel_containers()
+    fits = ((pixel_containers.get_heights() <= chip_size) &
+            (pixel_containers.get_widths() <= chip_size))
+    for box in boxes[~fits]:
+        print(('\nSkipping box {} because chip_size is set too small' +
+               ' for it.').format(box))
+    boxes = boxes[fits]
+    windows = boxes.make_random_square_containers(chip_size)
+
+    # Keep the window around each box, unless the box was previously
+    # included in a window.
+    for box, window in zip(boxes, windows):
         if box.tuple_format() not in done_boxes:
-            try:
-                window = box.make_random_square_container(chip_size)
-                pos_windows.append(window)
-
-                # Get boxes that lie completely within window
-                window_boxes = label_store.get_labels(window=window)
-                window_boxes = ObjectDetectionLabels.get_overlapping(
-                    window_boxes, window, ioa_thresh=1.0)
-                window_boxes = window_boxes.get_boxes()
-                window_boxes = [box.tuple_format() for box in window_boxes]
-                done_boxes.update(window_boxes)
-            except BoxSizeError:
-                print(('\nSkipping box {} because chip_size is set too small' +
-                       ' for it.').format(box))
+            pos_windows.append(window)
+
+            # Get boxes that lie completely within window
+            window_boxes = label_store.get_labels(window=window)
+            window_boxes = ObjectDetectionLabels.get_overlapping(
+                window_boxes, window, ioa_thresh=1.0)
+            window_boxes = window_boxes.get_boxes()
+            window_boxes = [box.tuple_format() for box in window_boxes]
+            done_boxes.update(window_boxes)
 
     return pos_windows
 
 
 def _make_label_pos_windows(image_extent, label_store, options):
     label_buffer = options.object_detection_options.label_buffer
-    pos_windows = []
-    for box in label_store.get_labels().get_boxes():
-        window = box.make_buffer(label_buffer, image_extent)
-        pos_windows.append(window)
-
-    return pos_windows
+    boxes = label_store.get_labels().get_box_array()
+    return boxes.make_buffer(label_buffer, image_extent).get_boxes()
 
 
 def make_pos_windows(image_extent, label_store, options):
@@ -86,7 +88,7 @@ def make_neg_windows(raster_source, label_store, chip_size, nb_windows,
         window = extent.make_random_square(chip_size)
         chip = raster_source.get_chip(window)
         labels = ObjectDetectionLabels.get_overlapping(
-            label_store.get_labels(), window, ioa_thresh=0.2)
+            label_store.get_labels(window=window), window, ioa_thresh=0.2)
 
         # If no labels and not blank, append the chip
         if len(labels) == 0 and np.sum(chip.ravel()) > 0:
@@ -107,8 +109,8 @@ class ObjectDetection(MLTask):
         if window_method == 'sliding':
             chip_size = options.chip_size
             stride = chip_size
-            return list(raster_source.get_extent().get_windows(
-                chip_size, stride))
+            return WindowGrid.from_extent(raster_source.get_extent(),
+                                          chip_size, stride)
 
         # Make positive windows which contain labels.
         pos_windows = make_pos_windows(raster_source.get_extent(), label_store,
@@ -144,13 +146,23 @@ class ObjectDetection(MLTask):
     def get_predict_windows(self, extent, options):
         chip_size = options.chip_size
         stride = chip_size // 2
-        return extent.get_windows(chip_size, stride)
+        return WindowGrid.from_extent(extent, chip_size, stride)
 
     def post_process_predictions(self, labels, options):
         return ObjectDetectionLabels.prune_duplicates(
             labels,
             score_thresh=options.object_detection_options.score_thresh,
-            merge_thresh=options.object_detection_options.merge_thresh)
+            merge_thresh=options.object_detection_options.merge_thresh,
+            num_workers=options.object_detection_options.merge_num_workers)
+
+    def make_streaming_post_processor(self, options):
+        od_options = options.object_detection_options
+        if not od_options.streaming_merge:
+            return None
+        return StreamingNMS(
+            od_options.score_thresh,
+            od_options.merge_thresh,
+            num_workers=od_options.merge_num_workers)
 
     def get_evaluation(self):
         return ObjectDetectionEvaluation()
@@ -4,6 +4,7 @@ from typing import List
 
 from rastervision.core.box import Box
 from rastervision.core.ml_task import MLTask
+from rastervision.core.window_grid import WindowGrid
 from rastervision.core.scene import Scene
 from rastervision.evaluations.segmentation_evaluation import (
     SegmentationEvaluation)
@@ -39,6 +40,13 @@ class SemanticSegmentation(MLTask):
         if len(target_classes) == 0:
             target_classes = [1]
 
+        # If sampling would read at least as many label pixels as there are
+        # in the scene, count target pixels with a summed-area table built
+        # from a single pass over the labels instead.
+        if (prob < 1.0 and
+                number_of_chips * chip_size * chip_size >= extent.get_area()):
+            label_store.build_target_count_table(target_classes)
+
         windows = []
         attempts = 0
         while (attempts < number_of_chips):
@@ -86,11 +94,11 @@ class SemanticSegmentation(MLTask):
                   workflow configuration file.
 
         Returns:
-             An sequence of windows.
+             A WindowGrid of windows.
 
         """
         chip_size = options.chip_size
-        return extent.get_windows(chip_size, chip_size)
+        return WindowGrid.from_extent(extent, chip_size, chip_size)
 
     def post_process_predictions(self, labels: None, options) -> None:
         """Post-process predictions.
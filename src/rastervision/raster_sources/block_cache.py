@@ -0,0 +1,170 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Cache tiles are built from whole internal blocks, but are made at least this
+# many pixels on a side so that striped TIFFs (with 1-row blocks) and tiny
+# tiles don't result in one read per row.
+MIN_TILE_SIZE = 256
+
+
+def get_tile_shape(image_dataset, min_tile_size=MIN_TILE_SIZE):
+    """Return the (height, width) of cache tiles for a dataset.
+
+    The tile shape is a multiple of the internal block shape of the first
+    band so that every tile read is block-aligned.
+
+    Args:
+        image_dataset: Rasterio DatasetReader
+        min_tile_size: (int) minimum height and width of a tile
+    """
+    block_height, block_width = image_dataset.block_shapes[0]
+    block_height = max(1, block_height)
+    block_width = max(1, block_width)
+    tile_height = block_height * max(1, -(-min_tile_size // block_height))
+    tile_width = block_width * max(1, -(-min_tile_size // block_width))
+    return (min(tile_height, max(1, image_dataset.height)),
+            min(tile_width, max(1, image_dataset.width)))
+
+
+class BlockCache(object):
+    """An LRU cache of decoded, block-aligned tiles of a Rasterio dataset.
+
+    Chips are assembled from cached tiles so that overlapping and repeated
+    window reads (eg. sliding window prediction) only decode each block once.
+    Tiles are stored with NODATA values already converted to 0, in
+    [height, width, channels] order.
+    """
+
+    def __init__(self, image_dataset, max_bytes, min_tile_size=MIN_TILE_SIZE):
+        """Construct a new BlockCache.
+
+        Args:
+            image_dataset: Rasterio DatasetReader to read tiles from
+            max_bytes: (int) the maximum number of bytes of decoded tiles to
+                hold before evicting the least recently used ones
+            min_tile_size: (int) minimum height and width of a tile
+        """
+        self.image_dataset = image_dataset
+        self.max_bytes = max_bytes
+        self.tile_height, self.tile_width = get_tile_shape(
+            image_dataset, min_tile_size)
+        self.dtype = np.dtype(image_dataset.dtypes[0])
+        self.nb_channels = image_dataset.count
+
+        self.tiles = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self):
+        """Remove all tiles from the cache and reset the counters."""
+        self.tiles = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self):
+        """Return dict with the cache counters.
+
+        This is useful for sizing max_bytes for a deployment.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'nb_tiles': len(self.tiles),
+            'nbytes': self.nbytes,
+            'max_bytes': self.max_bytes
+        }
+
+    def _read_tile(self, tile_row, tile_col):
+        ymin = tile_row * self.tile_height
+        xmin = tile_col * self.tile_width
+        ymax = min(ymin + self.tile_height, self.image_dataset.height)
+        xmax = min(xmin + self.tile_width, self.image_dataset.width)
+        tile = self.image_dataset.read(window=((ymin, ymax), (xmin, xmax)))
+
+        # Handle non-zero NODATA values by setting the data to 0.
+        for channel, nodata in enumerate(self.image_dataset.nodatavals):
+            if nodata is not None and nodata != 0:
+                tile[channel, tile[channel] == nodata] = 0
+
+        return np.ascontiguousarray(np.transpose(tile, axes=[1, 2, 0]))
+
+    def get_tile(self, tile_row, tile_col):
+        """Return a decoded tile, reading it if it is not in the cache.
+
+        Args:
+            tile_row: (int) row index of the tile in the tile grid
+            tile_col: (int) column index of the tile in the tile grid
+
+        Returns:
+            [height, width, channels] numpy array
+        """
+        key = (tile_row, tile_col)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.hits += 1
+            self.tiles.move_to_end(key)
+            return tile
+
+        self.misses += 1
+        tile = self._read_tile(tile_row, tile_col)
+        self.tiles[key] = tile
+        self.nbytes += tile.nbytes
+
+        # Evict least recently used tiles, but always keep the current one.
+        while self.nbytes > self.max_bytes and len(self.tiles) > 1:
+            _, evicted_tile = self.tiles.popitem(last=False)
+            self.nbytes -= evicted_tile.nbytes
+            self.evictions += 1
+
+        return tile
+
+    def read(self, ymin, xmin, ymax, xmax):
+        """Assemble a window of the dataset from cached tiles.
+
+        Parts of the window that lie outside the dataset are filled with 0,
+        which matches a boundless read with NODATA converted to 0.
+
+        Args:
+            ymin, xmin, ymax, xmax: (int) pixel bounds of the window
+
+        Returns:
+            [height, width, channels] numpy array
+        """
+        chip = np.zeros(
+            (ymax - ymin, xmax - xmin, self.nb_channels), dtype=self.dtype)
+
+        # Clip window to the dataset.
+        clip_ymin = max(ymin, 0)
+        clip_xmin = max(xmin, 0)
+        clip_ymax = min(ymax, self.image_dataset.height)
+        clip_xmax = min(xmax, self.image_dataset.width)
+        if clip_ymin >= clip_ymax or clip_xmin >= clip_xmax:
+            return chip
+
+        first_row = clip_ymin // self.tile_height
+        last_row = (clip_ymax - 1) // self.tile_height
+        first_col = clip_xmin // self.tile_width
+        last_col = (clip_xmax - 1) // self.tile_width
+
+        for tile_row in range(first_row, last_row + 1):
+            tile_ymin = tile_row * self.tile_height
+            src_ymin = max(clip_ymin, tile_ymin)
+            src_ymax = min(clip_ymax, tile_ymin + self.tile_height)
+            for tile_col in range(first_col, last_col + 1):
+                tile_xmin = tile_col * self.tile_width
+                src_xmin = max(clip_xmin, tile_xmin)
+                src_xmax = min(clip_xmax, tile_xmin + self.tile_width)
+
+                tile = self.get_tile(tile_row, tile_col)
+                chip[src_ymin - ymin:src_ymax - ymin,
+                     src_xmin - xmin:src_xmax - xmin] = \
+                    tile[src_ymin - tile_ymin:src_ymax - tile_ymin,
+                         src_xmin - tile_xmin:src_xmax - tile_xmin]
+
+        return chip
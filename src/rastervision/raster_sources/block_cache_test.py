@@ -0,0 +1,94 @@
+import unittest
+import tempfile
+import os
+
+import rasterio
+import numpy as np
+
+from rastervision.raster_sources.block_cache import BlockCache
+
+
+class BlockCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        image_path = os.path.join(self.temp_dir.name, 'temp.tif')
+        self.height = 40
+        self.width = 50
+        nb_channels = 2
+        self.im = np.random.randint(
+            2, 100, (self.height, self.width, nb_channels)).astype(np.uint16)
+        self.im[0, 0, :] = 1
+        with rasterio.open(
+                image_path,
+                'w',
+                driver='GTiff',
+                height=self.height,
+                width=self.width,
+                count=nb_channels,
+                dtype=np.uint16,
+                tiled=True,
+                blockxsize=16,
+                blockysize=16,
+                nodata=1) as image_dataset:
+            for channel in range(nb_channels):
+                image_dataset.write(self.im[:, :, channel], channel + 1)
+        self.image_dataset = rasterio.open(image_path)
+
+        # NODATA values should be converted to 0.
+        self.expected_im = self.im.copy()
+        self.expected_im[0, 0, :] = 0
+
+    def tearDown(self):
+        self.image_dataset.close()
+        self.temp_dir.cleanup()
+
+    def test_read(self):
+        cache = BlockCache(self.image_dataset, 1000000, min_tile_size=16)
+        chip = cache.read(5, 10, 35, 45)
+        np.testing.assert_equal(chip, self.expected_im[5:35, 10:45, :])
+
+        chip = cache.read(0, 0, 16, 16)
+        np.testing.assert_equal(chip, self.expected_im[0:16, 0:16, :])
+
+    def test_read_boundless(self):
+        cache = BlockCache(self.image_dataset, 1000000, min_tile_size=16)
+        chip = cache.read(30, 40, 60, 70)
+        expected_chip = np.zeros((30, 30, 2), dtype=np.uint16)
+        expected_chip[0:10, 0:10, :] = self.expected_im[30:, 40:, :]
+        np.testing.assert_equal(chip, expected_chip)
+
+        chip = cache.read(-10, -10, 0, 0)
+        np.testing.assert_equal(chip, np.zeros((10, 10, 2)))
+
+    def test_counters(self):
+        cache = BlockCache(self.image_dataset, 1000000, min_tile_size=16)
+        cache.read(0, 0, 20, 20)
+        self.assertEqual(cache.misses, 4)
+        self.assertEqual(cache.hits, 0)
+
+        cache.read(10, 10, 40, 40)
+        self.assertEqual(cache.misses, 9)
+        self.assertEqual(cache.hits, 4)
+        self.assertEqual(cache.get_stats()['nb_tiles'], 9)
+
+    def test_eviction(self):
+        # Room for exactly two 16x16x2 uint16 tiles.
+        tile_nbytes = 16 * 16 * 2 * 2
+        cache = BlockCache(
+            self.image_dataset, 2 * tile_nbytes, min_tile_size=16)
+        cache.read(0, 0, 16, 16)
+        cache.read(0, 16, 16, 32)
+        cache.read(0, 0, 16, 16)
+        cache.read(0, 32, 16, 48)
+
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.nbytes, 2 * tile_nbytes)
+        # The tile at (0, 1) was least recently used.
+        self.assertEqual(list(cache.tiles.keys()), [(0, 0), (0, 2)])
+
+        chip = cache.read(0, 0, 16, 48)
+        np.testing.assert_equal(chip, self.expected_im[0:16, 0:48, :])
+
+
+if __name__ == '__main__':
+    unittest.main()
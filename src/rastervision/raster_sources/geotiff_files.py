@@ -3,7 +3,7 @@ import os
 import rasterio
 
 from rastervision.raster_sources.rasterio_raster_source import (
-    RasterioRasterSource)
+    RasterioRasterSource, DEFAULT_BLOCK_CACHE_SIZE)
 from rastervision.crs_transformers.rasterio_crs_transformer import (
     RasterioCRSTransformer)
 from rastervision.utils.files import download_if_needed
@@ -25,9 +25,12 @@ def download_and_build_vrt(image_uris, temp_dir):
 
 
 class GeoTiffFiles(RasterioRasterSource):
-    def __init__(self, raster_transformer, uris):
+    def __init__(self,
+                 raster_transformer,
+                 uris,
+                 block_cache_size=DEFAULT_BLOCK_CACHE_SIZE):
         self.uris = uris
-        super().__init__(raster_transformer)
+        super().__init__(raster_transformer, block_cache_size=block_cache_size)
 
     def build_image_dataset(self):
         print('Loading GeoTiffFFiles...')
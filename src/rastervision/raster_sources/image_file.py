@@ -1,16 +1,19 @@
 import rasterio
 
 from rastervision.raster_sources.rasterio_raster_source import (
-    RasterioRasterSource)
+    RasterioRasterSource, DEFAULT_BLOCK_CACHE_SIZE)
 from rastervision.crs_transformers.identity_crs_transformer import (
     IdentityCRSTransformer)
 from rastervision.utils.files import download_if_needed
 
 
 class ImageFile(RasterioRasterSource):
-    def __init__(self, raster_transformer, uri):
+    def __init__(self,
+                 raster_transformer,
+                 uri,
+                 block_cache_size=DEFAULT_BLOCK_CACHE_SIZE):
         self.uri = uri
-        super().__init__(raster_transformer)
+        super().__init__(raster_transformer, block_cache_size=block_cache_size)
 
     def build_image_dataset(self):
         imagery_path = download_if_needed(self.uri, self.temp_dir.name)
@@ -1,9 +1,14 @@
+import math
 import tempfile
 
 import numpy as np
 
 from rastervision.core.raster_source import RasterSource
 from rastervision.core.box import Box
+from rastervision.raster_sources.block_cache import BlockCache
+
+# Default maximum size in bytes of the decoded block cache.
+DEFAULT_BLOCK_CACHE_SIZE = 256 * 1024 * 1024
 
 
 def load_window(image_dataset, window=None):
@@ -26,10 +31,28 @@ def load_window(image_dataset, window=None):
     return im
 
 
+def is_integral(window):
+    """Return True if the coordinates of a Box are all integers."""
+    return all(float(coord).is_integer() for coord in window.tuple_format())
+
+
 class RasterioRasterSource(RasterSource):
-    def __init__(self, raster_transformer):
+    def __init__(self,
+                 raster_transformer,
+                 block_cache_size=DEFAULT_BLOCK_CACHE_SIZE):
+        """Construct a new RasterioRasterSource.
+
+        Args:
+            raster_transformer: RasterTransformer used to transform chips
+                whenever they are retrieved.
+            block_cache_size: (int) maximum number of bytes of decoded blocks
+                to cache. If 0, chips are read directly from the dataset.
+        """
         self.temp_dir = tempfile.TemporaryDirectory()
         self.image_dataset = self.build_image_dataset()
+        self.block_cache = None
+        if block_cache_size > 0:
+            self.block_cache = BlockCache(self.image_dataset, block_cache_size)
         super().__init__(raster_transformer)
 
     def build_image_dataset(self):
@@ -39,4 +62,31 @@ class RasterioRasterSource(RasterSource):
         return Box(0, 0, self.image_dataset.height, self.image_dataset.width)
 
     def _get_chip(self, window):
+        if self.block_cache is not None and is_integral(window):
+            return self.block_cache.read(
+                *[int(coord) for coord in window.tuple_format()])
         return load_window(self.image_dataset, window.rasterio_format())
+
+    def get_overview_array(self):
+        factors = self.image_dataset.overviews(1)
+        if not factors:
+            return None
+
+        factor = max(factors)
+        out_shape = (self.image_dataset.count,
+                     math.ceil(self.image_dataset.height / factor),
+                     math.ceil(self.image_dataset.width / factor))
+        im = self.image_dataset.read(out_shape=out_shape)
+
+        # Handle non-zero NODATA values by setting the data to 0.
+        for channel, nodata in enumerate(self.image_dataset.nodatavals):
+            if nodata is not None and nodata != 0:
+                im[channel, im[channel] == nodata] = 0
+
+        return np.transpose(im, axes=[1, 2, 0])
+
+    def get_cache_stats(self):
+        """Return dict with block cache hit/miss counters or None."""
+        if self.block_cache is None:
+            return None
+        return self.block_cache.get_stats()
@@ -54,13 +54,15 @@ def _predict_package(predict_package_uri,
                      labels_uri,
                      image_uris,
                      update_stats=False,
-                     channel_order=None):
+                     channel_order=None,
+                     approximate_stats=False):
     command = PredictPackage(
         predict_package_uri,
         labels_uri,
         image_uris,
         update_stats=update_stats,
-        channel_order=channel_order)
+        channel_order=channel_order,
+        approximate_stats=approximate_stats)
     command.run()
 
 
@@ -75,8 +77,13 @@ def _predict_package(predict_package_uri,
 @click.option(
     '--channel-order',
     help='String containing channel_order.' + ' Example: \"2 1 0\"')
+@click.option(
+    '--approximate-stats',
+    is_flag=True,
+    help='Estimate raster stats using overviews or a sample of windows ' +
+    'when used with --update-stats')
 def predict_package(predict_package_uri, labels_uri, image_uris, update_stats,
-                    channel_order):
+                    channel_order, approximate_stats):
     """Make predictions on new imagery using a prediction package.
 
     predict_package_uri: URI of package generated by predict command
@@ -96,7 +103,8 @@ def predict_package(predict_package_uri, labels_uri, image_uris, update_stats,
         labels_uri,
         image_uris,
         update_stats=update_stats,
-        channel_order=channel_order)
+        channel_order=channel_order,
+        approximate_stats=approximate_stats)
 
 
 def _eval(config_uri):
@@ -1,3 +1,4 @@
+import codecs
 import io
 import os
 import urllib
@@ -13,6 +14,10 @@ from pathlib import Path
 from threading import Timer
 from urllib.parse import urlparse
 
+# Size in bytes of each part of S3 multipart uploads. All parts except the
+# last need to be at least 5MB.
+S3_PART_SIZE = 8 * 1024 * 1024
+
 
 class NotReadableError(Exception):
     pass
@@ -202,6 +207,50 @@ def upload_if_needed(src_path, dst_uri):
             sync_dir(src_path, dst_uri, delete=True)
 
 
+def get_file_fingerprint(uri):
+    """Return a string that changes whenever the file at a URI changes.
+
+    For S3 the ETag and size are used, for HTTP the ETag or Last-Modified
+    header and size, and for local files the size and modification time.
+
+    Args:
+        uri: (string) URI of file
+
+    Returns:
+        (string) fingerprint or None if the file cannot be fingerprinted
+
+    Raises:
+        NotReadableError if URI cannot be read from
+    """
+    parsed_uri = urlparse(uri)
+    if parsed_uri.scheme == 's3':
+        try:
+            s3 = boto3.client('s3')
+            response = s3.head_object(
+                Bucket=parsed_uri.netloc, Key=parsed_uri.path[1:])
+        except botocore.exceptions.ClientError:
+            raise NotReadableError('Could not read {}'.format(uri))
+        return 'etag={};size={}'.format(response['ETag'],
+                                        response['ContentLength'])
+    elif parsed_uri.scheme in ['http', 'https']:
+        request = urllib.request.Request(uri, method='HEAD')
+        try:
+            with urllib.request.urlopen(request) as response:
+                headers = response.headers
+        except Exception:
+            raise NotReadableError('Could not read {}'.format(uri))
+        version = headers.get('ETag') or headers.get('Last-Modified')
+        if version is None:
+            return None
+        return 'version={};size={}'.format(version,
+                                           headers.get('Content-Length'))
+    else:
+        if not os.path.isfile(uri):
+            raise NotReadableError('Could not read {}'.format(uri))
+        stat = os.stat(uri)
+        return 'size={};mtime={}'.format(stat.st_size, stat.st_mtime_ns)
+
+
 def file_to_str(file_uri):
     """Download contents of text file into a string.
 
@@ -232,6 +281,151 @@ def file_to_str(file_uri):
             return file_buffer.read()
 
 
+def file_to_bytes(file_uri):
+    """Download contents of binary file into a bytes object.
+
+    Args:
+        file_uri: (string) URI of file
+
+    Returns:
+        (bytes) with contents of file
+
+    Raises:
+        NotReadableError if URI cannot be read from
+    """
+    parsed_uri = urlparse(file_uri)
+    if parsed_uri.scheme == 's3':
+        with io.BytesIO() as file_buffer:
+            try:
+                s3 = boto3.client('s3')
+                s3.download_fileobj(parsed_uri.netloc, parsed_uri.path[1:],
+                                    file_buffer)
+                return file_buffer.getvalue()
+            except botocore.exceptions.ClientError:
+                raise NotReadableError('Could not read {}'.format(file_uri))
+    else:
+        if not os.path.isfile(file_uri):
+            raise NotReadableError('Could not read {}'.format(file_uri))
+        with open(file_uri, 'rb') as file_buffer:
+            return file_buffer.read()
+
+
+class S3TextWriter(object):
+    """Write-only text file-like object backed by an S3 multipart upload.
+
+    Text is buffered until a part is big enough to be uploaded, so only one
+    part is held in memory at a time. Files smaller than one part are
+    uploaded with a single request when closed.
+    """
+
+    def __init__(self, bucket, key, part_size=S3_PART_SIZE):
+        self.s3 = boto3.client('s3')
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.buffer = io.BytesIO()
+        self.upload_id = None
+        self.parts = []
+
+    def _upload_part(self):
+        try:
+            if self.upload_id is None:
+                self.upload_id = self.s3.create_multipart_upload(
+                    Bucket=self.bucket, Key=self.key)['UploadId']
+            part_number = len(self.parts) + 1
+            response = self.s3.upload_part(
+                Bucket=self.bucket,
+                Key=self.key,
+                PartNumber=part_number,
+                UploadId=self.upload_id,
+                Body=self.buffer.getvalue())
+        except botocore.exceptions.ClientError:
+            raise NotWritableError('Could not write s3://{}/{}'.format(
+                self.bucket, self.key))
+        self.parts.append({
+            'ETag': response['ETag'],
+            'PartNumber': part_number
+        })
+        self.buffer = io.BytesIO()
+
+    def write(self, content_str):
+        self.buffer.write(content_str.encode('utf-8'))
+        if self.buffer.tell() >= self.part_size:
+            self._upload_part()
+
+    def close(self):
+        """Finish uploading the file."""
+        if self.upload_id is not None and self.buffer.tell() > 0:
+            self._upload_part()
+        try:
+            if self.upload_id is None:
+                self.s3.put_object(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    Body=self.buffer.getvalue())
+            else:
+                self.s3.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self.upload_id,
+                    MultipartUpload={'Parts': self.parts})
+        except botocore.exceptions.ClientError:
+            raise NotWritableError('Could not write s3://{}/{}'.format(
+                self.bucket, self.key))
+
+    def abort(self):
+        """Discard the file without uploading the rest of it."""
+        if self.upload_id is not None:
+            self.s3.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def open_text_file(file_uri, mode='r'):
+    """Open a text file without holding all of it in memory.
+
+    Args:
+        file_uri: (string) URI of file
+        mode: (string) 'r' for reading or 'w' for writing
+
+    Returns:
+        file-like object whose read method returns strings or whose write
+            method takes strings, which should be closed after use. For S3,
+            writing uses a multipart upload which completes when the file
+            is closed.
+
+    Raises:
+        NotReadableError if URI cannot be read from
+    """
+    parsed_uri = urlparse(file_uri)
+    if mode == 'w':
+        if parsed_uri.scheme == 's3':
+            return S3TextWriter(parsed_uri.netloc, parsed_uri.path[1:])
+        make_dir(file_uri, use_dirname=True)
+        return open(file_uri, 'w')
+
+    if parsed_uri.scheme == 's3':
+        try:
+            s3 = boto3.client('s3')
+            response = s3.get_object(
+                Bucket=parsed_uri.netloc, Key=parsed_uri.path[1:])
+        except botocore.exceptions.ClientError:
+            raise NotReadableError('Could not read {}'.format(file_uri))
+        return codecs.getreader('utf-8')(response['Body'])
+    else:
+        if not os.path.isfile(file_uri):
+            raise NotReadableError('Could not read {}'.format(file_uri))
+        return open(file_uri, 'r')
+
+
 def str_to_file(content_str, file_uri):
     """Writes string to text file.
 
@@ -258,6 +452,32 @@ def str_to_file(content_str, file_uri):
             content_file.write(content_str)
 
 
+def bytes_to_file(content_bytes, file_uri):
+    """Writes bytes to binary file.
+
+    Args:
+        content_bytes: bytes to write
+        file_uri: (string) URI of file to write
+
+    Raise:
+        NotWritableError if file_uri cannot be written
+    """
+    parsed_uri = urlparse(file_uri)
+    if parsed_uri.scheme == 's3':
+        bucket = parsed_uri.netloc
+        key = parsed_uri.path[1:]
+        with io.BytesIO(content_bytes) as bytes_buffer:
+            try:
+                s3 = boto3.client('s3')
+                s3.upload_fileobj(bytes_buffer, bucket, key)
+            except Exception:
+                raise NotWritableError('Could not write {}'.format(file_uri))
+    else:
+        make_dir(file_uri, use_dirname=True)
+        with open(file_uri, 'wb') as content_file:
+            content_file.write(content_bytes)
+
+
 def load_json_config(uri, message):
     """Load a JSON-formatted protobuf config file.
 
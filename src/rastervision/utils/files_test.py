@@ -1,6 +1,7 @@
 import tempfile
 import os
 import unittest
+from unittest.mock import patch
 import json
 
 import boto3
@@ -9,7 +10,8 @@ from moto import mock_s3
 from rastervision.utils.files import (
     file_to_str, str_to_file, download_if_needed, upload_if_needed,
     NotReadableError, NotWritableError, load_json_config,
-    ProtobufParseException, make_dir, get_local_path)
+    ProtobufParseException, make_dir, get_local_path, get_file_fingerprint,
+    open_text_file, S3TextWriter, file_to_bytes, bytes_to_file)
 from rastervision.protos.machine_learning_pb2 import MachineLearning
 
 
@@ -116,6 +118,102 @@ class TestFileToStr(unittest.TestCase):
         with self.assertRaises(NotReadableError):
             file_to_str(wrong_path)
 
+    def test_file_to_bytes(self):
+        content_bytes = b'\x00\xffhello'
+        bytes_to_file(content_bytes, self.local_path)
+        self.assertEqual(file_to_bytes(self.local_path), content_bytes)
+
+        bytes_to_file(content_bytes, self.s3_path)
+        self.assertEqual(file_to_bytes(self.s3_path), content_bytes)
+
+        with self.assertRaises(NotReadableError):
+            file_to_bytes('s3://wrongpath/x.npz')
+        with self.assertRaises(NotWritableError):
+            bytes_to_file(content_bytes, 's3://wrongpath/x.npz')
+
+    def test_open_text_file(self):
+        str_to_file(self.content_str, self.local_path)
+        with open_text_file(self.local_path) as file_obj:
+            self.assertEqual(file_obj.read(), self.content_str)
+
+        str_to_file(self.content_str, self.s3_path)
+        with open_text_file(self.s3_path) as file_obj:
+            self.assertEqual(file_obj.read(2), self.content_str[0:2])
+            self.assertEqual(file_obj.read(), self.content_str[2:])
+
+        with self.assertRaises(NotReadableError):
+            open_text_file('s3://wrongpath/x.txt')
+
+    def test_open_text_file_write(self):
+        with open_text_file(self.local_path, 'w') as file_obj:
+            file_obj.write(self.content_str)
+        self.assertEqual(file_to_str(self.local_path), self.content_str)
+
+        with open_text_file(self.s3_path, 'w') as file_obj:
+            self.assertIsInstance(file_obj, S3TextWriter)
+            file_obj.write(self.content_str)
+        self.assertEqual(file_to_str(self.s3_path), self.content_str)
+
+        with self.assertRaises(NotWritableError):
+            with open_text_file('s3://wrongpath/x.txt', 'w') as file_obj:
+                file_obj.write(self.content_str)
+
+    def test_s3_text_writer_multipart(self):
+        # S3 parts other than the last must be at least 5MB.
+        part_size = 5 * 1024 * 1024
+        content_strs = ['a' * (part_size - 1), 'bc', 'd' * 10]
+        # moto doesn't decode the aws-chunked bodies that newer versions of
+        # botocore send with checksums by default.
+        env = {'AWS_REQUEST_CHECKSUM_CALCULATION': 'when_required'}
+        with patch.dict(os.environ, env):
+            with S3TextWriter(self.bucket_name, self.file_name,
+                              part_size) as writer:
+                for content_str in content_strs:
+                    writer.write(content_str)
+                self.assertEqual(len(writer.parts), 1)
+        self.assertEqual(len(writer.parts), 2)
+        self.assertEqual(file_to_str(self.s3_path), ''.join(content_strs))
+
+
+class TestGetFileFingerprint(unittest.TestCase):
+    def setUp(self):
+        # Setup mock S3 bucket.
+        self.mock_s3 = mock_s3()
+        self.mock_s3.start()
+        self.s3 = boto3.client('s3')
+        self.bucket_name = 'mock_bucket'
+        self.s3.create_bucket(Bucket=self.bucket_name)
+        self.s3_path = 's3://{}/{}'.format(self.bucket_name, 'hello.txt')
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.local_path = os.path.join(self.temp_dir.name, 'hello.txt')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        self.mock_s3.stop()
+
+    def test_get_file_fingerprint_local(self):
+        with self.assertRaises(NotReadableError):
+            get_file_fingerprint(self.local_path)
+
+        str_to_file('hello', self.local_path)
+        fingerprint = get_file_fingerprint(self.local_path)
+        self.assertEqual(fingerprint, get_file_fingerprint(self.local_path))
+
+        str_to_file('hello world', self.local_path)
+        self.assertNotEqual(fingerprint, get_file_fingerprint(self.local_path))
+
+    def test_get_file_fingerprint_s3(self):
+        with self.assertRaises(NotReadableError):
+            get_file_fingerprint(self.s3_path)
+
+        str_to_file('hello', self.s3_path)
+        fingerprint = get_file_fingerprint(self.s3_path)
+        self.assertEqual(fingerprint, get_file_fingerprint(self.s3_path))
+
+        str_to_file('goodbye', self.s3_path)
+        self.assertNotEqual(fingerprint, get_file_fingerprint(self.s3_path))
+
 
 class TestDownloadIfNeeded(unittest.TestCase):
     """Test download_if_needed and upload_if_needed and str_to_file."""
@@ -21,7 +21,9 @@ from rastervision.protos.label_store_pb2 import (
     LabelStore as LabelStoreConfig, ObjectDetectionGeoJSONFile as
     ObjectDetectionGeoJSONFileConfig, ClassificationGeoJSONFile as
     ClassificationGeoJSONFileConfig, SegmentationRasterFile as
-    SegmentationRasterFileConfig)
+    SegmentationRasterFileConfig, ObjectDetectionNpzFile as
+    ObjectDetectionNpzFileConfig, ObjectDetectionSQLiteFile as
+    ObjectDetectionSQLiteFileConfig)
 
 from rastervision.utils.files import (load_json_config, save_json_config,
                                       file_to_str, str_to_file)
@@ -246,12 +248,23 @@ class ChainWorkflow(object):
         label_store_type = label_store.WhichOneof('label_store_type')
         prediction_uri = join(self.path_generator.prediction_output_uri,
                               '{}.json'.format(scene.id))
+        prediction_npz = join(self.path_generator.prediction_output_uri,
+                              '{}.npz'.format(scene.id))
+        prediction_sqlite = join(self.path_generator.prediction_output_uri,
+                                 '{}.sqlite'.format(scene.id))
         prediction_raster = join(self.path_generator.prediction_output_uri,
                                  '{}.tif'.format(scene.id))
 
         if label_store_type == 'object_detection_geojson_file':
             geojson_file = ObjectDetectionGeoJSONFileConfig(uri=prediction_uri)
             return LabelStoreConfig(object_detection_geojson_file=geojson_file)
+        elif label_store_type == 'object_detection_npz_file':
+            npz_file = ObjectDetectionNpzFileConfig(uri=prediction_npz)
+            return LabelStoreConfig(object_detection_npz_file=npz_file)
+        elif label_store_type == 'object_detection_sqlite_file':
+            sqlite_file = ObjectDetectionSQLiteFileConfig(
+                uri=prediction_sqlite)
+            return LabelStoreConfig(object_detection_sqlite_file=sqlite_file)
         elif label_store_type == 'classification_geojson_file':
             geojson_file = ClassificationGeoJSONFileConfig(uri=prediction_uri)
             return LabelStoreConfig(classification_geojson_file=geojson_file)